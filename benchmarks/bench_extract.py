@@ -0,0 +1,51 @@
+# bench_extract.py
+# Throughput of the scripture reference extractor over a synthetic sermon library.
+#
+# Run from the project root:  python benchmarks/bench_extract.py [--sermons 2000]
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORDS = ("the grace of God is sufficient for he who believes so we can do all things as it is written and "
+         "love one another in 3 ways because 12 disciples followed him for 40 days").split()
+REFERENCES = ["Rom 8:28", "Eph 2:8-9", "1 John 1:9; 2:1", "Psalm 23", "John 3:16, 18", "Isa 53:5", "2 Cor 5:17",
+              "Heb 11:1-12:2", "Jude 24", "Song of Songs 2:4"]
+
+
+def make_sermon(rng, words, density):
+    return ' '.join(rng.choice(REFERENCES) if rng.random() < density else rng.choice(WORDS) for _ in range(words))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sermons', type=int, default=2000)
+    parser.add_argument('--words', type=int, default=2500, help="words per sermon")
+    parser.add_argument('--density', type=float, default=0.005, help="share of words that are references")
+    args = parser.parse_args()
+    import logging
+    logging.disable(logging.CRITICAL)
+    from bible_extract import extract_refs, ReferenceExtractor
+
+    rng = random.Random(1)
+    library = [make_sermon(rng, args.words, args.density) for _ in range(args.sermons)]
+    size = sum(len(text) for text in library)
+
+    start = time.perf_counter()
+    ReferenceExtractor()
+    build_ms = (time.perf_counter() - start) * 1000
+    extract_refs('')  # Build the shared automaton outside the timing
+    start = time.perf_counter()
+    found = sum(len(extract_refs(text)) for text in library)
+    seconds = time.perf_counter() - start
+    print(f"automaton built in {build_ms:.0f} ms")
+    print(f"{args.sermons} sermons, {size / 1e6:.1f} MB, {found} references in {seconds:.2f}s "
+          f"({size / 1e6 / seconds:.1f} MB/s, {seconds / args.sermons * 1000:.2f} ms per sermon)")
+
+
+if __name__ == "__main__":
+    main()
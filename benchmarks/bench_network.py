@@ -0,0 +1,172 @@
+# bench_network.py
+# Network-layer benchmark: runs the real fetch paths (fetch_verse_text, the reader's fetch_now + prefetch,
+# fetch_many, /v2/find/) against the local stand-in server and reports p50/p95 latency, requests per
+# user action and chapter cache hit ratio. Seeded, so two runs with the same flags do the same work.
+#
+# Run from the project root:  python benchmarks/bench_network.py --latency-ms 80 --jitter-ms 20
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSLATION = 'KJV'
+SERMON_REFS = ["John 3:16", "Romans 8:28", "Ps 23", "Phil 4:13", "Isaiah 40:31", "Jer 29:11", "Prov 3:5-6",
+               "Matthew 5:3-12", "1 Cor 13:4-7", "Eph 2:8-9", "Heb 11:1", "Gal 5:22-23", "Rom 12:1-2",
+               "John 1:1-5", "Gen 1:1", "Rev 21:4", "2 Tim 3:16", "James 1:2-4", "1 John 1:9", "Micah 6:8"]
+SEARCH_WORDS = ['grace', 'faith', 'bread of', 'light', 'mercy unto', 'king', 'living water', 'peace']
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Bench:
+    """Times user actions and attributes server requests and cache lookups to each scenario."""
+
+    def __init__(self, server):
+        self.server = server
+        self.results = []
+
+    def run(self, name, actions, pause=0.0):
+        """Time each action; pause seconds between actions are left out of the timings."""
+        from bible_cache import chapter_cache
+        for counter in chapter_cache.counters:
+            chapter_cache.counters[counter] = 0
+        before = self.server.snapshot()
+        timings = []
+        for action in actions:
+            start = time.perf_counter()
+            action()
+            timings.append((time.perf_counter() - start) * 1000)
+            time.sleep(pause)
+        after = self.server.snapshot()
+        requests = sum(after.get(k, 0) - before.get(k, 0) for k in ('get-text', 'find'))
+        stats = chapter_cache.stats()
+        result = {
+            'scenario': name,
+            'actions': len(timings),
+            'p50_ms': percentile(timings, 0.50),
+            'p95_ms': percentile(timings, 0.95),
+            'requests_per_action': requests / len(timings) if timings else 0.0,
+            'cache_hit_ratio': stats['hit_ratio'] if sum(chapter_cache.counters.values()) else None,
+        }
+        self.results.append(result)
+        return result
+
+    def report(self):
+        print(f"{'scenario':<34} {'actions':>7} {'p50 ms':>9} {'p95 ms':>9} {'req/action':>11} {'cache hits':>11}")
+        for r in self.results:
+            hits = f"{r['cache_hit_ratio']:.0%}" if r['cache_hit_ratio'] is not None else "-"
+            print(f"{r['scenario']:<34} {r['actions']:>7} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} "
+                  f"{r['requests_per_action']:>11.2f} {hits:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the bolls.life client code against a local stand-in.")
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--jitter-ms', type=float, default=10.0)
+    parser.add_argument('--error-rate', type=float, default=0.05, help="503 rate for the fault scenario")
+    parser.add_argument('--lookups', type=int, default=40, help="verse lookups per lookup scenario")
+    parser.add_argument('--chapters', type=int, default=15, help="chapters read in the navigation scenario")
+    parser.add_argument('--think-ms', type=float, default=300.0, help="reader pause between chapters")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    # The cache, corpus database and sermon.log are all relative paths; keep them out of the project
+    workdir = tempfile.mkdtemp(prefix='bench_network_')
+    os.chdir(workdir)
+    import logging
+    logging.disable(logging.CRITICAL)
+    import bible_http
+    from bible_cache import chapter_cache
+    from bible_prefetch import prefetcher
+    from bible_utils import BOOK_MAP, REVERSE_BOOK_MAP, BOOK_CHAPTERS, fetch_verse_text, fetch_many
+    from standin_server import StandinServer, StandinConfig
+
+    config = StandinConfig(args.latency_ms, args.jitter_ms, seed=args.seed)
+    server = StandinServer(config)
+    bible_http.BASE_URL = server.start()
+    print(f"Stand-in server at {bible_http.BASE_URL}, working directory {workdir}")
+    print(f"latency {args.latency_ms} ms +/- {args.jitter_ms} ms, seed {args.seed}\n")
+
+    rng = random.Random(args.seed)
+    books = list(BOOK_MAP)
+    refs = []
+    for _ in range(args.lookups):
+        book = rng.choice(books)
+        refs.append(f"{book} {rng.randint(1, BOOK_CHAPTERS[book])}:1")
+
+    bench = Bench(server)
+    try:
+        chapter_cache.clear()
+        bench.run("verse lookup, cold", [lambda ref=ref: fetch_verse_text(ref, TRANSLATION) for ref in refs])
+        bench.run("verse lookup, memory cache", [lambda ref=ref: fetch_verse_text(ref, TRANSLATION) for ref in refs])
+
+        # Memory tier off and every disk entry stale: each lookup becomes a conditional GET answered with 304
+        memory_max, ttl = chapter_cache.memory_max, chapter_cache.ttl
+        chapter_cache.memory_max, chapter_cache.ttl = 0, 0
+        chapter_cache._memory.clear()
+        bench.run("verse lookup, revalidate (304)", [lambda ref=ref: fetch_verse_text(ref, TRANSLATION) for ref in refs])
+        chapter_cache.memory_max, chapter_cache.ttl = memory_max, ttl
+
+        def read(book_id, chapter):
+            prefetcher.fetch_now(TRANSLATION, book_id, chapter)
+            prefetcher.prefetch_around(TRANSLATION, REVERSE_BOOK_MAP[book_id], chapter)
+
+        chapter_cache.clear()
+        start_book = rng.choice([b for b in books if BOOK_CHAPTERS[b] >= args.chapters])
+        pages = [(BOOK_MAP[start_book], chapter) for chapter in range(1, args.chapters + 1)]
+        # The reader pauses between chapters, which is when the neighbours get prefetched
+        bench.run(f"reader next chapter ({start_book})",
+                  [lambda book_id=book_id, chapter=chapter: read(book_id, chapter) for book_id, chapter in pages],
+                  pause=args.think_ms / 1000)
+        prefetcher.cancel_prefetches()
+        time.sleep(args.think_ms / 1000)
+
+        chapter_cache.clear()
+        bench.run("sermon batch (fetch_many)", [lambda: fetch_many(SERMON_REFS, TRANSLATION)])
+
+        def search(word):
+            response = bible_http.find(TRANSLATION, word)
+            response.raise_for_status()
+            return response.json()
+
+        bench.run("keyword search (/v2/find/)", [lambda word=word: search(word) for word in SEARCH_WORDS])
+
+        config.error_rate = args.error_rate
+        chapter_cache.clear()
+        failures = []
+
+        def faulty(ref):
+            text = fetch_verse_text(ref, TRANSLATION)
+            if text.startswith(("Network error", "Error fetching")):
+                failures.append(ref)
+
+        bench.run(f"verse lookup, cold, {args.error_rate:.0%} 503s", [lambda ref=ref: faulty(ref) for ref in refs])
+        config.error_rate = 0.0
+    finally:
+        server.stop()
+
+    bench.report()
+    print(f"\nlookups that still failed after retries in the fault scenario: {len(failures)}")
+    if json_path:
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(bench.results, f, indent=2)
+        print(f"Results written to {json_path}")
+
+
+if __name__ == "__main__":
+    main()
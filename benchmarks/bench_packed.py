@@ -0,0 +1,95 @@
+# bench_packed.py
+# Micro-benchmark: open time and per-lookup latency of the packed mmap format against the JSON-per-chapter
+# cache files and the SQLite corpus store, on a synthetic full-size translation.
+#
+# Run from the project root:  python benchmarks/bench_packed.py
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSLATION = 'SYN'
+LOOKUPS = 20000
+OPENS = 200
+
+
+def per_call_us(fn, items):
+    start = time.perf_counter()
+    for item in items:
+        fn(*item)
+    return (time.perf_counter() - start) / len(items) * 1e6
+
+
+def row(label, open_us, verse_us, chapter_us):
+    open_text = f"{open_us:10.1f}" if open_us is not None else f"{'-':>10}"
+    print(f"{label:<30} {open_text} {verse_us:12.2f} {chapter_us:12.2f}")
+
+
+def main():
+    # Every store below uses relative paths; build them in a scratch directory
+    os.chdir(tempfile.mkdtemp(prefix='bench_packed_'))
+    import logging
+    logging.disable(logging.CRITICAL)
+    import bible_store
+    import bible_packed
+    from bible_cache import ChapterCache
+    from bible_versification import CHAPTER_ORDINALS
+    from standin_server import fixture_chapter
+
+    chapters = {key: fixture_chapter(TRANSLATION, *key) for key in CHAPTER_ORDINALS}
+    rows = [(book_id, chapter, v['verse'], v['text']) for (book_id, chapter), verses in chapters.items()
+            for v in verses]
+
+    json_cache = ChapterCache(cache_dir='json_chapters', memory_max=0)
+    for (book_id, chapter), verses in chapters.items():
+        json_cache.put((TRANSLATION, book_id, chapter), verses)
+    for (book_id, chapter), verses in chapters.items():
+        bible_store.store_chapter(TRANSLATION, book_id, chapter, verses)
+    bible_store.mark_installed(TRANSLATION)
+    start = time.perf_counter()
+    bible_packed.pack(TRANSLATION)
+    pack_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(1)
+    verse_keys = [rng.choice(rows)[:3] for _ in range(LOOKUPS)]
+    chapter_keys = [key for key in rng.choices(list(CHAPTER_ORDINALS), k=LOOKUPS // 10)]
+    path = bible_packed.packed_path(TRANSLATION)
+    json_bytes = sum(os.path.getsize(entry.path) for entry in os.scandir('json_chapters'))
+    print(f"{len(rows)} verses in {len(chapters)} chapters; packed in {pack_ms:.0f} ms")
+    print(f"packed file {os.path.getsize(path) / 1024:.0f} KiB, JSON chapter files {json_bytes / 1024:.0f} KiB\n")
+
+    def json_verse(book_id, chapter, verse):
+        data = json_cache.get((TRANSLATION, book_id, chapter))
+        return next(v['text'] for v in data if v['verse'] == verse)
+
+    def json_chapter(book_id, chapter):
+        return json_cache.get((TRANSLATION, book_id, chapter))
+
+    def store_verse(book_id, chapter, verse):
+        data = bible_store.get_chapter(TRANSLATION, book_id, chapter)
+        return next(v['text'] for v in data if v['verse'] == verse)
+
+    start = time.perf_counter()
+    for _ in range(OPENS):
+        bible_packed.PackedBible(path).close()
+    packed_open = (time.perf_counter() - start) / OPENS * 1e6
+    packed = bible_packed.PackedBible(path)
+
+    print(f"{'backend':<30} {'open us':>10} {'verse us':>12} {'chapter us':>12}")
+    row("JSON per chapter (disk tier)", None, per_call_us(json_verse, verse_keys[:LOOKUPS // 10]),
+        per_call_us(json_chapter, chapter_keys))
+    row("SQLite corpus store", None, per_call_us(store_verse, verse_keys[:LOOKUPS // 10]),
+        per_call_us(lambda b, c: bible_store.get_chapter(TRANSLATION, b, c), chapter_keys))
+    row("packed mmap", packed_open, per_call_us(packed.verse, verse_keys), per_call_us(packed.chapter, chapter_keys))
+    mismatches = sum(packed.verse(b, c, v) != json_verse(b, c, v) for b, c, v in verse_keys[:1000])
+    print(f"\nmismatched verses between packed and JSON: {mismatches}")
+    packed.close()
+
+
+if __name__ == "__main__":
+    main()
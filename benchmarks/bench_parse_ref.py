@@ -0,0 +1,79 @@
+# bench_parse_ref.py
+# Micro-benchmark: trie-based parse_ref against the previous regex + difflib book matching.
+#
+# Run from the project root:  python benchmarks/bench_parse_ref.py
+
+import difflib
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bible_utils import BOOK_MAP, parse_ref  # noqa: E402
+from bible_books import VARIANT_TO_FULL  # noqa: E402
+
+FULL_NAME_REFS = ["John 3:16", "Genesis 1:1", "1 Corinthians 13:4", "Psalms 23:1", "Revelation 22:21"]
+ABBREVIATED_REFS = ["jhn 3 16", "1Jn 1:9", "Rom 8:28", "Ps 23:1", "Phil 4:13"]
+REPEAT = 20000
+
+
+def legacy_parse_ref(ref):
+    """parse_ref as it was before the book index: one regex, exact BOOK_MAP lookup."""
+    ref = ref.strip()
+    match = re.match(r'(\d*\s*[a-zA-Z ]+) (\d+)(:(\d+))?', ref, re.I)
+    if not match:
+        raise ValueError("Invalid reference. Use e.g., John 3 or John 3:16")
+    book_str = match.group(1).strip().title()
+    chapter = int(match.group(2))
+    verse = int(match.group(4)) if match.group(4) else None
+    if book_str in BOOK_MAP:
+        book_id = BOOK_MAP[book_str]
+    else:
+        match_num = re.match(r'(\d)(\w+)', book_str)
+        if match_num:
+            book_str = match_num.group(1) + ' ' + match_num.group(2)
+            book_str = book_str.title()
+        book_id = BOOK_MAP.get(book_str)
+    if not book_id:
+        raise ValueError("Unknown book name.")
+    return book_id, chapter, verse
+
+
+def legacy_resolve(ref):
+    """The old search path: legacy_parse_ref, then a difflib scan over every variant on a miss."""
+    try:
+        return legacy_parse_ref(ref)
+    except ValueError:
+        parts = re.sub(r'[^\w\s:]', '', ref.lower()).split()
+        ref_start = next(j for j, part in enumerate(parts) if re.sub(r'[:\-]', '', part).isdigit())
+        book_cand = ' '.join(parts[:ref_start])
+        closest = difflib.get_close_matches(book_cand, list(VARIANT_TO_FULL.keys()), n=1, cutoff=0.6)
+        ref_part = parts[ref_start:]
+        corrected = f"{VARIANT_TO_FULL[closest[0]]} {ref_part[0]}"
+        if len(ref_part) > 1:
+            corrected += f":{ref_part[1]}"
+        try:
+            return legacy_parse_ref(corrected)
+        except ValueError:
+            return None
+
+
+def bench(label, fn, refs):
+    seconds = timeit.timeit(lambda: [fn(ref) for ref in refs], number=REPEAT)
+    per_call = seconds / (REPEAT * len(refs)) * 1e6
+    print(f"{label:<40} {per_call:8.2f} us/ref")
+    return per_call
+
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.CRITICAL)
+    print(f"{REPEAT} iterations per case\n")
+    old = bench("legacy parse_ref, full names", legacy_parse_ref, FULL_NAME_REFS)
+    new = bench("trie parse_ref, full names", parse_ref, FULL_NAME_REFS)
+    print(f"{'speedup':<40} {old / new:8.2f}x\n")
+    old = bench("legacy regex + difflib, abbreviations", legacy_resolve, ABBREVIATED_REFS)
+    new = bench("trie parse_ref, abbreviations", parse_ref, ABBREVIATED_REFS)
+    print(f"{'speedup':<40} {old / new:8.2f}x")
@@ -0,0 +1,120 @@
+# bench_providers.py
+# Failure-mode benchmark for the provider chain: two stand-in servers (bolls.life and a mirror) with injected
+# stalls or outages, comparing lookup latency with the old single-server path against the chain with circuit
+# breakers and hedged requests. Every lookup is a chapter not yet cached, so each one goes to the network.
+#
+# Run from the project root:  python benchmarks/bench_providers.py
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSLATION = 'KJV'
+READ_TIMEOUT = 2.0  # Shortened from the app's 5 s so a stalled request resolves quickly here
+
+
+def percentile(samples, fraction):
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def single_server(key):
+    """The lookup path before the provider chain: one server, its timeout and retries, then an error."""
+    import bible_http
+    response = bible_http.get_chapter(*key)
+    response.raise_for_status()
+    return response.json()
+
+
+def drop_connections():
+    """Close pooled keep-alive connections, which a stopped server's handler threads would otherwise still answer."""
+    import bible_http
+    bible_http.get_session().close()
+    bible_http.get_direct_session().close()
+    bible_http._session = None
+    bible_http._direct_session = None
+
+
+def run(name, lookup, keys):
+    timings = []
+    failures = 0
+    for key in keys:
+        start = time.perf_counter()
+        try:
+            lookup(*key)
+        except Exception:
+            failures += 1
+        timings.append((time.perf_counter() - start) * 1000)
+    result = {'scenario': name, 'lookups': len(keys), 'failed': failures, 'p50_ms': percentile(timings, 0.5),
+              'p95_ms': percentile(timings, 0.95), 'max_ms': max(timings)}
+    print(f"{name:<44} {result['p50_ms']:8.0f} {result['p95_ms']:8.0f} {result['max_ms']:8.0f} {failures:7d}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lookups', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=30.0)
+    parser.add_argument('--hang-rate', type=float, default=0.05, help="share of primary requests that stall")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='bench_providers_'))
+    import logging
+    logging.disable(logging.CRITICAL)
+    import bible_http
+    import bible_providers
+    from bible_cache import chapter_cache
+    from bible_versification import CHAPTER_ORDINALS
+    from standin_server import StandinServer, StandinConfig
+
+    bible_http.TIMEOUTS['get-text'] = (1.0, READ_TIMEOUT)
+    primary = StandinServer(StandinConfig(latency_ms=args.latency_ms, jitter_ms=args.latency_ms / 3,
+                                          hang_rate=args.hang_rate, hang_seconds=READ_TIMEOUT + 1, seed=1))
+    mirror = StandinServer(StandinConfig(latency_ms=args.latency_ms * 1.5, jitter_ms=args.latency_ms / 3, seed=2))
+    bible_http.BASE_URL = primary.start()
+    mirror_url = mirror.start()
+    chapters = iter(list(CHAPTER_ORDINALS))
+
+    def fresh_keys():
+        chapter_cache.memory_max = 0
+        return [(TRANSLATION,) + next(chapters) for _ in range(args.lookups)]
+
+    def chain(hedge):
+        return bible_providers.ProviderChain(
+            [bible_providers.CacheProvider(), bible_providers.HttpProvider('primary'),
+             bible_providers.HttpProvider('mirror', mirror_url)], hedge=hedge)
+
+    print(f"{'scenario':<44} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'failed':>7}")
+    hedged = chain(True)
+    results = [
+        run("stalling primary: single server", lambda *key: single_server(key), fresh_keys()),
+        run("stalling primary: chain, failover only", chain(False).get_chapter, fresh_keys()),
+        run("stalling primary: chain, hedged", hedged.get_chapter, fresh_keys()),
+    ]
+    print(f"hedged chain counters: {hedged.counters}")
+    primary.stop()
+    drop_connections()
+    results.append(run("primary down: single server", lambda *key: single_server(key), fresh_keys()))
+    down = chain(True)
+    results.append(run("primary down: chain (breaker opens)", down.get_chapter, fresh_keys()))
+    mirror.stop()
+    drop_connections()
+    results.append(run("everything down: chain (breakers open)", down.get_chapter, fresh_keys()))
+    print(f"\ncircuits after the outage: {down.status()}")
+    print(f"chain counters: {down.counters}")
+    if args.json:
+        print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# bench_regex.py
+# Full-Bible regex scan on a synthetic full-size translation: a single-process loop over the corpus
+# store against bible_regex's sharded worker processes, for a few study-style patterns.
+#
+# Run from the project root:  python benchmarks/bench_regex.py [--workers 4]
+
+import os
+import re
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+TRANSLATION = 'SYN'
+PATTERNS = [r'lov(e|eth|ed)', r'\bking\w*\b.*\bpeace', r'^\w+ \w+ \w+\.$', r'(\w+) \1']
+RUNS = 5
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    os.chdir(tempfile.mkdtemp(prefix='bench_regex_'))
+    import logging
+    logging.disable(logging.CRITICAL)
+    import bible_store
+    import bible_regex
+    from bible_versification import CHAPTER_ORDINALS
+    from standin_server import fixture_chapter
+
+    for book_id, chapter in CHAPTER_ORDINALS:
+        bible_store.store_chapter(TRANSLATION, book_id, chapter, fixture_chapter(TRANSLATION, book_id, chapter))
+    verse_count = bible_store.mark_installed(TRANSLATION)
+    bible_regex.SCAN_WORKERS = args.workers
+
+    start = time.perf_counter()
+    bible_regex.prepare(TRANSLATION)
+    bible_regex.scan(TRANSLATION, r'\A\Z')
+    print(f"{verse_count} verses; {args.workers} workers started and loaded in "
+          f"{(time.perf_counter() - start) * 1000:.0f} ms\n")
+    print(f"{'pattern':<26} {'matches':>8} {'1 process ms':>13} {'sharded ms':>11}")
+    for pattern in PATTERNS:
+        compiled = re.compile(pattern, re.IGNORECASE)
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            serial = sum(1 for row in bible_store.all_verses(TRANSLATION)
+                         if compiled.search(bible_regex._MARKUP.sub('', row[3])))
+        serial_ms = (time.perf_counter() - start) / RUNS * 1000
+        start = time.perf_counter()
+        for _ in range(RUNS):
+            total, _ = bible_regex.scan(TRANSLATION, pattern)
+        sharded_ms = (time.perf_counter() - start) / RUNS * 1000
+        flag = '' if total == serial else '  MISMATCH'
+        print(f"{pattern:<26} {total:8d} {serial_ms:13.1f} {sharded_ms:11.1f}{flag}")
+
+
+if __name__ == "__main__":
+    main()
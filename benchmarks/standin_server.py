@@ -0,0 +1,221 @@
+# standin_server.py
+# Local stand-in for the bolls.life endpoints the app uses (/get-text/ and /v2/find/), with tunable
+# latency, jitter, error rate and hanging requests, so fetch paths can be measured offline.
+#
+# Run from the project root:  python benchmarks/standin_server.py --latency-ms 80 --jitter-ms 20
+# then start the app with BOLLS_BASE_URL=http://127.0.0.1:8765
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bible_versification import KJV_VERSE_COUNTS, verse_count  # noqa: E402
+
+WORDS = ['and', 'the', 'lord', 'said', 'unto', 'him', 'in', 'that', 'day', 'people', 'light', 'shall',
+         'be', 'upon', 'earth', 'his', 'word', 'grace', 'faith', 'love', 'spirit', 'water', 'bread',
+         'life', 'king', 'house', 'heaven', 'peace', 'truth', 'way', 'hope', 'mercy', 'glory', 'name']
+
+
+def fixture_chapter(translation, book_id, chapter):
+    """Deterministic verses for a chapter, with the real verse count so validation still applies."""
+    verses = []
+    for verse in range(1, verse_count(book_id, chapter, translation) + 1):
+        rng = random.Random(f"{translation}/{book_id}/{chapter}/{verse}")
+        words = rng.choices(WORDS, k=rng.randint(10, 30))
+        verses.append({'pk': book_id * 1000000 + chapter * 1000 + verse, 'verse': verse,
+                       'text': ' '.join(words).capitalize() + '.'})
+    return verses
+
+
+class StandinConfig:
+    """Behaviour knobs; may be changed while the server is running."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, hang_rate=0.0, hang_seconds=10.0,
+                 seed=0, corpus=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate  # Fraction of requests answered with 503
+        self.hang_rate = hang_rate  # Fraction of requests that stall past the client's read timeout
+        self.hang_seconds = hang_seconds
+        self.corpus = corpus  # Serve this installed translation from bible_corpus.db instead of fixtures
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def draw(self):
+        """Return (delay seconds, fault) for the next request from the seeded generator."""
+        with self.lock:
+            delay = max(0.0, self.latency_ms + self.rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+            roll = self.rng.random()
+        if roll < self.hang_rate:
+            return self.hang_seconds, 'hang'
+        if roll < self.hang_rate + self.error_rate:
+            return delay, 'error'
+        return delay, None
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real service
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes; don't add delayed-ACK stalls
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        server.count(url.path)
+        if url.path == '/_stats':
+            return self.send_json(server.snapshot())
+        delay, fault = server.config.draw()
+        time.sleep(delay)
+        if fault == 'error':
+            return self.send_json({'detail': 'Service unavailable'}, status=503)
+        match = re.fullmatch(r'/get-text/([^/]+)/(\d+)/(\d+)/?', url.path)
+        if match:
+            return self.get_text(match.group(1), int(match.group(2)), int(match.group(3)))
+        match = re.fullmatch(r'/v2/find/([^/]+)/?', url.path)
+        if match:
+            params = parse_qs(url.query)
+            return self.find(match.group(1), params.get('search', [''])[0], int(params.get('limit', ['50'])[0]))
+        self.send_json({'detail': 'Not found'}, status=404)
+
+    def get_text(self, translation, book_id, chapter):
+        verses = self.server.chapter(translation, book_id, chapter)
+        body = json.dumps(verses).encode('utf-8')
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_body(body, extra_headers={'ETag': etag})
+
+    def find(self, translation, query, limit):
+        query = query.lower()
+        results = []
+        total = 0
+        if query:
+            for book_id, counts in KJV_VERSE_COUNTS.items():
+                for chapter in range(1, len(counts) + 1):
+                    for verse in self.server.chapter(translation, book_id, chapter):
+                        if query in verse['text'].lower():
+                            total += 1
+                            if len(results) < limit:
+                                results.append({'pk': verse['pk'], 'translation': translation, 'book': book_id,
+                                                'chapter': chapter, 'verse': verse['verse'], 'text': verse['text']})
+        self.send_json({'exact_matches': total, 'total': total, 'results': results})
+
+    def send_json(self, data, status=200):
+        self.send_body(json.dumps(data).encode('utf-8'), status=status)
+
+    def send_body(self, body, status=200, extra_headers=None):
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body)
+            encoding = 'gzip'
+        else:
+            encoding = None
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StandinServer(ThreadingHTTPServer):
+    """Threaded stand-in server; start() runs it in the background and returns its base URL."""
+
+    daemon_threads = True
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        super().__init__((host, port), StandinHandler)
+        self.config = config or StandinConfig()
+        self.counts = {}
+        self._chapters = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, path):
+        endpoint = path.strip('/').split('/')[0] or '/'
+        if endpoint == 'v2':
+            endpoint = 'find'
+        with self._lock:
+            self.counts[endpoint] = self.counts.get(endpoint, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self.counts)
+
+    def chapter(self, translation, book_id, chapter):
+        key = (translation, book_id, chapter)
+        with self._lock:
+            verses = self._chapters.get(key)
+        if verses is None:
+            if self.config.corpus:
+                import bible_store
+                verses = [dict(v, pk=i) for i, v in
+                          enumerate(bible_store.get_chapter(self.config.corpus, book_id, chapter) or [])]
+            else:
+                verses = fixture_chapter(translation, book_id, chapter)
+            with self._lock:
+                self._chapters[key] = verses
+        return verses
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return  # The client gave up on a stalled request; nothing to report
+        super().handle_error(request, client_address)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve /get-text/ and /v2/find/ locally for benchmarks.")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument('--hang-rate', type=float, default=0.0, help="fraction of requests that never answer in time")
+    parser.add_argument('--hang-seconds', type=float, default=10.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--corpus', help="serve an installed translation from bible_corpus.db instead of fixtures")
+    args = parser.parse_args()
+    config = StandinConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.hang_rate, args.hang_seconds,
+                           args.seed, args.corpus)
+    server = StandinServer(config, port=args.port)
+    print(f"Serving bolls.life stand-in on {server.url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+# bible_books.py
+# Canonical book-name aliases and a prefix trie that resolves them in a single pass.
+
+import re
+
+BOOK_VARIANTS = {
+    'Genesis': ['Gen', 'Ge', 'Gn'],
+    'Exodus': ['Exod', 'Ex'],
+    'Leviticus': ['Lev', 'Lv', 'Le'],
+    'Numbers': ['Num', 'Nm', 'Nu'],
+    'Deuteronomy': ['Deut', 'Dt', 'De', 'Du'],
+    'Joshua': ['Josh', 'Jos', 'Jo'],
+    'Judges': ['Judg', 'Jdg', 'Jgs'],
+    'Ruth': ['Ruth', 'Ru'],
+    '1 Samuel': ['1 Sam', '1 Sm', '1 Sa', '1Sam', '1Sa', '1S'],
+    '2 Samuel': ['2 Sam', '2 Sm', '2 Sa', '2Sam', '2Sa', '2S'],
+    '1 Kings': ['1 Kgs', '1 Kg', '1 Ki', '1Kgs', '1Kin', '1Ki', '1K'],
+    '2 Kings': ['2 Kgs', '2 Kg', '2 Ki', '2Kgs', '2Kin', '2Ki', '2K'],
+    '1 Chronicles': ['1 Chr', '1 Ch', '1Chron', '1Chr', '1Ch'],
+    '2 Chronicles': ['2 Chr', '2 Ch', '2Chron', '2Chr', '2Ch'],
+    'Ezra': ['Ezra', 'Ezr', 'Ez'],
+    'Nehemiah': ['Neh', 'Ne'],
+    'Esther': ['Esth', 'Est', 'Es'],
+    'Job': ['Job', 'Jb'],
+    'Psalms': ['Psalm', 'Ps', 'Pss', 'Pslm', 'Psa', 'Psm'],
+    'Proverbs': ['Prov', 'Prv', 'Pr'],
+    'Ecclesiastes': ['Eccl', 'Eccles', 'Ec', 'Qoh'],
+    'Song of Solomon': ['Song of Songs', 'Canticles', 'Song', 'Ss', 'So', 'Sg', 'Cant', 'Can'],
+    'Isaiah': ['Isa', 'Is'],
+    'Jeremiah': ['Jer', 'Je', 'Jr'],
+    'Lamentations': ['Lam', 'La'],
+    'Ezekiel': ['Ezek', 'Ezk', 'Ez'],
+    'Daniel': ['Dan', 'Dn', 'Da'],
+    'Hosea': ['Hos', 'Ho'],
+    'Joel': ['Joel', 'Jl'],
+    'Amos': ['Amos', 'Am'],
+    'Obadiah': ['Obad', 'Ob'],
+    'Jonah': ['Jonah', 'Jnh', 'Jon'],
+    'Micah': ['Mic', 'Mc'],
+    'Nahum': ['Nah', 'Na'],
+    'Habakkuk': ['Hab', 'Hb'],
+    'Zephaniah': ['Zeph', 'Zep', 'Zp'],
+    'Haggai': ['Hag', 'Hg'],
+    'Zechariah': ['Zech', 'Zec', 'Zc'],
+    'Malachi': ['Mal', 'Ml'],
+    'Matthew': ['Matt', 'Mat', 'Mt'],
+    'Mark': ['Mark', 'Mrk', 'Mar', 'Mk', 'Mr'],
+    'Luke': ['Luke', 'Lk'],
+    'John': ['John', 'Jhn', 'Jn', 'Joh'],
+    'Acts': ['Acts', 'Act', 'Ac'],
+    'Romans': ['Rom', 'Ro', 'Rm'],
+    '1 Corinthians': ['1 Cor', '1 Co', '1Cor', '1Co'],
+    '2 Corinthians': ['2 Cor', '2 Co', '2Cor', '2Co'],
+    'Galatians': ['Gal', 'Ga'],
+    'Ephesians': ['Eph', 'Ephes'],
+    'Philippians': ['Phil', 'Php', 'Pp'],
+    'Colossians': ['Colossions', 'Col', 'Co'],
+    '1 Thessalonians': ['1 Thess', '1 Thes', '1 Th', '1Thess', '1Thes', '1Th'],
+    '2 Thessalonians': ['2 Thess', '2 Thes', '2 Th', '2Thess', '2Thes', '2Th'],
+    '1 Timothy': ['1 Tim', '1 Tm', '1 Ti', '1T'],
+    '2 Timothy': ['2 Tim', '2 Tm', '2 Ti', '2T'],
+    'Titus': ['Titus', 'Tit', 'Ti'],
+    'Philemon': ['Phlm', 'Phm'],
+    'Hebrews': ['Heb', 'He'],
+    'James': ['Jas', 'Ja'],
+    '1 Peter': ['1 Pet', '1 Pt', '1P'],
+    '2 Peter': ['2 Pet', '2 Pt', '2P'],
+    '1 John': ['1 John', '1 Jn', '1 Jo', '1J', '1John', '1Jn', '1Jo'],
+    '2 John': ['2 John', '2 Jn', '2 Jo', '2J'],
+    '3 John': ['3 John', '3 Jn', '3 Jo', '3J'],
+    'Jude': ['Jude', 'Ju'],
+    'Revelation': ['Revelations', 'Rev', 'Re', 'Rv']
+}
+
+VARIANT_TO_FULL = {}
+for full, abbrevs in BOOK_VARIANTS.items():
+    VARIANT_TO_FULL[full.lower()] = full
+    for ab in abbrevs:
+        VARIANT_TO_FULL[ab.lower()] = full
+
+# Spellings of the ordinal that can precede a numbered book ("1 John", "I John", "First John", "1st John")
+ORDINAL_FORMS = {
+    '1': ['1', 'I', 'First', '1st'],
+    '2': ['2', 'II', 'Second', '2nd'],
+    '3': ['3', 'III', 'Third', '3rd'],
+}
+
+_END = None  # Trie key holding the book id of an alias that ends at this node
+
+
+def normalize_alias(alias):
+    """Lowercase an alias and drop spaces and periods, the form stored in the trie."""
+    return re.sub(r'[\s.]', '', alias.lower())
+
+
+def book_aliases(book_map, variants=BOOK_VARIANTS):
+    """Yield (alias, book_id) for every full name and abbreviation, then every ordinal form.
+
+    Written-out ordinals come last so they never take an alias from another book ("I Sa" vs "Isa").
+    """
+    for full, book_id in book_map.items():
+        for name in [full] + variants.get(full, []):
+            yield name, book_id
+    for full, book_id in book_map.items():
+        for name in [full] + variants.get(full, []):
+            match = re.match(r'([1-3])\s*(\D+)$', name)
+            if match and len(match.group(2).strip()) >= 2:
+                for ordinal in ORDINAL_FORMS[match.group(1)][1:]:
+                    yield f"{ordinal} {match.group(2).strip()}", book_id
+
+
+class BookIndex:
+    """Prefix trie over every book alias, built once at import time.
+
+    match() walks the trie once from a starting position, ignoring spaces and periods inside
+    an alias, and returns the longest alias that ends on a word boundary.
+    """
+
+    def __init__(self, book_map, variants=BOOK_VARIANTS):
+        self.root = {}
+        self.aliases = {}
+        for alias, book_id in book_aliases(book_map, variants):
+            key = normalize_alias(alias)
+            if key in self.aliases and self.aliases[key] != book_id:
+                continue  # First book to claim an ambiguous abbreviation keeps it
+            self.aliases[key] = book_id
+            node = self.root
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_END] = book_id
+
+    def match(self, text, pos=0):
+        """Return (book_id, end) for the longest alias at text[pos:], or (None, pos)."""
+        node = self.root
+        best = (None, pos)
+        i = pos
+        n = len(text)
+        while i < n:
+            ch = text[i]
+            if ch == ' ' or ch == '.':
+                i += 1
+                continue
+            node = node.get(ch.lower())
+            if node is None:
+                break
+            i += 1
+            if _END in node and (i == n or not text[i].isalpha()):
+                best = (node[_END], i)
+        return best
+
+    def resolve(self, name):
+        """Return the book id for a complete book name or alias, or None."""
+        return self.aliases.get(normalize_alias(name))
+
+
+def osa_distance(a, b, max_distance=None):
+    """Damerau-Levenshtein distance (optimal string alignment): edits plus adjacent transpositions.
+
+    With max_distance set, gives up early and returns max_distance + 1 once the bound is exceeded.
+    """
+    if a == b:
+        return 0
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    # A shared prefix or suffix never changes the distance, and typos rarely touch both ends
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) or len(b)
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        cur = [i]
+        left = i
+        for j in range(1, len(b) + 1):
+            cb = b[j - 1]
+            value = prev[j - 1] if ca == cb else prev[j - 1] + 1
+            if prev[j] + 1 < value:
+                value = prev[j] + 1
+            if left + 1 < value:
+                value = left + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb and prev2[j - 2] + 1 < value:
+                value = prev2[j - 2] + 1
+            cur.append(value)
+            left = value
+        if max_distance is not None and min(cur) > max_distance and min(prev) > max_distance:
+            return max_distance + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def bigrams(word):
+    """Return the set of letter pairs in word, padded so the first and last letters count too."""
+    padded = f"^{word}$"
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class NgramIndex:
+    """Bigram posting lists over normalized aliases for bounded edit-distance lookups.
+
+    A single edit or transposition can remove at most three of a word's bigrams, so an alias
+    within k edits must share all but 3k of them. Only aliases passing that count are checked
+    with a bounded osa_distance, which keeps a lookup to a few dozen comparisons.
+    """
+
+    def __init__(self, aliases):
+        self.entries = list(aliases.items())
+        self.postings = {}
+        for entry_id, (word, _) in enumerate(self.entries):
+            for gram in bigrams(word):
+                self.postings.setdefault(gram, []).append(entry_id)
+
+    def search(self, word, max_distance):
+        """Return [(distance, alias, book_id)] for every alias within max_distance of word."""
+        grams = bigrams(word)
+        required = len(grams) - 3 * max_distance
+        if required > 0:
+            shared = {}
+            for gram in grams:
+                for entry_id in self.postings.get(gram, ()):
+                    shared[entry_id] = shared.get(entry_id, 0) + 1
+            candidates = [entry_id for entry_id, count in shared.items() if count >= required]
+        else:
+            candidates = range(len(self.entries))  # Too short to filter on shared bigrams
+        found = []
+        for entry_id in candidates:
+            alias, book_id = self.entries[entry_id]
+            d = osa_distance(word, alias, max_distance)
+            if d <= max_distance:
+                found.append((d, alias, book_id))
+        return found
+
+
+def max_typos(word):
+    """Edit budget for a typed book name: one typo in short words, two in longer ones."""
+    if len(word) <= 2:
+        return 0
+    return 1 if len(word) <= 5 else 2
+
+
+class BookSuggester:
+    """Ranked book suggestions for partial or misspelled names, built once from a BookIndex."""
+
+    def __init__(self, index):
+        self.index = index
+        self.ngrams = NgramIndex(index.aliases)
+
+    def completions(self, prefix):
+        """Return book ids with an alias starting with prefix, in canonical order."""
+        node = self.index.root
+        for ch in normalize_alias(prefix):
+            node = node.get(ch)
+            if node is None:
+                return []
+        found = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for ch, child in node.items():
+                if ch is _END:
+                    found.add(child)
+                else:
+                    stack.append(child)
+        return sorted(found)
+
+    def suggest(self, text, limit=5, max_distance=None):
+        """Return up to limit book ids for text, best first.
+
+        An exact alias ranks first, then books the text is a prefix of, then fuzzy matches by
+        edit distance (ties go to the longer, more specific alias).
+        """
+        word = normalize_alias(text)
+        if not word:
+            return []
+        if max_distance is None:
+            max_distance = max_typos(word)
+        ranked = []
+        exact = self.index.aliases.get(word)
+        if exact:
+            ranked.append(exact)
+        ranked.extend(self.completions(word))
+        if max_distance:
+            fuzzy = sorted(self.ngrams.search(word, max_distance), key=lambda hit: (hit[0], -len(hit[1])))
+            ranked.extend(book_id for _, _, book_id in fuzzy)
+        suggestions = []
+        for book_id in ranked:
+            if book_id not in suggestions:
+                suggestions.append(book_id)
+                if len(suggestions) == limit:
+                    break
+        return suggestions
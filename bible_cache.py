@@ -0,0 +1,211 @@
+# bible_cache.py
+# Two-tier cache for bolls.life chapters: a bounded in-memory LRU in front of a persistent on-disk store.
+
+import json
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+CACHE_DIR = 'bible_cache'
+MEMORY_MAX_CHAPTERS = 64
+DISK_MAX_BYTES = 50 * 1024 * 1024  # 50 MB
+DISK_TTL_SECONDS = 7 * 24 * 3600  # Revalidate disk entries older than a week
+
+
+class ChapterCache:
+    """Cache of parsed chapters keyed by (translation, book_id, chapter)."""
+
+    def __init__(self, cache_dir=CACHE_DIR, memory_max=MEMORY_MAX_CHAPTERS, disk_max_bytes=DISK_MAX_BYTES,
+                 ttl=DISK_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.memory_max = memory_max
+        self.disk_max_bytes = disk_max_bytes
+        self.ttl = ttl
+        self._memory = OrderedDict()
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        self.counters = {'memory_hits': 0, 'disk_hits': 0, 'revalidated': 0, 'misses': 0}
+
+    def _path(self, key):
+        translation, book_id, chapter = key
+        return os.path.join(self.cache_dir, f"{translation}_{book_id}_{chapter}.json")
+
+    def _remember(self, key, data):
+        self._memory[key] = data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max:
+            self._memory.popitem(last=False)
+
+    def _read_entry(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logging.error(f"Failed to read cache entry {key}: {str(e)}")
+            return None
+
+    def get(self, key):
+        """Return fresh cached chapter data, or None if it must be fetched or revalidated."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.counters['memory_hits'] += 1
+                return self._memory[key]
+            entry = self._read_entry(key)
+            if entry and time.time() - entry.get('fetched_at', 0) < self.ttl:
+                self._remember(key, entry['data'])
+                self.counters['disk_hits'] += 1
+                return entry['data']
+            self.counters['misses'] += 1
+            return None
+
+    def contains(self, key):
+        """Return True if a fresh copy is cached, without touching the hit/miss counters."""
+        with self._lock:
+            if key in self._memory:
+                return True
+            try:
+                return time.time() - os.path.getmtime(self._path(key)) < self.ttl
+            except OSError:
+                return False
+
+    def validators(self, key):
+        """Return conditional request headers for a stale disk entry, if it has any."""
+        entry = self._read_entry(key)
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def revalidated(self, key):
+        """Mark a stale disk entry as fresh after a 304 Not Modified and return its data."""
+        with self._lock:
+            entry = self._read_entry(key)
+            if entry is None:
+                return None
+            entry['fetched_at'] = time.time()
+            self._write_entry(key, entry)
+            self._remember(key, entry['data'])
+            self.counters['revalidated'] += 1
+            return entry['data']
+
+    def get_stale(self, key):
+        """Return a disk entry's data however old it is, as a last resort when it cannot be refreshed."""
+        with self._lock:
+            entry = self._read_entry(key)
+            return entry['data'] if entry else None
+
+    def put(self, key, data, etag=None, last_modified=None):
+        """Store freshly fetched chapter data in both tiers."""
+        with self._lock:
+            self._remember(key, data)
+            self._write_entry(key, {
+                'etag': etag,
+                'last_modified': last_modified,
+                'fetched_at': time.time(),
+                'data': data
+            })
+
+    def _write_entry(self, key, entry):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            path = self._path(key)
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_disk_bytes()
+            else:
+                self._disk_bytes += os.path.getsize(path) - old_size
+            if self._disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+        except Exception as e:
+            logging.error(f"Failed to write cache entry {key}: {str(e)}")
+
+    def _scan_disk_bytes(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.cache_dir) if entry.name.endswith('.json'))
+
+    def _evict_disk(self):
+        """Delete the least recently written entries until the disk tier fits its size limit."""
+        entries = sorted((e for e in os.scandir(self.cache_dir) if e.name.endswith('.json')),
+                         key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if total <= self.disk_max_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+        self._disk_bytes = total
+        logging.debug(f"Evicted chapter cache down to {total} bytes")
+
+    def clear(self):
+        """Empty both tiers and reset the counters."""
+        with self._lock:
+            self._memory.clear()
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith('.json'):
+                        os.remove(entry.path)
+            self._disk_bytes = 0
+            for name in self.counters:
+                self.counters[name] = 0
+
+    def remove_translation(self, translation):
+        """Drop every cached chapter of one translation from both tiers."""
+        with self._lock:
+            for key in [key for key in self._memory if key[0] == translation]:
+                del self._memory[key]
+            if os.path.isdir(self.cache_dir):
+                for entry in os.scandir(self.cache_dir):
+                    if entry.name.endswith('.json') and entry.name.rsplit('_', 2)[0] == translation:
+                        os.remove(entry.path)
+            self._disk_bytes = None
+
+    def stats(self):
+        """Return hit/miss counters plus the overall hit ratio."""
+        with self._lock:
+            stats = dict(self.counters)
+        lookups = sum(stats.values())
+        hits = stats['memory_hits'] + stats['disk_hits'] + stats['revalidated']
+        stats['hit_ratio'] = hits / lookups if lookups else 0.0
+        return stats
+
+    def log_stats(self):
+        stats = self.stats()
+        logging.info(f"Chapter cache: {stats['memory_hits']} memory hits, {stats['disk_hits']} disk hits, "
+                     f"{stats['revalidated']} revalidated, {stats['misses']} misses "
+                     f"(hit ratio {stats['hit_ratio']:.0%})")
+
+
+chapter_cache = ChapterCache()
+
+
+def configure(settings):
+    """Apply cache limits from sermon['settings'] ('cache_memory_chapters', 'cache_max_mb', 'cache_ttl_days')."""
+    if settings.get('cache_memory_chapters'):
+        chapter_cache.memory_max = int(settings['cache_memory_chapters'])
+    if settings.get('cache_max_mb'):
+        chapter_cache.disk_max_bytes = int(float(settings['cache_max_mb']) * 1024 * 1024)
+    if settings.get('cache_ttl_days'):
+        chapter_cache.ttl = float(settings['cache_ttl_days']) * 24 * 3600
+    logging.debug(f"Chapter cache configured: {chapter_cache.memory_max} chapters in memory, "
+                  f"{chapter_cache.disk_max_bytes} bytes on disk, TTL {chapter_cache.ttl}s")
@@ -0,0 +1,206 @@
+# bible_compare.py
+# Side-by-side view of one passage in several translations, fetched concurrently and aligned by verse.
+
+import time
+import logging
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QCheckBox, \
+    QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+from PyQt6.QtCore import Qt, QThreadPool
+from bible_utils import REVERSE_BOOK_MAP, available_translations, parse_refs, format_range, range_chapters, load_chapters
+from bible_workers import FetchWorker
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+
+def compare_passages(ranges, translations):
+    """Fetch every chapter the ranges need in every translation on one bounded pool.
+
+    Returns {translation: {(book_id, chapter): verses or exception}}. Chapters already in the
+    corpus store or chapter cache are served from there.
+    """
+    start = time.time()
+    chapters = range_chapters(ranges)
+    loaded = load_chapters([(translation, book_id, chapter) for translation in translations
+                            for book_id, chapter in chapters])
+    logging.debug(f"Loaded {len(chapters)} chapters in {len(translations)} translations "
+                  f"in {time.time() - start:.2f}s")
+    result = {translation: {} for translation in translations}
+    for (translation, book_id, chapter), data in loaded.items():
+        result[translation][(book_id, chapter)] = data
+    return result
+
+
+def aligned_rows(ranges, translations, loaded):
+    """Return [(label, [text per translation])] with one row per verse number in the ranges.
+
+    Verses missing from a translation get an empty cell; a chapter that failed to load shows
+    the error in its first row.
+    """
+    rows = []
+    for r in ranges:
+        for chapter in range(r.start_chapter, r.end_chapter + 1):
+            by_translation = []
+            verse_numbers = set()
+            for translation in translations:
+                data = loaded[translation][(r.book_id, chapter)]
+                if isinstance(data, Exception):
+                    by_translation.append(data)
+                    continue
+                verses = {int(v['verse']): v['text'] for v in data}
+                by_translation.append(verses)
+                verse_numbers.update(verses)
+            first = r.start_verse if chapter == r.start_chapter and r.start_verse is not None else 1
+            last = r.end_verse if chapter == r.end_chapter and r.end_verse is not None else None
+            numbers = sorted(n for n in verse_numbers if n >= first and (last is None or n <= last)) or [first]
+            book = REVERSE_BOOK_MAP.get(r.book_id, 'Unknown')
+            for i, number in enumerate(numbers):
+                cells = []
+                for verses in by_translation:
+                    if isinstance(verses, Exception):
+                        cells.append(f"Error fetching: {str(verses)}" if i == 0 else "")
+                    else:
+                        cells.append(verses.get(number, ""))
+                rows.append((f"{book} {chapter}:{number}", cells))
+    return rows
+
+
+class BibleCompareDialog(QDialog):
+    def __init__(self, parent=None, ref=""):
+        super().__init__(parent)
+        self.parent = parent
+        self.setWindowTitle("Compare Translations")
+        self.setMinimumSize(1000, 600)
+        self.setWindowFlags(Qt.WindowType.Window | Qt.WindowType.WindowMinMaxButtonsHint | Qt.WindowType.WindowCloseButtonHint | Qt.WindowType.WindowTitleHint | Qt.WindowType.WindowSystemMenuHint)
+        self.setModal(False)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.request_id = 0
+        self.pending_worker = None
+        self.pending_ranges = None
+        self.pending_translations = None
+        self.setup_ui()
+        if ref:
+            self.ref_input.setText(ref)
+            self.compare()
+
+    def setup_ui(self):
+        """Set up the dialog UI."""
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        ref_layout = QHBoxLayout()
+        self.ref_input = QLineEdit()
+        self.ref_input.setPlaceholderText("Chapter or passage (e.g., John 3, Ps 23:1-6, Rom 8:28; 12:1-2)")
+        self.ref_input.returnPressed.connect(self.compare)
+        ref_layout.addWidget(QLabel("Passage:"))
+        ref_layout.addWidget(self.ref_input)
+        compare_btn = QPushButton("Compare")
+        compare_btn.setStyleSheet(
+            "background-color: #007bff; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
+        compare_btn.clicked.connect(self.compare)
+        ref_layout.addWidget(compare_btn)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setStyleSheet("color: #ffc107;")
+        self.loading_label.hide()
+        ref_layout.addWidget(self.loading_label)
+        layout.addLayout(ref_layout)
+
+        # One checkbox per translation; installed translations outside the standard list are offered too
+        translations_layout = QHBoxLayout()
+        translations_layout.addWidget(QLabel("Translations:"))
+        self.translation_boxes = []
+        default = self.parent.sermon['settings'].get('default_translation', 'WEB') if self.parent else 'WEB'
+        for translation in available_translations():
+            box = QCheckBox(translation)
+            box.setChecked(translation in (default, 'KJV', 'WEB', 'ASV'))
+            translations_layout.addWidget(box)
+            self.translation_boxes.append(box)
+        translations_layout.addStretch()
+        layout.addLayout(translations_layout)
+
+        # A single table keeps every translation on the same verse row and scrolls them together
+        self.table = QTableWidget()
+        self.table.setWordWrap(True)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setStyleSheet("background-color: #2c2f33; color: #ffffff; border: 1px solid #444;")
+        layout.addWidget(self.table)
+
+    def selected_translations(self):
+        return [box.text() for box in self.translation_boxes if box.isChecked()]
+
+    def compare(self):
+        """Parse the passage and load it in every checked translation on the worker pool."""
+        text = self.ref_input.text().strip()
+        translations = self.selected_translations()
+        if not text:
+            QMessageBox.warning(self, "Empty Input", "Please enter a chapter or passage.")
+            return
+        if not translations:
+            QMessageBox.warning(self, "No Translations", "Please select at least one translation.")
+            return
+        try:
+            ranges = parse_refs(text)
+        except ValueError as e:
+            QMessageBox.warning(self, "Invalid Reference", str(e))
+            return
+        logging.debug(f"Comparing {', '.join(format_range(r) for r in ranges)} in {translations}")
+        if self.pending_worker is not None:
+            self.pending_worker.cancel(self.thread_pool)
+        self.request_id += 1
+        worker = FetchWorker(self.request_id, compare_passages, ranges, translations)
+        worker.signals.finished.connect(self.on_compare_finished)
+        worker.signals.failed.connect(self.on_compare_failed)
+        self.pending_worker = worker
+        self.pending_ranges = ranges
+        self.pending_translations = translations
+        self.loading_label.show()
+        self.thread_pool.start(worker)
+
+    def on_compare_finished(self, request_id, loaded):
+        """Fill the table unless a newer comparison has been started."""
+        if request_id != self.request_id:
+            logging.debug(f"Discarding superseded comparison {request_id}")
+            return
+        self.pending_worker = None
+        self.loading_label.hide()
+        try:
+            rows = aligned_rows(self.pending_ranges, self.pending_translations, loaded)
+            self.table.clear()
+            self.table.setColumnCount(len(self.pending_translations))
+            self.table.setHorizontalHeaderLabels(self.pending_translations)
+            self.table.setRowCount(len(rows))
+            self.table.setVerticalHeaderLabels([label for label, _ in rows])
+            for row, (_, cells) in enumerate(rows):
+                for column, text in enumerate(cells):
+                    item = QTableWidgetItem(text)
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignLeft)
+                    self.table.setItem(row, column, item)
+            self.table.resizeRowsToContents()
+            self.table.scrollToTop()
+        except Exception as e:
+            logging.error(f"Failed to display comparison: {str(e)}")
+            QMessageBox.warning(self, "Compare Error", f"Failed to display comparison: {str(e)}")
+
+    def on_compare_failed(self, request_id, error):
+        if request_id != self.request_id:
+            return
+        self.pending_worker = None
+        self.loading_label.hide()
+        logging.error(f"Failed to compare translations: {str(error)}")
+        QMessageBox.warning(self, "Compare Error", f"Failed to load passage: {str(error)}")
+
+    def done(self, result):
+        """Drop any comparison still loading before closing."""
+        if self.pending_worker is not None:
+            self.pending_worker.cancel(self.thread_pool)
+        self.request_id += 1
+        super().done(result)
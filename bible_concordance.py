@@ -0,0 +1,209 @@
+# bible_concordance.py
+# Concordance of an installed translation: for every word, the verses it occurs in and how often per book.
+# Data only, with no Qt imports, so scripts can use it; the dialog is in concordance_dialog.py.
+
+import os
+import sys
+import time
+import pickle
+import logging
+from array import array
+from bisect import bisect_left
+import bible_store
+from bible_index import tokenize, BackgroundLoader
+from bible_utils import REVERSE_BOOK_MAP
+from bible_versification import ordinal, ordinal_ref
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+CONCORDANCE_DIR = 'bible_concordance'
+CONCORDANCE_VERSION = 1
+BOOK_COUNT = 66
+
+
+def concordance_path(translation):
+    return os.path.join(CONCORDANCE_DIR, f"{translation}.conc")
+
+
+def build_concordance(translation):
+    """Build and save the concordance for an installed translation; returns the Concordance."""
+    info = bible_store.translation_info(translation)
+    if info is None:
+        raise ValueError(f"{translation} is not installed")
+    start = time.time()
+    postings = {}  # word -> [ordinals], one per verse
+    counts = {}  # word -> occurrences per book (index book_id - 1)
+    skipped = 0
+    for book_id, chapter, verse, text in bible_store.all_verses(translation):
+        n = ordinal(book_id, chapter, verse)
+        if n is None:
+            skipped += 1
+            continue
+        for word in tokenize(text):
+            ordinals = postings.get(word)
+            if ordinals is None:
+                ordinals = postings[word] = array('I')
+                counts[word] = array('I', bytes(4 * BOOK_COUNT))
+            if not ordinals or ordinals[-1] != n:
+                ordinals.append(n)
+            counts[word][book_id - 1] += 1
+    words = sorted(postings)
+    offsets = array('I', [0])
+    all_ordinals = array('I')
+    book_counts = array('I')
+    for word in words:
+        all_ordinals.extend(postings[word])
+        offsets.append(len(all_ordinals))
+        book_counts.extend(counts[word])
+    data = {
+        'version': CONCORDANCE_VERSION,
+        'translation': translation,
+        'source': tuple(info),
+        'words': words,
+        'offsets': offsets,
+        'ordinals': all_ordinals,
+        'book_counts': book_counts,
+    }
+    os.makedirs(CONCORDANCE_DIR, exist_ok=True)
+    path = concordance_path(translation)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    if skipped:
+        logging.warning(f"{skipped} {translation} verses are outside the verse table and were not indexed")
+    logging.info(f"Built concordance for {translation}: {len(words)} words in {time.time() - start:.1f}s")
+    return Concordance(data)
+
+
+class Concordance:
+    """Array-backed word postings: verse ordinals per word, and occurrence counts per word and book."""
+
+    def __init__(self, data):
+        self.translation = data['translation']
+        self.source = data['source']
+        self.words = data['words']
+        self._offsets = data['offsets']
+        self._ordinals = data['ordinals']
+        self._book_counts = data['book_counts']
+        self._index = {word: i for i, word in enumerate(self.words)}
+
+    def __contains__(self, word):
+        return word.lower() in self._index
+
+    def __len__(self):
+        return len(self.words)
+
+    def ordinals(self, word):
+        """Return the canonical ordinals of the verses containing word, in canonical order."""
+        i = self._index.get(word.lower())
+        if i is None:
+            return array('I')
+        return self._ordinals[self._offsets[i]:self._offsets[i + 1]]
+
+    def refs(self, word, book_id=None):
+        """Return [(book_id, chapter, verse)] of the verses containing word, optionally in one book."""
+        refs = [ordinal_ref(n) for n in self.ordinals(word)]
+        if book_id is not None:
+            refs = [ref for ref in refs if ref[0] == book_id]
+        return refs
+
+    def book_counts(self, word):
+        """Return {book_id: occurrences} for the books word occurs in, in canonical order."""
+        i = self._index.get(word.lower())
+        if i is None:
+            return {}
+        counts = self._book_counts[i * BOOK_COUNT:(i + 1) * BOOK_COUNT]
+        return {book_id: count for book_id, count in enumerate(counts, 1) if count}
+
+    def occurrences(self, word):
+        """Return how many times word occurs in the whole translation."""
+        return sum(self.book_counts(word).values())
+
+    def words_with_prefix(self, prefix, limit=50):
+        prefix = prefix.lower()
+        start = bisect_left(self.words, prefix)
+        matches = []
+        for word in self.words[start:]:
+            if not word.startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(word)
+        return matches
+
+    def most_frequent(self, limit=20, book_id=None):
+        """Return [(word, occurrences)] for the commonest words, in the whole Bible or one book."""
+        if book_id is None:
+            totals = [sum(self._book_counts[i * BOOK_COUNT:(i + 1) * BOOK_COUNT]) for i in range(len(self.words))]
+        else:
+            totals = self._book_counts[book_id - 1::BOOK_COUNT]
+        ranked = sorted(range(len(self.words)), key=totals.__getitem__, reverse=True)[:limit]
+        return [(self.words[i], totals[i]) for i in ranked if totals[i]]
+
+
+def load_concordance(translation):
+    """Load a saved concordance, or return None if it is missing or older than the installed translation."""
+    info = bible_store.translation_info(translation)
+    if info is None:
+        return None
+    try:
+        with open(concordance_path(translation), 'rb') as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.error(f"Failed to load concordance for {translation}: {str(e)}")
+        return None
+    if data.get('version') != CONCORDANCE_VERSION or data.get('source') != tuple(info):
+        logging.debug(f"Concordance for {translation} is out of date")
+        return None
+    return Concordance(data)
+
+
+_concordances = BackgroundLoader("concordance", load_concordance, build_concordance)
+
+
+def prepare(translation):
+    """Load or build the concordance for an installed translation in the background; returns immediately."""
+    _concordances.prepare(translation)
+
+
+def get_concordance(translation):
+    """Return the concordance of an installed translation, loading or building it on first use. Blocks.
+
+    A missing or stale concordance is built in the background build process. For scripting, e.g.:
+    get_concordance('KJV').book_counts('grace')
+    """
+    if not bible_store.is_installed(translation):
+        raise ValueError(f"The concordance works from an installed translation. "
+                         f"Install {translation} with: python bible_store.py import {translation}")
+    concordance = _concordances.wait(translation)
+    if concordance is None:
+        raise RuntimeError(f"Failed to build the concordance for {translation}; see sermon.log")
+    return concordance
+
+
+def remove_concordance(translation):
+    """Forget and delete a translation's saved concordance."""
+    _concordances.forget(translation)
+    if os.path.exists(concordance_path(translation)):
+        os.remove(concordance_path(translation))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == 'build':
+        print(f"Built concordance with {len(build_concordance(sys.argv[2]))} words")
+    elif len(sys.argv) == 4 and sys.argv[1] == 'word':
+        concordance = get_concordance(sys.argv[2])
+        word = sys.argv[3]
+        for book_id, count in concordance.book_counts(word).items():
+            print(f"{REVERSE_BOOK_MAP.get(book_id, 'Unknown'):<20} {count:6}")
+        print(f"{concordance.occurrences(word)} occurrences in {len(concordance.ordinals(word))} verses")
+    else:
+        print("Usage: python bible_concordance.py build <TRANSLATION> | word <TRANSLATION> <word>")
@@ -0,0 +1,216 @@
+# bible_download.py
+# Downloads a whole translation from bolls.life into the corpus store with bounded concurrency and a rate limit.
+
+import sys
+import time
+import argparse
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import bible_http
+import bible_store
+from bible_utils import BOOK_MAP, BOOK_CHAPTERS
+from bible_versification import verse_count, family
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+DOWNLOAD_WORKERS = 4
+DOWNLOAD_RATE = 8.0  # Chapter requests per second, shared by all workers
+STAGING_SUFFIX = '~download'  # Chapters are stored under this name until the download is complete, e.g. 'KJV~download'
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` acquisitions per second on average, in bursts of at most `burst`."""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def translation_chapters():
+    """Return every (book_id, chapter) a complete translation has, in canonical order."""
+    return [(book_id, chapter) for book, book_id in BOOK_MAP.items() for chapter in range(1, BOOK_CHAPTERS[book] + 1)]
+
+
+class DownloadManager:
+    """Fetches the chapters of a translation that are not stored yet, then marks it installed.
+
+    Each chapter is committed to a staging copy in the corpus store as soon as it arrives, so the
+    store itself is the checkpoint: running the same download again only fetches what is still
+    missing. The translation is only changed once every chapter is there, when the staging copy is
+    merged into it in one transaction; a cancelled or failed download leaves it as it was.
+    """
+
+    def __init__(self, translation, workers=DOWNLOAD_WORKERS, rate=DOWNLOAD_RATE, progress_callback=None):
+        self.translation = translation
+        self.staging = f"{translation}{STAGING_SUFFIX}"
+        self.workers = workers
+        self.limiter = RateLimiter(rate, burst=workers)
+        self.progress_callback = progress_callback  # Called as progress_callback(done, total) from worker threads
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+        self.started = None
+        self.fetched = 0
+        self.bytes = 0
+
+    def cancel(self):
+        """Stop after the chapters already in flight; everything staged so far is kept for the next run."""
+        self._cancelled.set()
+
+    def throughput(self):
+        """Return chapters fetched per second so far."""
+        elapsed = time.monotonic() - self.started if self.started else 0
+        return self.fetched / elapsed if elapsed else 0.0
+
+    def _fetch(self, book_id, chapter):
+        """Download, check and store one chapter; returns the number of verses that differ from the table."""
+        if self._cancelled.is_set():
+            return None
+        self.limiter.acquire()
+        if self._cancelled.is_set():
+            return None
+        response = bible_http.get_chapter(self.translation, book_id, chapter)
+        response.raise_for_status()
+        verses = response.json()
+        if not isinstance(verses, list) or not verses:
+            raise ValueError(f"No verses returned for {book_id}:{chapter}")
+        numbers = [int(v['verse']) for v in verses]
+        if len(set(numbers)) != len(numbers) or any(not v.get('text') for v in verses):
+            raise ValueError(f"Duplicate or empty verses returned for {book_id}:{chapter}")
+        bible_store.store_chapter(self.staging, book_id, chapter, verses)
+        with self._lock:
+            self.fetched += 1
+            self.bytes += len(response.content)
+        expected = verse_count(book_id, chapter, self.translation)
+        return abs(len(numbers) - expected)
+
+    def run(self):
+        """Download the missing chapters and return a report dict (see the keys below)."""
+        self.started = time.monotonic()
+        chapters = translation_chapters()
+        stored = bible_store.stored_chapters(self.translation) | bible_store.stored_chapters(self.staging)
+        todo = [key for key in chapters if key not in stored]
+        total = len(chapters)
+        done = total - len(todo)
+        failed = []
+        mismatched = 0
+        logging.info(f"Downloading {len(todo)} of {total} {self.translation} chapters "
+                     f"({self.workers} workers, {self.limiter.rate:g} requests/s)")
+        if self.progress_callback:
+            self.progress_callback(done, total)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self._fetch, book_id, chapter): (book_id, chapter) for book_id, chapter in todo}
+            try:
+                for future in as_completed(futures):
+                    book_id, chapter = futures[future]
+                    try:
+                        difference = future.result()
+                    except Exception as e:
+                        logging.error(f"Failed to download {self.translation} {book_id}:{chapter}: {str(e)}")
+                        failed.append((book_id, chapter, str(e)))
+                        continue
+                    if difference is None:
+                        continue
+                    if difference:
+                        logging.warning(f"{self.translation} {book_id}:{chapter} has {difference} verses more or "
+                                        f"fewer than the verse table")
+                        mismatched += 1
+                    done += 1
+                    if self.progress_callback:
+                        self.progress_callback(done, total)
+            except BaseException:
+                self.cancel()  # e.g. Ctrl+C: let the queued chapters drain instead of downloading them
+                raise
+        # Completeness is checked against the store, not the counters, so a resumed download is judged as a whole
+        staged = bible_store.stored_chapters(self.staging)
+        stored = bible_store.stored_chapters(self.translation) | staged
+        missing = [key for key in chapters if key not in stored]
+        report = {
+            'translation': self.translation,
+            'chapters': total,
+            'skipped': total - len(todo),
+            'fetched': self.fetched,
+            'failed': failed,
+            'missing': len(missing),
+            'mismatched': mismatched,
+            'bytes': self.bytes,
+            'seconds': time.monotonic() - self.started,
+            'chapters_per_second': self.throughput(),
+            'cancelled': self._cancelled.is_set(),
+            'installed': False,
+            'verse_count': None,
+        }
+        if not missing and not report['cancelled']:
+            if staged or not bible_store.is_installed(self.translation):
+                report['verse_count'] = bible_store.install_staged(self.staging, self.translation, merge=True)
+                from bible_import import remove_derived
+                remove_derived(self.translation)
+            else:
+                # Nothing new: leave installed_at alone so the packed file and indexes stay current
+                report['verse_count'] = bible_store.translation_info(self.translation)[0]
+            report['installed'] = True
+        logging.info(f"Downloaded {self.fetched} {self.translation} chapters in {report['seconds']:.1f}s "
+                     f"({report['chapters_per_second']:.1f} chapters/s, {self.bytes / 1024:.0f} KiB); "
+                     f"{len(missing)} missing")
+        return report
+
+
+def format_report(report):
+    """One-paragraph summary of a download report for the status bar, a message box or the console."""
+    lines = [f"{report['fetched']} chapters downloaded in {report['seconds']:.1f}s "
+             f"({report['chapters_per_second']:.1f} chapters/s, {report['bytes'] / 1024:.0f} KiB); "
+             f"{report['skipped']} were already stored."]
+    if report['installed']:
+        lines.append(f"{report['translation']} is installed ({report['verse_count']} verses).")
+    elif report['cancelled']:
+        lines.append(f"Download cancelled with {report['missing']} chapters to go; run it again to resume.")
+    else:
+        lines.append(f"{report['missing']} chapters are still missing ({len(report['failed'])} failed); "
+                     f"run the download again to resume.")
+    if report['mismatched']:
+        lines.append(f"{report['mismatched']} chapters have a different verse count than the "
+                     f"{family(report['translation']).upper()} family's versification table.")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download a translation from bolls.life into bible_corpus.db. "
+                                                 "Set BOLLS_BASE_URL to use another server.")
+    parser.add_argument('translation')
+    parser.add_argument('--workers', type=int, default=DOWNLOAD_WORKERS)
+    parser.add_argument('--rate', type=float, default=DOWNLOAD_RATE, help="chapter requests per second")
+    args = parser.parse_args()
+    manager = DownloadManager(args.translation, args.workers, args.rate)
+    manager.progress_callback = lambda done, total: print(
+        f"\r{done}/{total} chapters, {manager.throughput():.1f}/s", end='', flush=True)
+    try:
+        result = manager.run()
+    except KeyboardInterrupt:
+        manager.cancel()
+        sys.exit(1)
+    print()
+    print(format_report(result))
+    sys.exit(0 if result['installed'] else 1)
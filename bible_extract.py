@@ -0,0 +1,193 @@
+# bible_extract.py
+# Finds every scripture reference in free text (sermons, notes, Gemini answers) in one pass over the text.
+# No Qt imports, so scripts can use it; the dialog that lists a sermon's references is in sermon_references_dialog.py.
+
+import re
+import sys
+import time
+import argparse
+from collections import namedtuple, deque
+from bible_books import book_aliases, normalize_alias
+from bible_utils import BOOK_MAP, REVERSE_BOOK_MAP, parse_refs, format_range
+
+# Abbreviations that are also everyday words ("he", "is", "so"): only taken as a book when capitalised
+# and followed by chapter:verse, so "Is 5 enough?" is not read as Isaiah 5
+COMMON_WORDS = frozenset({'ac', 'act', 'am', 'can', 'de', 'do', 'es', 'ex', 'he', 'ho', 'is', 'ja', 'jo', 'la', 'mar',
+                          'na', 'ob', 're', 'so', 'ti'})
+
+_TOKEN = re.compile(r'[^\W\d_]+|\d+')
+# chapter[:verse][-[chapter:]verse], then ',' or ';' separated items that are not the start of "2 Cor"
+_ITEM = r'\d+(?:\s*:\s*\d+|\.\d+)?(?:\s*[-–—]\s*\d+(?:\s*:\s*\d+|\.\d+)?)?'
+_TAIL = re.compile(rf'[ .]*({_ITEM}(?:\s*[,;]\s*(?![1-3](?:st|nd|rd)?\s*[^\W\d_]){_ITEM})*)')
+_VERSE = re.compile(r'\d\s*:\s*\d|\d\.\d')
+_NUMBER = re.compile(r'\d+')
+
+Reference = namedtuple('Reference', ['start', 'end', 'text', 'ranges'])
+Reference.__doc__ = """A reference found in text: text[start:end] as written, and the RefRange list it stands for."""
+
+
+class ReferenceExtractor:
+    """Aho-Corasick automaton over the words of every book alias, plus the chapter/verse grammar.
+
+    The automaton's alphabet is whole words, so "1 John", "1John" and "I John" are all the two-word
+    alias ('1'/'i', 'john'), and a match can only start and end on a word boundary. A book name must be
+    followed by a number, so only the few characters before each letter-then-number junction are fed
+    through the automaton, each token once; everything else is skipped by a single regex scan.
+    """
+
+    def __init__(self, book_map=BOOK_MAP):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]  # Per state: (alias words, book_id, common) for every alias ending here
+        self.max_words = 1
+        self.window = 0  # Characters before a number searched for a book name; room for any alias
+        seen = {}
+        for alias, book_id in book_aliases(book_map):
+            key = normalize_alias(alias)
+            if seen.setdefault(key, book_id) != book_id:
+                continue  # First book to claim an ambiguous abbreviation keeps it, as in BookIndex
+            words = [word.lower() for word in _TOKEN.findall(alias)]
+            state = 0
+            for word in words:
+                if word not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                    self.goto[state][word] = len(self.goto) - 1
+                state = self.goto[state][word]
+            entry = (len(words), book_id, len(words) == 1 and words[0] in COMMON_WORDS)
+            if entry not in self.out[state]:
+                self.out[state].append(entry)
+            self.max_words = max(self.max_words, len(words))
+            self.window = max(self.window, len(alias) + 2 * len(words))
+        self._link()
+
+    def _link(self):
+        """Breadth-first failure links; each state's output also gets the aliases that are its suffixes."""
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for word, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(word, 0)
+                self.fail[child] = target if target != child else 0
+                self.out[child] = self.out[child] + [entry for entry in self.out[self.fail[child]]
+                                                     if entry not in self.out[child]]
+
+    def candidates(self, text, pos=0, endpos=None):
+        """Yield (start, end, book_id, common) for every alias in text[pos:endpos], in order of end position."""
+        goto, fail, out = self.goto, self.fail, self.out
+        starts = deque(maxlen=self.max_words)
+        state = 0
+        last_end = pos
+        for match in _TOKEN.finditer(text, pos, len(text) if endpos is None else endpos):
+            start, end = match.span()
+            if start != last_end and text[last_end:start].strip(' .'):
+                state = 0  # Only spaces and periods may separate the words of an alias
+            last_end = end
+            starts.append(start)
+            word = match.group().lower()
+            while state and word not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word, 0)
+            for words, book_id, common in out[state]:
+                yield starts[-words], end, book_id, common
+
+    def extract(self, text, translation=None):
+        """Return every Reference in text, leftmost-longest and non-overlapping."""
+        by_start = {}
+        scanned = 0
+        for number in _NUMBER.finditer(text):
+            # A book name ends on a letter just before the number, with only spaces or periods between
+            anchor = number.start()
+            while anchor and text[anchor - 1] in ' .':
+                anchor -= 1
+            if not anchor or not text[anchor - 1].isalpha() or anchor <= scanned:
+                continue
+            for start, end, book_id, common in self.candidates(text, max(scanned, anchor - self.window), anchor):
+                if start and text[start - 1].isalnum():
+                    continue
+                by_start.setdefault(start, []).append((end, book_id, common))
+            scanned = anchor
+        references = []
+        covered = 0
+        for start in sorted(by_start):
+            if start < covered:
+                continue
+            for end, book_id, common in sorted(by_start[start], reverse=True):
+                reference = self._reference(text, start, end, book_id, common, translation)
+                if reference:
+                    references.append(reference)
+                    covered = reference.end
+                    break
+        return references
+
+    def _reference(self, text, start, end, book_id, common, translation):
+        if end < len(text) and text[end].isalpha():
+            return None
+        tail = _TAIL.match(text, end)
+        if not tail:
+            return None
+        has_verse = bool(_VERSE.search(tail.group(1)))
+        first_letter = next(ch for ch in text[start:end] if ch.isalpha())
+        capitalised = first_letter.isupper()
+        # Chapter-only citations ("Psalm 23") need a capital; everyday words also need a verse
+        if not (capitalised or has_verse) or (common and not (capitalised and has_verse)):
+            return None
+        try:
+            ranges = parse_refs(f"{REVERSE_BOOK_MAP[book_id]} {tail.group(1)}", translation)
+        except ValueError:
+            return None
+        return Reference(start, tail.end(1), text[start:tail.end(1)], ranges)
+
+
+_extractor = None
+
+
+def extract_refs(text, translation=None):
+    """Return the scripture references in text as Reference(start, end, text, ranges), in order."""
+    global _extractor
+    if _extractor is None:
+        _extractor = ReferenceExtractor()
+    return _extractor.extract(text or '', translation)
+
+
+def canonical_ref(reference):
+    """Return the canonical spelling of a found reference, e.g. 'Romans 8:28' for 'Rom 8.28'."""
+    return '; '.join(format_range(r) for r in reference.ranges)
+
+
+def sermon_refs(sermon):
+    """Return (field, Reference) for every reference in a sermon's title, introduction, content and notes."""
+    found = []
+    for field in ('title', 'intro', 'content'):
+        found.extend((field, reference) for reference in extract_refs(sermon.get(field, '')))
+    for vn in sermon.get('verses_notes', []):
+        for field in ('text', 'note'):
+            found.extend(('verses_notes', reference) for reference in extract_refs(vn.get(field, '')))
+    return found
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List the scripture references in text files.")
+    parser.add_argument('files', nargs='+')
+    parser.add_argument('--quiet', action='store_true', help="only print the totals")
+    args = parser.parse_args()
+    total_chars = 0
+    total_refs = 0
+    started = time.perf_counter()
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            content = f.read()
+        found = extract_refs(content)
+        total_chars += len(content)
+        total_refs += len(found)
+        if not args.quiet:
+            for reference in found:
+                print(f"{path}:{reference.start}: {reference.text} -> {canonical_ref(reference)}")
+    seconds = time.perf_counter() - started
+    print(f"{total_refs} references in {len(args.files)} files ({total_chars / 1e6:.1f} MB) in {seconds:.2f}s")
+    sys.exit(0)
@@ -0,0 +1,100 @@
+# bible_http.py
+# Shared pooled HTTP session for all bolls.life traffic (keep-alive, gzip, timeouts and retries).
+
+import os
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+# Override to point the app (or the benchmarks) at a stand-in server, e.g. http://127.0.0.1:8765
+BASE_URL = os.environ.get('BOLLS_BASE_URL', 'https://bolls.life').rstrip('/')
+
+# (connect, read) timeouts in seconds per endpoint
+TIMEOUTS = {
+    'get-text': (3.05, 5),
+    'find': (3.05, 10),
+}
+DEFAULT_TIMEOUT = (3.05, 5)
+
+POOL_SIZE = 10
+MAX_RETRIES = 2
+BACKOFF_FACTOR = 0.3
+
+_session = None
+_direct_session = None
+_lock = threading.Lock()
+
+
+def _new_session(max_retries):
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=POOL_SIZE, max_retries=max_retries)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'Accept': 'application/json',
+        'Accept-Encoding': 'gzip, deflate',
+        'User-Agent': 'SermonFreely'
+    })
+    return session
+
+
+def get_session():
+    """Return the process-wide session, creating it on first use."""
+    global _session
+    with _lock:
+        if _session is None:
+            retry = Retry(
+                total=MAX_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=['GET'],
+                raise_on_status=False
+            )
+            _session = _new_session(retry)
+            logging.debug(f"Created pooled HTTP session for {BASE_URL} (pool size {POOL_SIZE}, {MAX_RETRIES} retries)")
+        return _session
+
+
+def get_direct_session():
+    """Return the pooled session without retries, for callers that fail over themselves (bible_providers)."""
+    global _direct_session
+    with _lock:
+        if _direct_session is None:
+            _direct_session = _new_session(0)
+            logging.debug(f"Created pooled HTTP session without retries (pool size {POOL_SIZE})")
+        return _direct_session
+
+
+def get(endpoint, path, params=None, headers=None, base_url=None, retries=True):
+    """GET a bolls.life path (or the same path on a mirror) on the shared session using the endpoint's timeout.
+
+    With retries=False a failure is reported at once instead of after MAX_RETRIES more attempts.
+    """
+    url = f"{base_url or BASE_URL}{path}"
+    logging.debug(f"Requesting URL: {url}")
+    session = get_session() if retries else get_direct_session()
+    return session.get(url, params=params, headers=headers, timeout=TIMEOUTS.get(endpoint, DEFAULT_TIMEOUT))
+
+
+def get_chapter(translation, book_id, chapter, headers=None, base_url=None, retries=True):
+    """Request one chapter from /get-text/."""
+    return get('get-text', f"/get-text/{translation}/{book_id}/{chapter}/", headers=headers, base_url=base_url,
+               retries=retries)
+
+
+def find(translation, query, limit=50):
+    """Run a keyword search against /v2/find/."""
+    params = {'search': query, 'match_case': 'false', 'match_whole': 'false', 'limit': limit}
+    return get('find', f"/v2/find/{translation}", params=params)
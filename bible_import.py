@@ -0,0 +1,346 @@
+# bible_import.py
+# Streaming importer for OSIS XML, USFM and Zefania XML Bibles into the local corpus store.
+
+import os
+import re
+import sys
+import argparse
+import logging
+import xml.etree.ElementTree as ET
+import bible_store
+from bible_utils import BOOK_MAP, BOOK_CHAPTERS
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+READ_CHUNK = 64 * 1024
+STAGING_SUFFIX = '~import'  # Verses are parsed under this name first, e.g. 'LSV~import'
+
+# Book codes in canonical order, so the position + 1 is the bolls.life book id
+OSIS_BOOKS = [
+    'Gen', 'Exod', 'Lev', 'Num', 'Deut', 'Josh', 'Judg', 'Ruth', '1Sam', '2Sam', '1Kgs', '2Kgs', '1Chr', '2Chr',
+    'Ezra', 'Neh', 'Esth', 'Job', 'Ps', 'Prov', 'Eccl', 'Song', 'Isa', 'Jer', 'Lam', 'Ezek', 'Dan', 'Hos', 'Joel',
+    'Amos', 'Obad', 'Jonah', 'Mic', 'Nah', 'Hab', 'Zeph', 'Hag', 'Zech', 'Mal', 'Matt', 'Mark', 'Luke', 'John',
+    'Acts', 'Rom', '1Cor', '2Cor', 'Gal', 'Eph', 'Phil', 'Col', '1Thess', '2Thess', '1Tim', '2Tim', 'Titus', 'Phlm',
+    'Heb', 'Jas', '1Pet', '2Pet', '1John', '2John', '3John', 'Jude', 'Rev',
+]
+USFM_BOOKS = [
+    'GEN', 'EXO', 'LEV', 'NUM', 'DEU', 'JOS', 'JDG', 'RUT', '1SA', '2SA', '1KI', '2KI', '1CH', '2CH', 'EZR', 'NEH',
+    'EST', 'JOB', 'PSA', 'PRO', 'ECC', 'SNG', 'ISA', 'JER', 'LAM', 'EZK', 'DAN', 'HOS', 'JOL', 'AMO', 'OBA', 'JON',
+    'MIC', 'NAM', 'HAB', 'ZEP', 'HAG', 'ZEC', 'MAL', 'MAT', 'MRK', 'LUK', 'JHN', 'ACT', 'ROM', '1CO', '2CO', 'GAL',
+    'EPH', 'PHP', 'COL', '1TH', '2TH', '1TI', '2TI', 'TIT', 'PHM', 'HEB', 'JAS', '1PE', '2PE', '1JN', '2JN', '3JN',
+    'JUD', 'REV',
+]
+OSIS_BOOK_IDS = {code.lower(): i for i, code in enumerate(OSIS_BOOKS, 1)}
+USFM_BOOK_IDS = {code: i for i, code in enumerate(USFM_BOOKS, 1)}
+
+# Elements whose text is not part of the verse (footnotes, cross references, headings)
+OSIS_SKIPPED = {'note', 'title', 'reference'}
+ZEFANIA_SKIPPED = {'NOTE', 'XREF', 'CAPTION', 'REMARK'}
+# Paragraph, poetry line and line break elements; their boundaries separate words
+OSIS_BREAKS = {'p', 'l', 'lg', 'lb'}
+ZEFANIA_BREAKS = {'BR'}
+
+_USFM_MARKER = re.compile(r'\\(\+?[a-z]+\d*\*?)\s?')
+_USFM_SKIPPED = re.compile(r'\\(f|fe|x|ef|ex)\s.*?\\\1\*', re.S)  # Footnotes, endnotes and cross references
+_USFM_WORD_ATTRIBUTES = re.compile(r'\|[^\\]*?(?=\\\+?w\*)')  # \w grace|strong="G5485"\w*
+# Paragraphs that are not verse text: headings, titles, introductions, remarks
+_USFM_NON_TEXT = re.compile(r'\\(s\d?|ms\d?|mr|r|d|sp|h|toc\d?|mt\d?|i[a-z]*\d?|rem|cl|cp|cd|ide|sts|usfm)(\s|$)')
+_SPACES = re.compile(r'\s+')
+
+
+class ImportCancelled(Exception):
+    """Raised inside import_files when its is_cancelled check returns True."""
+
+
+def clean_text(text):
+    return _SPACES.sub(' ', text).strip()
+
+
+class ChapterWriter:
+    """Collects verses and stores each chapter as soon as the next one starts, so memory stays at one chapter."""
+
+    def __init__(self, translation, progress_callback=None, is_cancelled=None):
+        self.translation = translation
+        self.progress_callback = progress_callback
+        self.is_cancelled = is_cancelled
+        self.key = None
+        self.verses = {}
+        self.chapters = set()
+        self.verse_count = 0
+
+    def add(self, book_id, chapter, verse, text):
+        text = clean_text(text)
+        if not text:
+            return
+        if (book_id, chapter) != self.key:
+            self.flush()
+            if self.is_cancelled is not None and self.is_cancelled():
+                raise ImportCancelled(f"Import of {self.translation} cancelled")
+            self.key = (book_id, chapter)
+        # A verse split across milestones or paragraphs is joined back together
+        self.verses[verse] = f"{self.verses[verse]} {text}" if verse in self.verses else text
+
+    def flush(self):
+        if self.key is None or not self.verses:
+            return
+        book_id, chapter = self.key
+        bible_store.store_chapter(self.translation, book_id, chapter,
+                                  [{'verse': verse, 'text': text} for verse, text in sorted(self.verses.items())])
+        self.chapters.add(self.key)
+        self.verse_count += len(self.verses)
+        self.verses = {}
+        if self.progress_callback:
+            self.progress_callback(len(self.chapters))
+
+
+class OsisHandler:
+    """ElementTree parser target for OSIS; handles both <verse osisID> containers and sID/eID milestones."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.verse = None  # (book_id, chapter, verse) being collected
+        self.text = []
+        self.skip_depth = 0
+
+    @staticmethod
+    def parse_osis_id(osis_id):
+        """Return (book_id, chapter, verse) for 'Gen.1.1' (the first ID of a 'Gen.1.1 Gen.1.2' list), or None."""
+        parts = osis_id.split()[0].split('.')
+        if len(parts) != 3 or not parts[1].isdigit() or not parts[2].isdigit():
+            return None
+        book_id = OSIS_BOOK_IDS.get(parts[0].lower())
+        return (book_id, int(parts[1]), int(parts[2])) if book_id else None
+
+    def end_verse(self):
+        if self.verse is not None:
+            self.writer.add(*self.verse, ''.join(self.text))
+        self.verse = None
+        self.text = []
+
+    def start(self, tag, attrib):
+        tag = tag.rsplit('}', 1)[-1]
+        if self.skip_depth or tag in OSIS_SKIPPED:
+            self.skip_depth += 1
+            return
+        if tag in OSIS_BREAKS:
+            self.data(' ')
+        elif tag == 'verse':
+            if 'eID' in attrib:
+                self.end_verse()
+            elif 'osisID' in attrib or 'sID' in attrib:
+                self.end_verse()
+                self.verse = self.parse_osis_id(attrib.get('osisID') or attrib['sID'])
+        elif tag == 'chapter' and 'eID' in attrib:
+            self.end_verse()
+
+    def end(self, tag):
+        tag = tag.rsplit('}', 1)[-1]
+        if self.skip_depth:
+            self.skip_depth -= 1
+            return
+        if tag in OSIS_BREAKS:
+            self.data(' ')
+        elif tag == 'chapter' or (tag == 'verse' and self.verse is not None and self.text):
+            # Closing a container verse, or leaving a chapter without an eID milestone
+            self.end_verse()
+
+    def data(self, data):
+        if self.verse is not None and not self.skip_depth:
+            self.text.append(data)
+
+    def close(self):
+        self.end_verse()
+
+
+class ZefaniaHandler:
+    """ElementTree parser target for Zefania XML (<BIBLEBOOK bnumber><CHAPTER cnumber><VERS vnumber>)."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.book_id = None
+        self.chapter = None
+        self.verse = None
+        self.text = []
+        self.skip_depth = 0
+
+    def start(self, tag, attrib):
+        if self.skip_depth or tag in ZEFANIA_SKIPPED:
+            self.skip_depth += 1
+        elif tag in ZEFANIA_BREAKS:
+            self.data(' ')
+        elif tag == 'BIBLEBOOK':
+            number = int(attrib.get('bnumber', 0))
+            self.book_id = number if 1 <= number <= len(BOOK_MAP) else None
+        elif tag == 'CHAPTER':
+            self.chapter = int(attrib.get('cnumber', 0))
+        elif tag == 'VERS':
+            self.verse = int(attrib.get('vnumber', 0))
+            self.text = []
+
+    def end(self, tag):
+        if self.skip_depth:
+            self.skip_depth -= 1
+        elif tag in ZEFANIA_BREAKS:
+            self.data(' ')
+        elif tag == 'VERS':
+            if self.book_id and self.chapter and self.verse:
+                self.writer.add(self.book_id, self.chapter, self.verse, ''.join(self.text))
+            self.verse = None
+
+    def data(self, data):
+        if self.verse is not None and not self.skip_depth:
+            self.text.append(data)
+
+    def close(self):
+        pass
+
+
+def parse_xml(path, handler):
+    """Feed a file through an ElementTree parser target in chunks."""
+    parser = ET.XMLParser(target=handler)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(READ_CHUNK)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    parser.close()
+
+
+def usfm_text(text):
+    """Strip footnotes, cross references, word attributes and markers from USFM verse text."""
+    text = _USFM_SKIPPED.sub('', text)
+    text = _USFM_WORD_ATTRIBUTES.sub('', text)
+    return _USFM_MARKER.sub(' ', text)
+
+
+def parse_usfm(path, writer):
+    """Read a USFM file line by line; a file may hold one book or several."""
+    book_id = None
+    chapter = None
+    verse = None
+    text = []
+
+    def finish_verse():
+        if book_id and chapter and verse:
+            writer.add(book_id, chapter, verse, usfm_text(' '.join(text)))
+
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith('\\id '):
+                finish_verse()
+                code = line[4:7].upper()
+                book_id = USFM_BOOK_IDS.get(code)
+                chapter = verse = None
+                text = []
+                if book_id is None:
+                    logging.debug(f"Skipping USFM book {code} in {path}")
+            elif line.startswith('\\c '):
+                finish_verse()
+                number = line[3:].split()[0] if line[3:].split() else ''
+                chapter = int(number) if number.isdigit() else None
+                verse = None
+                text = []
+            elif book_id and chapter and not _USFM_NON_TEXT.match(line):
+                # A line may carry several verses: "\q1 \v 3 text \v 4 text"
+                pieces = re.split(r'\\v\s+(\d+)[a-z]?(?:-\d+)?\s?', line)
+                text.append(pieces[0])
+                for number, piece in zip(pieces[1::2], pieces[2::2]):
+                    finish_verse()
+                    verse = int(number)
+                    text = [piece]
+    finish_verse()
+
+
+def detect_format(path):
+    """Return 'osis', 'zefania' or 'usfm' from the file extension or its first tag."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.usfm', '.sfm', '.ptx'):
+        return 'usfm'
+    with open(path, 'rb') as f:
+        head = f.read(4096).decode('utf-8', 'ignore')
+    if re.search(r'<osis[\s>]', head):
+        return 'osis'
+    if re.search(r'<XMLBIBLE[\s>]', head, re.I):
+        return 'zefania'
+    if re.search(r'^\\id\s', head, re.M):
+        return 'usfm'
+    raise ValueError(f"Unrecognised Bible format: {path}")
+
+
+def remove_derived(translation):
+    """Delete the packed file, cached chapters, indexes and models built from a translation's previous copy."""
+    # Imported here: the concordance and related-verses modules pull in Qt dialogs and numpy
+    import bible_packed
+    import bible_index
+    import bible_concordance
+    import bible_related
+    import bible_spell
+    from bible_cache import chapter_cache
+    bible_packed.unpack(translation)
+    chapter_cache.remove_translation(translation)
+    bible_index.remove_index(translation)
+    bible_concordance.remove_concordance(translation)
+    bible_related.remove_model(translation)
+    bible_spell.remove_spell_index(translation)
+
+
+def import_files(translation, paths, file_format=None, progress_callback=None, is_cancelled=None):
+    """Import one or more OSIS, USFM or Zefania files as a translation and mark it installed.
+
+    The files are parsed into a staging copy, which replaces any verses already stored for the translation
+    only once every file has been read. On an error, or ImportCancelled once is_cancelled() returns True
+    (checked at each new chapter), the previous copy is kept. Returns (verse_count, missing_chapters),
+    where missing_chapters counts BOOK_CHAPTERS chapters the files did not contain (e.g. for a New Testament).
+    """
+    translation = translation.strip().upper()
+    if not translation:
+        raise ValueError("Please give the translation a short name, e.g. LSV.")
+    staging = f"{translation}{STAGING_SUFFIX}"
+    bible_store.remove_translation(staging)  # Left over from an import that was interrupted
+    writer = ChapterWriter(staging, progress_callback, is_cancelled)
+    try:
+        for path in paths:
+            kind = file_format or detect_format(path)
+            logging.debug(f"Importing {path} as {kind} into {translation}")
+            if kind == 'osis':
+                parse_xml(path, OsisHandler(writer))
+            elif kind == 'zefania':
+                parse_xml(path, ZefaniaHandler(writer))
+            elif kind == 'usfm':
+                parse_usfm(path, writer)
+            else:
+                raise ValueError(f"Unknown format: {kind}")
+            writer.flush()
+        if not writer.chapters:
+            raise ValueError("No verses were found in the selected files.")
+        verse_count = bible_store.install_staged(staging, translation)
+    except Exception:
+        bible_store.remove_translation(staging)
+        raise
+    remove_derived(translation)
+    missing = sum(BOOK_CHAPTERS.values()) - len(writer.chapters)
+    logging.info(f"Imported {translation}: {verse_count} verses in {len(writer.chapters)} chapters, {missing} missing")
+    return verse_count, missing
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import OSIS, USFM or Zefania files into bible_corpus.db.")
+    parser.add_argument('translation', help="short name to install the translation as, e.g. LSV")
+    parser.add_argument('files', nargs='+', help="Bible files; USFM is usually one file per book")
+    parser.add_argument('--format', choices=['osis', 'usfm', 'zefania'], help="skip format detection")
+    args = parser.parse_args()
+    count, missing_chapters = import_files(args.translation, args.files, args.format,
+                                           lambda chapters: print(f"\r{chapters} chapters", end='', flush=True))
+    print(f"\nInstalled {args.translation.upper()} ({count} verses"
+          f"{f', {missing_chapters} chapters not in the files' if missing_chapters else ''})")
+    sys.exit(0)
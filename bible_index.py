@@ -0,0 +1,464 @@
+# bible_index.py
+# Local full-text index over installed translations: BM25 ranking, phrases, AND/OR/NOT and book filters.
+
+import os
+import re
+import sys
+import math
+import time
+import pickle
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from operator import itemgetter
+from bisect import bisect_left
+import bible_store
+from bible_utils import resolve_book
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+INDEX_DIR = 'bible_index'
+INDEX_VERSION = 1
+PAGE_SIZE = 50
+PREFIX_EXPANSIONS = 200  # Most terms a 'word*' prefix may stand for
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+OLD_TESTAMENT_LAST_BOOK = 39  # Malachi
+TESTAMENTS = {
+    'ot': range(1, OLD_TESTAMENT_LAST_BOOK + 1),
+    'old': range(1, OLD_TESTAMENT_LAST_BOOK + 1),
+    'nt': range(OLD_TESTAMENT_LAST_BOOK + 1, 67),
+    'new': range(OLD_TESTAMENT_LAST_BOOK + 1, 67),
+}
+
+_MARKUP = re.compile(r'<S>\d+</S>|<[^>]+>')  # Strong's numbers and HTML tags in bolls.life text
+_TOKEN = re.compile(r'[a-z0-9]+')
+# One query item: optional '-', optional 'field:', then a quoted phrase or a bare word
+_QUERY_ITEM = re.compile(r'(-?)(?:([a-z]+):)?(?:"([^"]*)"?|(\S+))', re.I)
+
+
+def tokenize(text):
+    """Lowercase word tokens of a verse or query, with markup removed."""
+    return _TOKEN.findall(_MARKUP.sub(' ', text).lower())
+
+
+def index_path(translation):
+    return os.path.join(INDEX_DIR, f"{translation}.idx")
+
+
+def build_index(translation):
+    """Build and save the index for an installed translation. Runs in a worker process."""
+    info = bible_store.translation_info(translation)
+    if info is None:
+        raise ValueError(f"{translation} is not installed")
+    start = time.time()
+    refs = []
+    texts = []
+    lengths = []
+    postings = {}  # term -> ([doc ids], [positions per doc])
+    for doc_id, (book_id, chapter, verse, text) in enumerate(bible_store.all_verses(translation)):
+        tokens = tokenize(text)
+        refs.append((book_id, chapter, verse))
+        texts.append(text)
+        lengths.append(len(tokens))
+        term_positions = {}
+        for position, token in enumerate(tokens):
+            term_positions.setdefault(token, []).append(position)
+        for token, positions in term_positions.items():
+            entry = postings.get(token)
+            if entry is None:
+                entry = postings[token] = ([], [])
+            entry[0].append(doc_id)
+            entry[1].append(tuple(positions))
+    data = {
+        'version': INDEX_VERSION,
+        'translation': translation,
+        'source': tuple(info),
+        'refs': refs,
+        'texts': texts,
+        'lengths': lengths,
+        'postings': postings,
+    }
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    path = index_path(translation)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    logging.info(f"Built search index for {translation}: {len(refs)} verses, {len(postings)} terms "
+                 f"in {time.time() - start:.1f}s")
+    return len(refs)
+
+
+class Query:
+    """A parsed search query.
+
+    Terms are implicitly ANDed; 'a OR b' puts a and b in one group, of which any may match.
+    'word*' matches any term starting with word.
+    'NOT x' or '-x' excludes verses containing x. "quoted words" must appear as a phrase.
+    'book:John' / 'book:"1 Cor"' and 'testament:nt' restrict the books searched.
+    """
+
+    def __init__(self, text):
+        self.groups = []  # Every group must match; each group is a list of clauses, any of which may match
+        self.excluded = []  # Clauses that must not match
+        self.books = None  # Allowed book ids, or None for the whole Bible
+        join_next = False
+        negate_next = False
+        for match in _QUERY_ITEM.finditer(text):
+            minus, field, phrase, word = match.groups()
+            if phrase is None and not minus and not field:
+                if word == 'OR':
+                    join_next = bool(self.groups)
+                    continue
+                if word == 'AND':
+                    continue
+                if word == 'NOT':
+                    negate_next = True
+                    continue
+            value = phrase if phrase is not None else word
+            if field:
+                self._add_filter(field.lower(), value)
+                continue
+            clause = tuple(tokenize(value))
+            if not clause:
+                continue
+            if phrase is None and value.endswith('*') and len(clause) == 1:
+                clause = (clause[0] + '*',)  # Prefix term, e.g. lov* for love, loved, lovingkindness
+            if minus or negate_next:
+                self.excluded.append(clause)
+            elif join_next:
+                self.groups[-1].append(clause)
+            else:
+                self.groups.append([clause])
+            join_next = False
+            negate_next = False
+        if not self.groups:
+            raise ValueError("Enter at least one word to search for.")
+
+    def _add_filter(self, field, value):
+        if field == 'book':
+            book_id = resolve_book(value)
+            if not book_id:
+                raise ValueError(f"Unknown book name: {value}")
+            books = {book_id}
+        elif field == 'testament':
+            if value.lower() not in TESTAMENTS:
+                raise ValueError("Use testament:ot or testament:nt")
+            books = set(TESTAMENTS[value.lower()])
+        else:
+            raise ValueError(f"Unknown search filter: {field}")
+        self.books = books if self.books is None else self.books | books
+
+
+class SearchIndex:
+    """In-memory inverted index for one translation."""
+
+    def __init__(self, data):
+        self.translation = data['translation']
+        self.source = data['source']
+        self.refs = data['refs']
+        self.texts = data['texts']
+        self.postings = data['postings']
+        lengths = data['lengths']
+        self.doc_count = len(lengths)
+        avg_length = sum(lengths) / self.doc_count if self.doc_count else 1
+        # Length normalisation of the BM25 denominator, precomputed per verse
+        self.norms = [BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) for length in lengths]
+        self._scores = {}
+        self._lookups = {}
+        self._vocabulary = None
+
+    def _idf(self, doc_freq):
+        return math.log(1 + (self.doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def _term_scores(self, term):
+        """Return {doc_id: BM25 score} for one term, computed once per term and then reused."""
+        scores = self._scores.get(term)
+        if scores is None:
+            entry = self.postings.get(term)
+            if entry is None:
+                return {}
+            doc_ids, positions = entry
+            idf = self._idf(len(doc_ids))
+            norms = self.norms
+            scores = {doc_id: idf * len(pos) * (BM25_K1 + 1) / (len(pos) + norms[doc_id])
+                      for doc_id, pos in zip(doc_ids, positions)}
+            self._scores[term] = scores
+        return scores
+
+    def _prefix_scores(self, prefix):
+        """Return {doc_id: score} summed over the terms starting with prefix."""
+        scores = self._scores.get(prefix + '*')
+        if scores is None:
+            if self._vocabulary is None:
+                self._vocabulary = sorted(self.postings)
+            start = bisect_left(self._vocabulary, prefix)
+            scores = {}
+            for term in self._vocabulary[start:start + PREFIX_EXPANSIONS]:
+                if not term.startswith(prefix):
+                    break
+                for doc_id, score in self._term_scores(term).items():
+                    scores[doc_id] = scores.get(doc_id, 0.0) + score
+            self._scores[prefix + '*'] = scores
+        return scores
+
+    def _positions(self, term):
+        """Return {doc_id: positions} for one term, built on first use."""
+        lookup = self._lookups.get(term)
+        if lookup is None:
+            lookup = self._lookups[term] = dict(zip(*self.postings[term]))
+        return lookup
+
+    def _phrase_scores(self, terms):
+        """Return {doc_id: score} for verses containing the terms consecutively."""
+        if not all(term in self.postings for term in terms):
+            return {}
+        lookups = [self._positions(term) for term in terms]
+        candidates = set(min(lookups, key=len))
+        for lookup in lookups:
+            candidates &= lookup.keys()
+        matched = []
+        for doc_id in sorted(candidates):
+            # Start positions where term i sits at offset i, for every term
+            starts = set(lookups[0][doc_id])
+            for offset in range(1, len(terms)):
+                starts &= {position - offset for position in lookups[offset][doc_id]}
+                if not starts:
+                    break
+            if starts:
+                matched.append(doc_id)
+        scores = dict.fromkeys(matched, 0.0)
+        for term in set(terms):
+            term_scores = self._term_scores(term)
+            for doc_id in matched:
+                scores[doc_id] += term_scores[doc_id]
+        return scores
+
+    def _clause_scores(self, clause):
+        if len(clause) == 1:
+            if clause[0].endswith('*'):
+                return self._prefix_scores(clause[0][:-1])
+            return self._term_scores(clause[0])
+        return self._phrase_scores(clause)
+
+    def search(self, query):
+        """Return the ids of every matching verse, best first. query is a string or Query."""
+        if not isinstance(query, Query):
+            query = Query(query)
+        scores = None
+        for group in query.groups:
+            group_scores = dict(self._clause_scores(group[0]))
+            for clause in group[1:]:
+                for doc_id, score in self._clause_scores(clause).items():
+                    group_scores[doc_id] = group_scores.get(doc_id, 0.0) + score
+            if scores is None:
+                scores = group_scores
+            else:
+                # Intersect, walking whichever side is smaller
+                small, large = (scores, group_scores) if len(scores) <= len(group_scores) else (group_scores, scores)
+                scores = {doc_id: score + large[doc_id] for doc_id, score in small.items() if doc_id in large}
+            if not scores:
+                return []
+        for clause in query.excluded:
+            for doc_id in self._clause_scores(clause):
+                scores.pop(doc_id, None)
+        if query.books is not None:
+            refs = self.refs
+            scores = {doc_id: score for doc_id, score in scores.items() if refs[doc_id][0] in query.books}
+        # Stable sort: equal scores stay in canonical verse order
+        return [doc_id for doc_id, _ in sorted(scores.items(), key=itemgetter(1), reverse=True)]
+
+    def narrow(self, hits, prefix):
+        """Keep the hits containing a term that starts with prefix, in their current order."""
+        docs = self._prefix_scores(prefix.lower())
+        return [doc_id for doc_id in hits if doc_id in docs]
+
+    def page(self, hits, start, count=PAGE_SIZE):
+        """Return hits[start:start + count] as result dicts like the bolls.life search returns."""
+        results = []
+        for doc_id in hits[start:start + count]:
+            book_id, chapter, verse = self.refs[doc_id]
+            results.append({'book': book_id, 'chapter': chapter, 'verse': verse, 'text': self.texts[doc_id]})
+        return results
+
+
+_lock = threading.Lock()
+_executor = None
+
+
+def load_index(translation):
+    """Load a saved index, or return None if it is missing or older than the installed translation."""
+    info = bible_store.translation_info(translation)
+    if info is None:
+        return None
+    try:
+        with open(index_path(translation), 'rb') as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.error(f"Failed to load search index for {translation}: {str(e)}")
+        return None
+    if data.get('version') != INDEX_VERSION or data.get('source') != tuple(info):
+        logging.debug(f"Search index for {translation} is out of date")
+        return None
+    return SearchIndex(data)
+
+
+def _run_build(build, translation):
+    build(translation)  # Builders save to disk; their return value is not sent back to the UI process
+
+
+def run_in_process(build, translation):
+    """Run build(translation) in the shared background build process, so the UI process stays responsive.
+
+    If the build process dies, the pool is dropped so the next build starts a fresh process.
+    """
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        executor = _executor
+    try:
+        return executor.submit(_run_build, build, translation).result()
+    except BrokenProcessPool:
+        with _lock:
+            if _executor is executor:
+                _executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+class BackgroundLoader:
+    """Per-translation data loaded from disk, or first built in the background process if missing or stale.
+
+    load(translation) returns the object (with a .source matching bible_store.translation_info) or None;
+    build(translation) is a module-level function that builds and saves it.
+    """
+
+    def __init__(self, description, load, build):
+        self.description = description
+        self.load = load
+        self.build = build
+        self._ready = {}
+        self._preparing = {}
+        self._lock = threading.Lock()
+
+    def _prepare(self, translation):
+        try:
+            start = time.perf_counter()
+            ready = self.load(translation)
+            if ready is None:
+                logging.debug(f"Building {self.description} for {translation} in a background process")
+                run_in_process(self.build, translation)
+                ready = self.load(translation)
+            if ready is not None:
+                with self._lock:
+                    self._ready[translation] = ready
+                logging.debug(f"{self.description.capitalize()} for {translation} ready "
+                              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
+        except Exception as e:
+            logging.error(f"Failed to prepare {self.description} for {translation}: {str(e)}")
+        finally:
+            with self._lock:
+                self._preparing.pop(translation, None)
+
+    def prepare(self, translation):
+        """Load or build the data for an installed translation in the background; returns immediately."""
+        if not bible_store.is_installed(translation):
+            return
+        with self._lock:
+            ready = self._ready.get(translation)
+            if ready is not None and ready.source == tuple(bible_store.translation_info(translation) or ()):
+                return
+            if translation in self._preparing:
+                return
+            thread = threading.Thread(target=self._prepare, args=(translation,), daemon=True)
+            self._preparing[translation] = thread
+        thread.start()
+
+    def is_building(self, translation):
+        with self._lock:
+            return translation in self._preparing
+
+    def get(self, translation):
+        """Return the ready data for a translation, or None (after starting a background build)."""
+        with self._lock:
+            ready = self._ready.get(translation)
+        if ready is None:
+            self.prepare(translation)
+        return ready
+
+    def wait(self, translation):
+        """Return the current data for an installed translation, loading or building it first if needed. Blocks.
+
+        Returns None if it could not be built (the error is logged).
+        """
+        self.prepare(translation)
+        with self._lock:
+            thread = self._preparing.get(translation)
+        if thread is not None:
+            thread.join()
+        source = tuple(bible_store.translation_info(translation) or ())
+        with self._lock:
+            ready = self._ready.get(translation)
+        return ready if ready is not None and ready.source == source else None
+
+    def forget(self, translation):
+        with self._lock:
+            self._ready.pop(translation, None)
+
+
+_indexes = BackgroundLoader("search index", load_index, build_index)
+
+
+def prepare(translation):
+    """Load or build the index for an installed translation in the background; returns immediately."""
+    _indexes.prepare(translation)
+
+
+def remove_index(translation):
+    """Forget and delete a translation's saved index, e.g. after the translation is replaced."""
+    _indexes.forget(translation)
+    if os.path.exists(index_path(translation)):
+        os.remove(index_path(translation))
+
+
+def is_building(translation):
+    return _indexes.is_building(translation)
+
+
+def get_index(translation):
+    """Return the ready index for a translation, or None (after starting a background build)."""
+    return _indexes.get(translation)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == 'build':
+        print(f"Indexed {build_index(sys.argv[2])} verses")
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'search':
+        index = load_index(sys.argv[2])
+        if index is None:
+            print(f"No current index for {sys.argv[2]}; run: python bible_index.py build {sys.argv[2]}")
+            sys.exit(1)
+        start = time.perf_counter()
+        hits = index.search(' '.join(sys.argv[3:]))
+        elapsed = (time.perf_counter() - start) * 1000
+        for result in index.page(hits, 0, 10):
+            print(f"{result['book']} {result['chapter']}:{result['verse']}  {result['text'][:80]}")
+        print(f"{len(hits)} matches in {elapsed:.1f} ms")
+    else:
+        print("Usage: python bible_index.py build <TRANSLATION> | search <TRANSLATION> <query>")
@@ -0,0 +1,195 @@
+# bible_packed.py
+# Packed, memory-mapped verse text per translation: one UTF-8 blob plus a fixed-width offset array
+# indexed by canonical verse ordinal, so a verse lookup is two array reads and a slice.
+
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+import logging
+from bible_versification import CHAPTER_ORDINALS, ORDINAL_COUNT, ordinal
+import bible_store
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+PACKED_DIR = 'bible_packed'
+MAGIC = b'BPAK'
+FORMAT_VERSION = 2
+
+# magic, format version, ordinal count, layout checksum, source checksum, verses present
+HEADER = struct.Struct('<4sIIIII')
+OFFSET = struct.Struct('<I')
+SPAN = struct.Struct('<II')
+
+# Files packed against a different verse table are rejected rather than read with shifted ordinals
+LAYOUT_CRC = zlib.crc32(repr(sorted(CHAPTER_ORDINALS.items())).encode('ascii'))
+
+_open = {}  # translation -> (bible_store.generation() when opened, PackedBible or None)
+_lock = threading.Lock()
+
+
+def packed_path(translation):
+    return os.path.join(PACKED_DIR, f"{translation}.bpk")
+
+
+def source_crc(source):
+    """Checksum of a translation's bible_store.translation_info, stored so a re-imported translation is repacked."""
+    return zlib.crc32(repr(tuple(source)).encode('utf-8'))
+
+
+def write_packed(path, verses, source):
+    """Write (book_id, chapter, verse, text) rows to a packed file; return the number of verses stored.
+
+    source is the translation_info the rows were read under. Raises ValueError for a verse outside the canonical layout, since it would have no slot.
+    """
+    texts = [b''] * ORDINAL_COUNT
+    present = 0
+    for book_id, chapter, verse, text in verses:
+        n = ordinal(book_id, chapter, int(verse))
+        if n is None:
+            raise ValueError(f"Verse {book_id} {chapter}:{verse} is outside the canonical verse table")
+        if not texts[n]:
+            present += 1
+        texts[n] = text.encode('utf-8')
+    offsets = [0] * (ORDINAL_COUNT + 1)
+    position = 0
+    for n, data in enumerate(texts):
+        position += len(data)
+        offsets[n + 1] = position
+    if position > 0xFFFFFFFF:
+        raise ValueError("Translation text is too large for 32-bit offsets")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, ORDINAL_COUNT, LAYOUT_CRC, source_crc(source), present))
+        f.write(struct.pack(f'<{ORDINAL_COUNT + 1}I', *offsets))
+        f.write(b''.join(texts))
+    os.replace(tmp_path, path)
+    return present
+
+
+class PackedBible:
+    """Read-only view of a packed file; the pages are shared with every other process mapping it.
+
+    With source given, a file packed from a different copy of the translation is rejected.
+    """
+
+    def __init__(self, path, source=None):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, count, layout, packed_source, self.verse_count = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} packed Bible")
+            if count != ORDINAL_COUNT or layout != LAYOUT_CRC:
+                raise ValueError(f"{path} was packed against a different verse table")
+            if source is not None and packed_source != source_crc(source):
+                raise ValueError(f"{path} was packed from a different copy of the translation")
+        except Exception:
+            self._map.close()
+            raise
+        self._blob = HEADER.size + OFFSET.size * (ORDINAL_COUNT + 1)
+
+    def verse(self, book_id, chapter, verse):
+        """Return the text of one verse, or None if the translation does not have it."""
+        n = ordinal(book_id, chapter, verse)
+        if n is None:
+            return None
+        start, end = SPAN.unpack_from(self._map, HEADER.size + OFFSET.size * n)
+        if start == end:
+            return None
+        return self._map[self._blob + start:self._blob + end].decode('utf-8')
+
+    def chapter(self, book_id, chapter):
+        """Return a chapter as [{'verse': n, 'text': ...}], like bible_store.get_chapter."""
+        entry = CHAPTER_ORDINALS.get((book_id, chapter))
+        if entry is None:
+            return []
+        first, count = entry
+        offsets = struct.unpack_from(f'<{count + 1}I', self._map, HEADER.size + OFFSET.size * first)
+        blob = self._map[self._blob + offsets[0]:self._blob + offsets[-1]]
+        base = offsets[0]
+        return [{'verse': i + 1, 'text': blob[offsets[i] - base:offsets[i + 1] - base].decode('utf-8')}
+                for i in range(count) if offsets[i] != offsets[i + 1]]
+
+    def close(self):
+        self._map.close()
+
+
+def get(translation):
+    """Return the opened PackedBible for a translation, or None if it is not packed from the installed copy.
+
+    The file is checked against the store again after any translation is installed, replaced or removed.
+    """
+    generation = bible_store.generation()
+    entry = _open.get(translation)
+    if entry is not None and entry[0] == generation:
+        return entry[1]  # Already open and still current: no lock on the per-verse path
+    with _lock:
+        entry = _open.get(translation)
+        if entry is None or entry[0] != generation:
+            path = packed_path(translation)
+            packed = None
+            info = bible_store.translation_info(translation) if os.path.exists(path) else None
+            if info is not None:
+                try:
+                    packed = PackedBible(path, info)
+                    logging.debug(f"Mapped packed {translation} ({packed.verse_count} verses) from {path}")
+                except Exception as e:
+                    logging.error(f"Failed to open packed {translation}: {str(e)}")
+            entry = _open[translation] = (generation, packed)
+        return entry[1]
+
+
+def get_chapter(translation, book_id, chapter):
+    """Return a chapter from the packed file, or None if the translation is not packed."""
+    packed = get(translation)
+    return packed.chapter(book_id, chapter) if packed is not None else None
+
+
+def _forget(translation):
+    with _lock:
+        _, old = _open.pop(translation, (None, None))
+    if old is not None:
+        old.close()
+
+
+def pack(translation):
+    """Pack an installed translation from the corpus store; return the number of verses written."""
+    info = bible_store.translation_info(translation)
+    if info is None:
+        raise ValueError(f"{translation} is not installed; run python bible_store.py import {translation} first")
+    path = packed_path(translation)
+    _forget(translation)
+    count = write_packed(path, bible_store.all_verses(translation), info)
+    logging.debug(f"Packed {translation} ({count} verses) into {path}")
+    return count
+
+
+def unpack(translation):
+    """Forget and delete a translation's packed file."""
+    _forget(translation)
+    if os.path.exists(packed_path(translation)):
+        os.remove(packed_path(translation))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == 'pack':
+        verse_count = pack(sys.argv[2])
+        print(f"Packed {sys.argv[2]} ({verse_count} verses) into {packed_path(sys.argv[2])}")
+    elif len(sys.argv) == 3 and sys.argv[1] == 'remove':
+        unpack(sys.argv[2])
+        print(f"Removed packed {sys.argv[2]}")
+    else:
+        print("Usage: python bible_packed.py pack <TRANSLATION> | remove <TRANSLATION>")
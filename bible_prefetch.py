@@ -0,0 +1,147 @@
+# bible_prefetch.py
+# Background prefetching of the chapters a reader is likely to open next.
+
+import heapq
+import itertools
+import threading
+import logging
+from bible_utils import BOOK_MAP, REVERSE_BOOK_MAP, BOOK_CHAPTERS, fetch_chapter, is_chapter_local
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+PREFETCH_WORKERS = 2
+IDLE_ONLY = True
+
+# Lower numbers run first; user loads never wait behind any of these
+PRIORITY_NEXT = 1
+PRIORITY_PREVIOUS = 2
+PRIORITY_NEXT_BOOK = 3
+
+
+def adjacent_chapters(book, chapter):
+    """Return [(book_id, chapter, priority)] for the chapters around book/chapter.
+
+    Neighbours cross book boundaries the same way BibleReadDialog.navigate_chapter does,
+    and the first chapter of the next book is warmed as the reader nears the end of a book.
+    """
+    books = list(BOOK_MAP.keys())
+    book_index = books.index(book)
+    neighbours = []
+    if chapter < BOOK_CHAPTERS[book]:
+        neighbours.append((BOOK_MAP[book], chapter + 1, PRIORITY_NEXT))
+    elif book_index + 1 < len(books):
+        neighbours.append((BOOK_MAP[books[book_index + 1]], 1, PRIORITY_NEXT))
+    if chapter > 1:
+        neighbours.append((BOOK_MAP[book], chapter - 1, PRIORITY_PREVIOUS))
+    elif book_index > 0:
+        previous_book = books[book_index - 1]
+        neighbours.append((BOOK_MAP[previous_book], BOOK_CHAPTERS[previous_book], PRIORITY_PREVIOUS))
+    if BOOK_CHAPTERS[book] - 1 <= chapter < BOOK_CHAPTERS[book] and book_index + 1 < len(books):
+        neighbours.append((BOOK_MAP[books[book_index + 1]], 1, PRIORITY_NEXT_BOOK))
+    return neighbours
+
+
+class PrefetchScheduler:
+    """Warms the chapter cache from a priority queue on a small pool of daemon threads.
+
+    User-initiated loads go through fetch_now(), which pulls the chapter out of the queue,
+    joins a prefetch already in flight for it, and (in idle-only mode) holds back every
+    other prefetch until the user load is done. At most max_workers prefetches run at once.
+    """
+
+    def __init__(self, fetch=fetch_chapter, max_workers=PREFETCH_WORKERS, idle_only=IDLE_ONLY):
+        self.fetch = fetch
+        self.max_workers = max_workers
+        self.idle_only = idle_only
+        self._queue = []  # heap of (priority, seq, key)
+        self._queued = set()
+        self._in_flight = {}  # key -> threading.Event
+        self._user_loads = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads = []
+        self.counters = {'prefetched': 0, 'joined': 0, 'failed': 0}
+
+    def _ensure_threads(self):
+        while len(self._threads) < self.max_workers:
+            thread = threading.Thread(target=self._worker, name=f"prefetch-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._queue or (self.idle_only and self._user_loads):
+                    self._cond.wait()
+                _, _, key = heapq.heappop(self._queue)
+                self._queued.discard(key)
+                if key in self._in_flight:
+                    continue
+                done = threading.Event()
+                self._in_flight[key] = done
+            try:
+                self.fetch(*key)
+                self.counters['prefetched'] += 1
+                logging.debug(f"Prefetched {key}")
+            except Exception as e:
+                self.counters['failed'] += 1
+                logging.debug(f"Prefetch of {key} failed: {str(e)}")
+            finally:
+                with self._cond:
+                    self._in_flight.pop(key, None)
+                done.set()
+
+    def prefetch(self, key, priority=PRIORITY_NEXT):
+        """Queue a (translation, book_id, chapter) for background fetching."""
+        with self._cond:
+            if key in self._queued or key in self._in_flight:
+                return
+            self._ensure_threads()
+            heapq.heappush(self._queue, (priority, next(self._seq), key))
+            self._queued.add(key)
+            self._cond.notify()
+
+    def prefetch_around(self, translation, book, chapter):
+        """Replace the queue with the neighbours of the chapter the user just opened."""
+        self.cancel_prefetches()
+        for book_id, neighbour, priority in adjacent_chapters(book, chapter):
+            if not is_chapter_local(translation, book_id, neighbour):
+                self.prefetch((translation, book_id, neighbour), priority)
+
+    def cancel_prefetches(self):
+        """Drop every queued prefetch; ones already running are left to finish."""
+        with self._cond:
+            self._queue.clear()
+            self._queued.clear()
+
+    def fetch_now(self, translation, book_id, chapter):
+        """Fetch a chapter for the user, ahead of any queued prefetch."""
+        key = (translation, book_id, chapter)
+        with self._cond:
+            self._user_loads += 1
+            if key in self._queued:
+                self._queue = [item for item in self._queue if item[2] != key]
+                heapq.heapify(self._queue)
+                self._queued.discard(key)
+            in_flight = self._in_flight.get(key)
+        try:
+            if in_flight is not None:
+                logging.debug(f"Joining prefetch already in flight for {REVERSE_BOOK_MAP.get(book_id)} {chapter}")
+                self.counters['joined'] += 1
+                in_flight.wait()
+            return self.fetch(*key)
+        finally:
+            with self._cond:
+                self._user_loads -= 1
+                self._cond.notify_all()
+
+
+prefetcher = PrefetchScheduler()
@@ -0,0 +1,365 @@
+# bible_providers.py
+# Chapter providers tried in priority order (packed file, local corpus, chapter cache, bolls.life, mirrors),
+# with a circuit breaker per remote provider and hedged requests, so a slow or dead server costs a bounded wait.
+
+import os
+import time
+import threading
+import logging
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import requests
+import bible_http
+import bible_packed
+import bible_store
+from bible_cache import chapter_cache
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+# Other servers with the bolls.life API, e.g. BOLLS_MIRRORS=https://mirror.example.org,http://127.0.0.1:8765
+MIRRORS = [url.strip().rstrip('/') for url in os.environ.get('BOLLS_MIRRORS', '').split(',') if url.strip()]
+
+BREAKER_FAILURES = 3  # Consecutive failures that open a provider's circuit
+BREAKER_COOLDOWN = 30.0  # Seconds an open circuit skips the provider before one trial request
+HEDGE_REQUESTS = True
+HEDGE_MAX_DELAY = 1.0  # Seconds to wait before hedging, also used until a provider has enough latency samples
+HEDGE_MIN_DELAY = 0.1
+LATENCY_WINDOW = 100
+LATENCY_MIN_SAMPLES = 10
+LOOKUP_DEADLINE = 5.0  # Longest a remote chapter lookup waits, across every provider tried (the old read timeout)
+PROVIDER_WORKERS = 8
+MAX_HEDGES_IN_FLIGHT = PROVIDER_WORKERS // 2  # Hedges still running, so a slow server cannot tie up the pool
+
+
+class ProvidersUnavailable(requests.ConnectionError):
+    """No provider could serve a chapter: all failed, timed out or are cooling down."""
+
+
+class CircuitBreaker:
+    """Closed while a provider works; open (skipped) for cooldown seconds after repeated failures.
+
+    Once the cooldown has passed, one trial request is let through (half-open): success closes the
+    circuit, failure opens it for another cooldown.
+    """
+
+    def __init__(self, failures=BREAKER_FAILURES, cooldown=BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self._consecutive = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return 'closed'
+            return 'open' if time.monotonic() - self._opened_at < self.cooldown else 'half-open'
+
+    def allow(self):
+        """Return True if a request may be sent now; in half-open state only one request is allowed."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        """Count a failure; returns True if this opened (or re-opened) the circuit."""
+        with self._lock:
+            self._consecutive += 1
+            if self._probing or self._consecutive >= self.failures:
+                self._opened_at = time.monotonic()
+                self._probing = False
+                return True
+            return False
+
+
+class LatencyTracker:
+    """Recent response times of one provider, for choosing when to hedge."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        """Return the p-th percentile in seconds, or None with fewer than LATENCY_MIN_SAMPLES samples."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < LATENCY_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+
+class Provider(ABC):
+    """A source of chapters. get_chapter returns the verses, or None if this provider does not have them."""
+
+    remote = False
+
+    def __init__(self, name):
+        self.name = name
+
+    @abstractmethod
+    def get_chapter(self, translation, book_id, chapter):
+        """Return the chapter's verses as [{'verse': n, 'text': ...}], or None."""
+
+
+class PackedProvider(Provider):
+    def __init__(self):
+        super().__init__('packed')
+
+    def get_chapter(self, translation, book_id, chapter):
+        return bible_packed.get_chapter(translation, book_id, chapter)
+
+
+class StoreProvider(Provider):
+    def __init__(self):
+        super().__init__('corpus')
+
+    def get_chapter(self, translation, book_id, chapter):
+        return bible_store.get_chapter(translation, book_id, chapter)
+
+
+class CacheProvider(Provider):
+    def __init__(self):
+        super().__init__('cache')
+
+    def get_chapter(self, translation, book_id, chapter):
+        return chapter_cache.get((translation, book_id, chapter))
+
+
+class HttpProvider(Provider):
+    """bolls.life, or a mirror serving the same /get-text/ API; fresh chapters are written to the cache."""
+
+    remote = True
+
+    def __init__(self, name, base_url=None):
+        super().__init__(name)
+        self.base_url = base_url
+        self.breaker = CircuitBreaker()
+        self.latency = LatencyTracker()
+
+    def hedge_delay(self):
+        """Seconds to wait for this provider before also asking the next one: its recent p95 latency."""
+        p95 = self.latency.percentile(95)
+        return HEDGE_MAX_DELAY if p95 is None else min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, p95))
+
+    def get_chapter(self, translation, book_id, chapter):
+        key = (translation, book_id, chapter)
+        # No transport retries: the chain's breaker, hedging and failover stand in for them
+        response = bible_http.get_chapter(translation, book_id, chapter, headers=chapter_cache.validators(key),
+                                          base_url=self.base_url, retries=False)
+        if response.status_code == 304:
+            data = chapter_cache.revalidated(key)
+            if data is not None:
+                logging.debug(f"Revalidated cached {translation} {book_id}:{chapter} with {self.name}")
+                return data
+            response = bible_http.get_chapter(translation, book_id, chapter, base_url=self.base_url, retries=False)
+        response.raise_for_status()
+        data = response.json()
+        if not isinstance(data, list):
+            raise ValueError(f"{self.name} returned an unexpected response for {book_id}:{chapter}")
+        chapter_cache.put(key, data, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return data
+
+
+class ProviderChain:
+    """Serves a chapter from the first local provider that has it, else from the remote providers.
+
+    Remote providers are tried in order, skipping any whose circuit is open. With hedging on, if the
+    current provider has not answered within its p95 latency the next one is asked too and the first
+    answer wins. The caller never waits longer than deadline seconds; if nothing answers, a stale
+    cache entry is served if there is one, otherwise ProvidersUnavailable is raised at once. Requests
+    left behind are cancelled if they have not started, and no more than MAX_HEDGES_IN_FLIGHT hedges
+    run at once.
+    """
+
+    def __init__(self, providers, hedge=HEDGE_REQUESTS, deadline=LOOKUP_DEADLINE):
+        self.providers = providers
+        self.hedge = hedge
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=PROVIDER_WORKERS, thread_name_prefix='provider')
+        self._lock = threading.Lock()
+        self._hedges_in_flight = 0
+        self.counters = {'local': 0, 'remote': 0, 'hedged': 0, 'hedge_wins': 0, 'short_circuited': 0, 'stale': 0,
+                         'failed': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _reserve_hedge(self):
+        with self._lock:
+            if self._hedges_in_flight >= MAX_HEDGES_IN_FLIGHT:
+                return False
+            self._hedges_in_flight += 1
+            return True
+
+    def _release_hedge(self, future=None):
+        with self._lock:
+            self._hedges_in_flight -= 1
+
+    def _call(self, provider, key):
+        """Run one remote request on a pool thread, feeding its breaker and latency tracker."""
+        start = time.monotonic()
+        try:
+            data = provider.get_chapter(*key)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code < 500 and e.response.status_code != 429:
+                provider.breaker.record_success()  # The server is up; the request itself was bad
+            elif provider.breaker.record_failure():
+                logging.warning(f"{provider.name} circuit opened for {provider.breaker.cooldown:g}s: {str(e)}")
+            raise
+        except Exception as e:
+            if provider.breaker.record_failure():
+                logging.warning(f"{provider.name} circuit opened for {provider.breaker.cooldown:g}s: {str(e)}")
+            raise
+        provider.breaker.record_success()
+        provider.latency.add(time.monotonic() - start)
+        return data
+
+    def get_chapter(self, translation, book_id, chapter):
+        key = (translation, book_id, chapter)
+        for provider in self.providers:
+            if not provider.remote:
+                data = provider.get_chapter(*key)
+                if data is not None:
+                    self._count('local')
+                    logging.debug(f"Served {translation} {book_id}:{chapter} from {provider.name}")
+                    return data
+        errors = []
+        data = self._get_remote(key, errors)
+        if data is not None:
+            self._count('remote')
+            return data
+        data = chapter_cache.get_stale(key)
+        if data is not None:
+            self._count('stale')
+            logging.warning(f"Serving stale cached {translation} {book_id}:{chapter}: {'; '.join(errors)}")
+            return data
+        self._count('failed')
+        raise ProvidersUnavailable('; '.join(errors) or "Every Bible server is cooling down after repeated "
+                                                        "failures; try again shortly.")
+
+    def _get_remote(self, key, errors):
+        candidates = iter([provider for provider in self.providers if provider.remote])
+        pending = {}  # future -> provider
+
+        def launch():
+            """Submit the next provider whose circuit allows it; returns its future, or None."""
+            for provider in candidates:
+                if provider.breaker.allow():
+                    future = self._executor.submit(self._call, provider, key)
+                    pending[future] = provider
+                    return future
+                self._count('short_circuited')
+                errors.append(f"{provider.name}: cooling down after repeated failures")
+            return None
+
+        future = launch()
+        current = primary = pending.get(future)
+        hedged = False
+        can_hedge = self.hedge
+        deadline = time.monotonic() + self.deadline
+        try:
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    errors.extend(f"{provider.name}: no answer within {self.deadline:g}s"
+                                  for provider in pending.values())
+                    return None
+                hedge_at = current.hedge_delay() if can_hedge and len(pending) == 1 and current is not None else None
+                done, _ = wait(pending, timeout=min(remaining, hedge_at) if hedge_at else remaining,
+                               return_when=FIRST_COMPLETED)
+                if not done:
+                    if hedge_at:
+                        if not self._reserve_hedge():
+                            can_hedge = False  # Enough hedges are already running; wait for this provider
+                            logging.debug(f"{current.name} slower than {hedge_at:.2f}s; too many hedges in flight")
+                            continue
+                        slow = current
+                        future = launch()
+                        if future is None:
+                            self._release_hedge()
+                            current = None
+                            continue
+                        future.add_done_callback(self._release_hedge)
+                        current = pending[future]
+                        hedged = True
+                        self._count('hedged')
+                        logging.debug(f"{slow.name} slower than {hedge_at:.2f}s; hedging with {current.name}")
+                    continue
+                for future in done:
+                    provider = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        errors.append(f"{provider.name}: {str(e)}")
+                        continue
+                    if data is not None:
+                        if hedged and provider is not primary:
+                            self._count('hedge_wins')
+                        return data
+                if not pending:
+                    current = pending.get(launch())  # Fail over to the next provider
+            return None
+        finally:
+            for future in pending:
+                future.cancel()  # Only stops requests still queued; one already sent runs to its timeout
+
+    def status(self):
+        """Return [(name, circuit state, p95 seconds or None)] for the remote providers."""
+        return [(p.name, p.breaker.state, p.latency.percentile(95)) for p in self.providers if p.remote]
+
+
+def default_providers(mirrors=None):
+    mirrors = MIRRORS if mirrors is None else mirrors
+    return [PackedProvider(), StoreProvider(), CacheProvider(), HttpProvider('bolls.life')] + \
+        [HttpProvider(url, url) for url in mirrors]
+
+
+providers = ProviderChain(default_providers())
+
+
+def get_chapter(translation, book_id, chapter):
+    """Return the verses of a chapter from the first provider that can serve it."""
+    return providers.get_chapter(translation, book_id, chapter)
+
+
+def configure(settings):
+    """Apply sermon['settings'] ('bible_mirrors': list of base URLs, 'hedge_requests': bool)."""
+    mirrors = settings.get('bible_mirrors')
+    if mirrors:
+        if isinstance(mirrors, str):
+            mirrors = mirrors.split(',')
+        # Providers that stay configured keep their circuit state and latency history
+        known = {p.base_url: p for p in providers.providers if p.remote}
+        urls = [url.strip().rstrip('/') for url in mirrors if url.strip()]
+        providers.providers = [p for p in providers.providers if not p.remote] + [known[None]] + \
+            [known.get(url) or HttpProvider(url, url) for url in urls]
+    if 'hedge_requests' in settings:
+        providers.hedge = bool(settings['hedge_requests'])
+    logging.debug(f"Bible providers: {', '.join(p.name for p in providers.providers)} "
+                  f"(hedging {'on' if providers.hedge else 'off'})")
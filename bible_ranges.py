@@ -0,0 +1,202 @@
+# bible_ranges.py
+# Canonical verse sets: a passage is a sorted run of verse ordinals, so ordering, overlap and merging are integer operations.
+
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from heapq import merge
+from bible_utils import RefRange, parse_refs, format_range
+from bible_versification import CHAPTER_ORDINALS, ORDINAL_COUNT, chapter_count, ordinal, ordinal_ref, range_span
+
+
+class VerseSet:
+    """An immutable set of verses stored as disjoint, sorted half-open ordinal spans in one flat array.
+
+    Ordinals are the dense canonical numbering from bible_versification (Genesis 1:1 is 0). Adjacent
+    spans are merged, so two sets covering the same verses always compare equal.
+    """
+
+    __slots__ = ('_bounds',)
+
+    def __init__(self, spans=()):
+        bounds = array('I')
+        for start, stop in sorted(spans):
+            if start >= stop:
+                continue
+            if bounds and start <= bounds[-1]:
+                bounds[-1] = max(bounds[-1], stop)
+            else:
+                bounds.extend((start, stop))
+        self._bounds = bounds
+
+    @classmethod
+    def _from_bounds(cls, bounds):
+        verse_set = cls.__new__(cls)
+        verse_set._bounds = bounds
+        return verse_set
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Build a set from RefRange values, e.g. the result of parse_refs."""
+        return cls(range_span(r) for r in ranges)
+
+    @classmethod
+    def parse(cls, text, translation=None):
+        """Parse a reference list such as 'Rom 3:23; 6:23' into a set; raises ValueError like parse_refs."""
+        return cls.from_ranges(parse_refs(text, translation))
+
+    @classmethod
+    def verse(cls, book_id, chapter, verse):
+        n = ordinal(book_id, chapter, verse)
+        if n is None:
+            raise ValueError(f"Verse {book_id}:{chapter}:{verse} is not in the verse table")
+        return cls._from_bounds(array('I', (n, n + 1)))
+
+    def spans(self):
+        """Return the (start, stop) ordinal spans in canonical order."""
+        bounds = self._bounds
+        return list(zip(bounds[::2], bounds[1::2]))
+
+    @property
+    def first(self):
+        return self._bounds[0] if self._bounds else ORDINAL_COUNT
+
+    @property
+    def last(self):
+        return self._bounds[-1] - 1 if self._bounds else ORDINAL_COUNT
+
+    def __len__(self):
+        bounds = self._bounds
+        return sum(bounds[i + 1] - bounds[i] for i in range(0, len(bounds), 2))
+
+    def __bool__(self):
+        return bool(self._bounds)
+
+    def __iter__(self):
+        for start, stop in self.spans():
+            yield from range(start, stop)
+
+    def __eq__(self, other):
+        return isinstance(other, VerseSet) and self._bounds == other._bounds
+
+    def __hash__(self):
+        return hash(tuple(self._bounds))
+
+    def __contains__(self, item):
+        """True for an ordinal inside the set, or a VerseSet entirely inside it."""
+        if isinstance(item, VerseSet):
+            return item.issubset(self)
+        index = bisect_right(self._bounds, item)
+        return index % 2 == 1
+
+    def union(self, other):
+        bounds = array('I')
+        for start, stop in merge(self.spans(), other.spans()):
+            if bounds and start <= bounds[-1]:
+                bounds[-1] = max(bounds[-1], stop)
+            else:
+                bounds.extend((start, stop))
+        return VerseSet._from_bounds(bounds)
+
+    def intersection(self, other):
+        a, b = self._bounds, other._bounds
+        bounds = array('I')
+        i = j = 0
+        while i < len(a) and j < len(b):
+            start, stop = max(a[i], b[j]), min(a[i + 1], b[j + 1])
+            if start < stop:
+                bounds.extend((start, stop))
+            if a[i + 1] < b[j + 1]:
+                i += 2
+            else:
+                j += 2
+        return VerseSet._from_bounds(bounds)
+
+    def difference(self, other):
+        bounds = array('I')
+        b = other._bounds
+        j = 0
+        for start, stop in self.spans():
+            while j < len(b) and b[j + 1] <= start:
+                j += 2
+            k = j
+            while start < stop and k < len(b) and b[k] < stop:
+                if b[k] > start:
+                    bounds.extend((start, b[k]))
+                start = max(start, b[k + 1])
+                k += 2
+            if start < stop:
+                bounds.extend((start, stop))
+        return VerseSet._from_bounds(bounds)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def overlaps(self, other):
+        return bool(self.intersection(other))
+
+    def issubset(self, other):
+        return not self.difference(other)
+
+    def to_ranges(self):
+        """Return the set as RefRange values, one per contiguous run within a book; whole chapters have no verses."""
+        ranges = []
+        for start, stop in self.spans():
+            while start < stop:
+                book_id, chapter, verse = ordinal_ref(start)
+                last_chapter = CHAPTER_ORDINALS[(book_id, chapter_count(book_id))]
+                end = min(stop, last_chapter[0] + last_chapter[1])
+                _, end_chapter, end_verse = ordinal_ref(end - 1)
+                if verse == 1 and end_verse == CHAPTER_ORDINALS[(book_id, end_chapter)][1]:
+                    ranges.append(RefRange(book_id, chapter, None, end_chapter, None))
+                else:
+                    ranges.append(RefRange(book_id, chapter, verse, end_chapter, end_verse))
+                start = end
+        return ranges
+
+    def __str__(self):
+        return '; '.join(format_range(r) for r in self.to_ranges())
+
+    def __repr__(self):
+        return f"VerseSet({str(self)!r})"
+
+
+@lru_cache(maxsize=4096)
+def ref_set(ref):
+    """Return the VerseSet for a note's reference, or None if it is not a Bible reference (e.g. 'Note')."""
+    try:
+        return VerseSet.parse(ref)
+    except ValueError:
+        return None
+
+
+def sort_key(ref):
+    """Sort key putting references in canonical order (Genesis before 1 John) and other labels after them."""
+    verse_set = ref_set(ref or '')
+    if verse_set:
+        return 0, verse_set.first, verse_set.last, ''
+    return 1, 0, 0, (ref or '').lower()
+
+
+def notes_coverage(verses_notes):
+    """Return every verse the references in sermon['verses_notes'] cover, as one VerseSet."""
+    spans = []
+    for vn in verses_notes:
+        verse_set = ref_set(vn.get('ref') or '')
+        if verse_set:
+            spans.extend(verse_set.spans())
+    return VerseSet(spans)
+
+
+def overlapping_notes(verses_notes, ref, exclude=None):
+    """Return the references in sermon['verses_notes'] that share a verse with ref (skipping index exclude)."""
+    verse_set = ref_set(ref or '')
+    if not verse_set:
+        return []
+    overlapping = []
+    for i, vn in enumerate(verses_notes):
+        other = ref_set(vn.get('ref') or '')
+        if i != exclude and other and other.overlaps(verse_set):
+            overlapping.append(vn['ref'])
+    return overlapping
@@ -1,7 +1,12 @@
 import requests
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, QPushButton, QWidget, QScrollArea, QMessageBox, QLineEdit
-from PyQt6.QtCore import Qt
-from bible_utils import BOOK_MAP, REVERSE_BOOK_MAP, BOOK_CHAPTERS, parse_ref, fetch_verse_text
+from PyQt6.QtCore import Qt, QThreadPool, QTimer
+from bible_utils import BOOK_MAP, REVERSE_BOOK_MAP, BOOK_CHAPTERS, parse_refs, expand_range
+from bible_cache import chapter_cache
+from bible_workers import FetchWorker
+from bible_prefetch import prefetcher
+from bible_compare import BibleCompareDialog
+from bible_ranges import ref_set, notes_coverage, overlapping_notes
 import logging
 
 # Set up logging
@@ -15,15 +20,33 @@ logging.basicConfig(
 )
 
 class BibleReadDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, ref=""):
         super().__init__(parent)
         self.parent = parent
         self.setWindowTitle("Read Bible")
         self.setMinimumSize(800, 600)
         self.setWindowFlags(Qt.WindowType.Window | Qt.WindowType.WindowMinMaxButtonsHint | Qt.WindowType.WindowCloseButtonHint | Qt.WindowType.WindowTitleHint | Qt.WindowType.WindowSystemMenuHint)
         self.setModal(False)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2)
+        self.load_request_id = 0
+        self.pending_worker = None
+        self.pending_handler = None
+        self.displayed_chapter = ("Genesis", 1)
+        # Navigation scheduler: every combo change or button press requests a load, and the
+        # requests made within one pass of the event loop collapse into a single load.
+        self.load_timer = QTimer(self)
+        self.load_timer.setSingleShot(True)
+        self.load_timer.setInterval(0)
+        self.load_timer.timeout.connect(self.flush_load)
+        self.loaded_state = None
+        self.load_requests = 0
+        self.loads_issued = 0
         self.setup_ui()
         self.load_initial_chapter()
+        if ref:
+            self.ref_input.setText(ref)
+            self.jump_to_reference()
 
     def setup_ui(self):
         """Set up the dialog UI."""
@@ -35,13 +58,13 @@ class BibleReadDialog(QDialog):
         self.book_combo = QComboBox()
         self.book_combo.addItems(list(BOOK_MAP.keys()))
         self.book_combo.currentTextChanged.connect(self.update_chapter_combo)
-        self.book_combo.currentTextChanged.connect(self.load_chapter)
+        self.book_combo.currentTextChanged.connect(self.schedule_load)
         nav_layout.addWidget(QLabel("Book:"))
         nav_layout.addWidget(self.book_combo)
 
         self.chapter_combo = QComboBox()
         self.chapter_combo.addItems([str(i) for i in range(1, 2)])  # Placeholder, updated later
-        self.chapter_combo.currentTextChanged.connect(self.load_chapter)
+        self.chapter_combo.currentTextChanged.connect(self.schedule_load)
         nav_layout.addWidget(QLabel("Chapter:"))
         nav_layout.addWidget(self.chapter_combo)
 
@@ -49,6 +72,11 @@ class BibleReadDialog(QDialog):
         self.ref_input.setPlaceholderText("Enter reference (e.g., John 3:16)")
         self.ref_input.returnPressed.connect(self.jump_to_reference)
         nav_layout.addWidget(self.ref_input)
+
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setStyleSheet("color: #ffc107;")
+        self.loading_label.hide()
+        nav_layout.addWidget(self.loading_label)
         layout.addLayout(nav_layout)
 
         # Verses display
@@ -79,6 +107,11 @@ class BibleReadDialog(QDialog):
         copy_all_btn.clicked.connect(self.copy_all_to_notes)
         buttons_layout.addWidget(copy_all_btn)
 
+        compare_btn = QPushButton("Compare Translations")
+        compare_btn.setStyleSheet("background-color: #17a2b8; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
+        compare_btn.clicked.connect(self.compare_translations)
+        buttons_layout.addWidget(compare_btn)
+
         layout.addLayout(buttons_layout)
 
     def update_chapter_combo(self):
@@ -93,8 +126,94 @@ class BibleReadDialog(QDialog):
         if self.chapter_combo.currentText() == "":
             self.chapter_combo.setCurrentText("1")
 
+    def schedule_load(self):
+        """Ask for the selected chapter to be loaded once the navigation state settles."""
+        self.load_requests += 1
+        self.load_timer.start()
+
+    def flush_load(self):
+        """Issue one load for the settled (book, chapter) unless it is already loaded or loading."""
+        state = (self.book_combo.currentText(), self.chapter_combo.currentText())
+        if state != self.loaded_state:
+            self.loaded_state = state
+            self.loads_issued += 1
+            self.load_chapter()
+        logging.debug(f"Chapter loads: {self.load_requests} requested, {self.loads_issued} issued, "
+                      f"{self.load_requests - self.loads_issued} coalesced")
+
+    def get_translation(self):
+        """Return the sermon's default translation."""
+        return self.parent.sermon.get('settings', {}).get('default_translation', 'WEB') if isinstance(self.parent.sermon, dict) else 'WEB'
+
+    def start_fetch(self, on_result, fn, *args):
+        """Run fn(*args) on the worker pool, superseding any load still pending."""
+        if self.pending_worker is not None:
+            self.pending_worker.cancel(self.thread_pool)
+        self.load_request_id += 1
+        worker = FetchWorker(self.load_request_id, fn, *args)
+        worker.signals.finished.connect(self.on_fetch_finished)
+        worker.signals.failed.connect(self.on_fetch_failed)
+        self.pending_worker = worker
+        self.pending_handler = on_result
+        self.loading_label.show()
+        self.thread_pool.start(worker)
+
+    def on_fetch_finished(self, request_id, result):
+        """Deliver a worker result to its handler unless it has been superseded."""
+        if request_id != self.load_request_id:
+            logging.debug(f"Discarding superseded request {request_id}")
+            return
+        self.pending_worker = None
+        self.loading_label.hide()
+        try:
+            self.pending_handler(result)
+        except Exception as e:
+            logging.error(f"Failed to display chapter: {str(e)}")
+            QMessageBox.warning(self, "API Error", f"Failed to display chapter: {str(e)}")
+
+    def on_fetch_failed(self, request_id, error):
+        """Report a failed load unless it has been superseded."""
+        if request_id != self.load_request_id:
+            return
+        self.pending_worker = None
+        self.loaded_state = None  # Let the same chapter be retried
+        self.loading_label.hide()
+        if isinstance(error, requests.RequestException):
+            logging.error(f"Network error loading chapter: {str(error)}")
+            QMessageBox.warning(self, "API Error", f"Network error: {str(error)}")
+        else:
+            logging.error(f"Failed to load chapter: {str(error)}")
+            QMessageBox.warning(self, "API Error", f"Failed to fetch chapter: {str(error)}")
+
+    def clear_verses(self):
+        """Remove all verse rows from the display."""
+        while self.verses_layout.count():
+            item = self.verses_layout.takeAt(0)
+            widget = item.widget()
+            if widget:
+                widget.deleteLater()
+
+    def add_verse_row(self, verse, book, chapter):
+        """Add a verse label with its Copy Verse and Related buttons."""
+        verse_label = QLabel(f"{verse['verse']}. {verse['text']}")
+        verse_label.setStyleSheet("color: #ffffff; margin: 5px 0;")
+        verse_label.setWordWrap(True)
+        copy_btn = QPushButton("Copy Verse")
+        copy_btn.setStyleSheet("background-color: #28a745; color: white; border: none; padding: 2px 5px; border-radius: 3px;")
+        copy_btn.clicked.connect(lambda checked, v=verse.copy(): self.copy_to_notes(v, book, chapter))
+        related_btn = QPushButton("Related")
+        related_btn.setStyleSheet("background-color: #17a2b8; color: white; border: none; padding: 2px 5px; border-radius: 3px;")
+        related_btn.clicked.connect(lambda checked, n=verse['verse']: self.show_related(f"{book} {chapter}:{n}"))
+        h_layout = QHBoxLayout()
+        h_layout.addWidget(verse_label)
+        h_layout.addWidget(copy_btn)
+        h_layout.addWidget(related_btn)
+        widget = QWidget()
+        widget.setLayout(h_layout)
+        self.verses_layout.addWidget(widget)
+
     def load_chapter(self):
-        """Load and display chapter content."""
+        """Start loading the selected chapter in the background."""
         logging.debug("Loading chapter")
         try:
             current_book = self.book_combo.currentText()
@@ -108,42 +227,22 @@ class BibleReadDialog(QDialog):
             if current_book not in BOOK_MAP or current_chapter < 1 or current_chapter > BOOK_CHAPTERS[current_book]:
                 raise ValueError("Invalid book or chapter")
             book_id = BOOK_MAP[current_book]
-            translation = self.parent.sermon.get('settings', {}).get('default_translation', 'WEB') if isinstance(self.parent.sermon, dict) else 'WEB'
-            url = f"https://bolls.life/get-text/{translation}/{book_id}/{current_chapter}/"
-            logging.debug(f"Requesting URL: {url}")
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-
-            # Clear existing verses
-            while self.verses_layout.count():
-                item = self.verses_layout.takeAt(0)
-                widget = item.widget()
-                if widget:
-                    widget.deleteLater()
-
-            # Add verses
-            for verse in data:
-                verse_label = QLabel(f"{verse['verse']}. {verse['text']}")
-                verse_label.setStyleSheet("color: #ffffff; margin: 5px 0;")
-                verse_label.setWordWrap(True)
-                copy_btn = QPushButton("Copy Verse")
-                copy_btn.setStyleSheet("background-color: #28a745; color: white; border: none; padding: 2px 5px; border-radius: 3px;")
-                copy_btn.clicked.connect(lambda checked, v=verse.copy(): self.copy_to_notes(v, current_book, current_chapter))
-                h_layout = QHBoxLayout()
-                h_layout.addWidget(verse_label)
-                h_layout.addWidget(copy_btn)
-                widget = QWidget()
-                widget.setLayout(h_layout)
-                self.verses_layout.addWidget(widget)
-            self.verses_layout.addStretch()
-        except requests.RequestException as e:
-            logging.error(f"Network error loading chapter: {str(e)}")
-            QMessageBox.warning(self, "API Error", f"Network error: {str(e)}")
+            self.loading_label.setText(f"Loading {current_book} {current_chapter}...")
+            self.start_fetch(lambda data: self.display_chapter(data, current_book, current_chapter),
+                             prefetcher.fetch_now, self.get_translation(), book_id, current_chapter)
         except Exception as e:
             logging.error(f"Failed to load chapter: {str(e)}")
             QMessageBox.warning(self, "API Error", f"Failed to fetch chapter: {str(e)}")
 
+    def display_chapter(self, data, book, chapter):
+        """Replace the displayed verses with a loaded chapter."""
+        self.displayed_chapter = (book, chapter)
+        self.clear_verses()
+        for verse in data:
+            self.add_verse_row(verse, book, chapter)
+        self.verses_layout.addStretch()
+        prefetcher.prefetch_around(self.get_translation(), book, chapter)
+
     def navigate_chapter(self, direction):
         """Navigate to previous or next chapter."""
         logging.debug("Navigating chapter")
@@ -166,49 +265,53 @@ class BibleReadDialog(QDialog):
                         self.chapter_combo.setCurrentText("1")
                     else:
                         self.chapter_combo.setCurrentText(str(BOOK_CHAPTERS[new_book]))
-            self.load_chapter()
+            self.schedule_load()
         except Exception as e:
             logging.error(f"Navigation error: {str(e)}")
             QMessageBox.warning(self, "Navigation Error", f"Failed to navigate: {str(e)}")
 
     def jump_to_reference(self):
-        """Jump to a specific Bible reference."""
+        """Jump to a specific Bible reference; a verse or verse range shows just those verses."""
         logging.debug("Jumping to reference")
         try:
             ref = self.ref_input.text().strip()
-            book_id, chapter, verse = parse_ref(ref)
-            book = REVERSE_BOOK_MAP[book_id]
+            r = parse_refs(ref, self.get_translation())[0]
+            book = REVERSE_BOOK_MAP[r.book_id]
+            chapter = r.start_chapter
+            self.book_combo.blockSignals(True)
             self.book_combo.setCurrentText(book)
+            self.book_combo.blockSignals(False)
             self.update_chapter_combo()
+            self.chapter_combo.blockSignals(True)
             self.chapter_combo.setCurrentText(str(chapter))
-            if verse:
-                # Clear existing verses
-                while self.verses_layout.count():
-                    item = self.verses_layout.takeAt(0)
-                    widget = item.widget()
-                    if widget:
-                        widget.deleteLater()
-                translation = self.parent.sermon.get('settings', {}).get('default_translation', 'WEB') if isinstance(self.parent.sermon, dict) else 'WEB'
-                verse_text = fetch_verse_text(ref, translation)
-                verse_label = QLabel(f"{verse}. {verse_text}")
-                verse_label.setStyleSheet("color: #ffffff; margin: 5px 0;")
-                verse_label.setWordWrap(True)
-                copy_btn = QPushButton("Copy Verse")
-                copy_btn.setStyleSheet("background-color: #28a745; color: white; border: none; padding: 2px 5px; border-radius: 3px;")
-                copy_btn.clicked.connect(lambda checked, v={'verse': str(verse), 'text': verse_text}: self.copy_to_notes(v, book, chapter))
-                h_layout = QHBoxLayout()
-                h_layout.addWidget(verse_label)
-                h_layout.addWidget(copy_btn)
-                widget = QWidget()
-                widget.setLayout(h_layout)
-                self.verses_layout.addWidget(widget)
-                self.verses_layout.addStretch()
+            self.chapter_combo.blockSignals(False)
+            if r.start_verse is not None:
+                # The verse numbers come from the versification table; only the chapter is fetched
+                verses = [verse for verse_chapter, verse in expand_range(r, self.get_translation())
+                          if verse_chapter == chapter]
+                self.load_timer.stop()
+                self.loaded_state = (book, str(chapter), ref)
+                self.loading_label.setText(f"Loading {ref}...")
+                self.start_fetch(lambda data: self.display_verses(data, book, chapter, verses),
+                                 prefetcher.fetch_now, self.get_translation(), r.book_id, chapter)
             else:
-                self.load_chapter()
+                self.schedule_load()
         except Exception as e:
             logging.error(f"Jump to reference error: {str(e)}")
             QMessageBox.warning(self, "Invalid Reference", f"Invalid reference: {str(e)}")
 
+    def display_verses(self, data, book, chapter, verses):
+        """Replace the displayed verses with the given verse numbers of a loaded chapter."""
+        self.displayed_chapter = (book, chapter)
+        self.clear_verses()
+        wanted = set(verses)
+        shown = [verse for verse in data if int(verse['verse']) in wanted]
+        for verse in shown:
+            self.add_verse_row(verse, book, chapter)
+        if not shown:
+            self.add_verse_row({'verse': str(verses[0]), 'text': "Verse not found in chapter."}, book, chapter)
+        self.verses_layout.addStretch()
+
     def copy_to_notes(self, verse, book, chapter):
         """Copy a single verse to sermon notes."""
         logging.debug(f"Starting copy_to_notes with verse: {verse}")
@@ -236,6 +339,13 @@ class BibleReadDialog(QDialog):
                     verse_num = 'Unknown'
                     verse_text = verse_text or 'No text available'
                     ref = f"{book} {chapter}:Unknown"
+            overlapping = overlapping_notes(self.parent.sermon['verses_notes'], ref)
+            if overlapping:
+                answer = QMessageBox.question(self, "Already in Notes",
+                                              f"{ref} overlaps {', '.join(overlapping)} already in your "
+                                              f"verses/notes. Copy it anyway?")
+                if answer != QMessageBox.StandardButton.Yes:
+                    return
             note_dict = {
                 'ref': ref,
                 'text': verse_text,
@@ -255,6 +365,18 @@ class BibleReadDialog(QDialog):
             logging.error(f"Error in copy_to_notes: {str(e)}")
             QMessageBox.critical(self, "Copy Error", f"Failed to copy verse: {str(e)}")
 
+    def compare_translations(self):
+        """Open the displayed chapter side by side in several translations."""
+        book, chapter = self.displayed_chapter
+        dialog = BibleCompareDialog(self.parent, f"{book} {chapter}")
+        dialog.exec()
+
+    def show_related(self, ref):
+        """Open the verses most similar in wording to one verse."""
+        from bible_related import RelatedVersesDialog  # Loaded on first use, keeping it off the reader's startup path
+        dialog = RelatedVersesDialog(self.parent, self.get_translation(), ref)
+        dialog.exec()
+
     def copy_all_to_notes(self):
         """Copy all verses in the current chapter to sermon notes."""
         logging.debug("Starting copy_all_to_notes")
@@ -265,8 +387,7 @@ class BibleReadDialog(QDialog):
             if 'verses_notes' not in self.parent.sermon:
                 self.parent.sermon['verses_notes'] = []
             title = self.parent.sermon.get('title', 'Unknown Title')
-            current_book = self.book_combo.currentText()
-            current_chapter = self.chapter_combo.currentText()
+            current_book, current_chapter = self.displayed_chapter
             all_notes = []
             full_text = []
             for i in range(self.verses_layout.count()):
@@ -296,7 +417,11 @@ class BibleReadDialog(QDialog):
                 logging.warning("No verses to copy")
                 QMessageBox.warning(self, "No Verses", "No verses available to copy.")
                 return
-            self.parent.sermon['verses_notes'].extend(all_notes)
+            # Verses already covered by a note (e.g. a "John 3:16-18" entry) are not added twice
+            covered = notes_coverage(self.parent.sermon['verses_notes'])
+            new_notes = [note for note in all_notes if not (ref_set(note['ref']) and ref_set(note['ref']) in covered)]
+            skipped = len(all_notes) - len(new_notes)
+            self.parent.sermon['verses_notes'].extend(new_notes)
             from PyQt6.QtWidgets import QApplication
             clipboard = QApplication.clipboard()
             clipboard.setText("\n".join(full_text))
@@ -305,7 +430,10 @@ class BibleReadDialog(QDialog):
                 self.parent.update_verses_list()
                 self.parent.verses_list.blockSignals(False)
             logging.debug("Copied all verses to notes and clipboard")
-            QMessageBox.information(self, "Success", "All verses copied to notes and clipboard as individual entries.")
+            message = "All verses copied to notes and clipboard as individual entries."
+            if skipped:
+                message += f"\n{skipped} verses already in your notes were not added again."
+            QMessageBox.information(self, "Success", message)
         except Exception as e:
             logging.error(f"Error in copy_all_to_notes: {str(e)}")
             QMessageBox.critical(self, "Copy Error", f"Failed to copy verses: {str(e)}")
@@ -316,4 +444,13 @@ class BibleReadDialog(QDialog):
         self.book_combo.setCurrentText("Genesis")
         self.update_chapter_combo()
         self.chapter_combo.setCurrentText("1")
-        self.load_chapter()
\ No newline at end of file
+        self.schedule_load()
+
+    def done(self, result):
+        """Cancel outstanding loads and log chapter cache counters so repeated navigation can be checked in sermon.log."""
+        if self.pending_worker is not None:
+            self.pending_worker.cancel(self.thread_pool)
+        self.load_request_id += 1
+        prefetcher.cancel_prefetches()
+        chapter_cache.log_stats()
+        super().done(result)
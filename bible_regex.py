@@ -0,0 +1,198 @@
+# bible_regex.py
+# Regular-expression search over an installed translation: the verses are split into one shard per core and
+# scanned in parallel worker processes, each of which keeps the translation in memory between searches.
+
+import os
+import re
+import sys
+import time
+import queue
+import signal
+import threading
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+import bible_store
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+SCAN_WORKERS = os.cpu_count() or 1  # One shard per worker process
+MAX_MATCHES = 1000  # Results returned per search (all matches are counted)
+CANCEL_POLL_SECONDS = 0.1
+SCAN_TIMEOUT = 10.0  # A search still running after this long (a runaway pattern) is stopped
+
+_MARKUP = re.compile(r'<S>\d+</S>|<[^>]+>')  # Strong's numbers and HTML tags are not matched against
+
+_idle = []  # Warm pools not in use by a search; at most one is kept
+_lock = threading.Lock()
+
+# In each worker process: translation -> (source, refs, texts, texts without markup)
+_corpus = {}
+
+
+def _load(translation, source):
+    """Return a worker's copy of a translation, reading it from the corpus store if it changed since last time."""
+    cached = _corpus.get(translation)
+    if cached is None or cached[0] != source:
+        rows = bible_store.all_verses(translation)
+        cached = (source, [row[:3] for row in rows], [row[3] for row in rows],
+                  [_MARKUP.sub('', row[3]) for row in rows])
+        _corpus[translation] = cached
+    return cached
+
+
+def warm(translation, source):
+    """Load a translation in a worker process ahead of the first search; returns its verse count."""
+    return len(_load(translation, source)[1])
+
+
+def scan_shard(translation, source, pattern, flags, shard, shards, limit=MAX_MATCHES):
+    """Search one shard of a translation. Runs in a worker process.
+
+    Returns (shard, match count, the first limit matches as {'book', 'chapter', 'verse', 'text'} dicts).
+    """
+    _, refs, texts, plain = _load(translation, source)
+    start, stop = len(refs) * shard // shards, len(refs) * (shard + 1) // shards
+    search = re.compile(pattern, flags).search
+    found = [i for i in range(start, stop) if search(plain[i])]
+    results = [{'book': refs[i][0], 'chapter': refs[i][1], 'verse': refs[i][2], 'text': texts[i]}
+               for i in found[:limit]]
+    return shard, len(found), results
+
+
+def _init_worker(pids):
+    """Pool initializer: report this worker's pid so its search can kill it, and keep DEBUG output quiet."""
+    logging.getLogger().setLevel(logging.WARNING)
+    pids.put(os.getpid())
+
+
+class _ScanPool:
+    """Worker processes used by one search at a time, so stopping a search only kills its own workers."""
+
+    def __init__(self):
+        context = multiprocessing.get_context('spawn')
+        self._pids = context.Queue()
+        self.executor = ProcessPoolExecutor(max_workers=SCAN_WORKERS, mp_context=context,
+                                            initializer=_init_worker, initargs=(self._pids,))
+
+    def terminate(self):
+        """Kill the worker processes, abandoning whatever they are matching."""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        pids = []
+        while True:
+            try:
+                pids.append(self._pids.get_nowait())
+            except queue.Empty:
+                break
+        for pid in pids:
+            try:
+                os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except OSError:
+                pass  # Already exited
+        logging.debug(f"Stopped {len(pids)} regex worker processes")
+
+
+def _acquire():
+    """Take the idle warm pool, or start a new one if another search is using it."""
+    with _lock:
+        if _idle:
+            return _idle.pop()
+    return _ScanPool()
+
+
+def _release(pool):
+    with _lock:
+        if not _idle:
+            _idle.append(pool)
+            return
+    pool.executor.shutdown(wait=False)
+
+
+def prepare(translation):
+    """Start the worker processes and load the translation in them; returns immediately."""
+    info = bible_store.translation_info(translation)
+    if info is None:
+        return
+    pool = _acquire()
+    for _ in range(SCAN_WORKERS):
+        pool.executor.submit(warm, translation, tuple(info))
+    _release(pool)
+
+
+def compile_pattern(pattern, ignore_case=True):
+    """Check a pattern before it is sent to the workers; raises ValueError with the regex error."""
+    try:
+        return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        raise ValueError(f"Invalid regular expression: {str(e)}")
+
+
+def scan(translation, pattern, ignore_case=True, progress_callback=None, is_cancelled=None):
+    """Return (match count, first MAX_MATCHES matching verses in canonical order) for a regex over a translation.
+
+    Each verse is matched on its own, with markup removed. progress_callback(shard, shards, count, results)
+    is called as each shard finishes, in the order they finish. If is_cancelled() becomes true the search
+    stops and returns None. Raises ValueError for a bad pattern or a translation not installed, and
+    TimeoutError if the search runs past SCAN_TIMEOUT. A stopped search kills its worker processes (not
+    those of other searches), since a pattern that backtracks catastrophically would otherwise keep them busy.
+    """
+    info = bible_store.translation_info(translation)
+    if info is None:
+        raise ValueError(f"Regex search needs {translation} installed; download it in Settings.")
+    flags = compile_pattern(pattern, ignore_case).flags
+    start = time.perf_counter()
+    shards = SCAN_WORKERS
+    pool = _acquire()
+    pending = {pool.executor.submit(scan_shard, translation, tuple(info), pattern, flags, shard, shards)
+               for shard in range(shards)}
+    by_shard = {}
+    finished = False
+    try:
+        while pending:
+            if is_cancelled is not None and is_cancelled():
+                logging.debug(f"Regex search for {pattern} cancelled")
+                return None
+            if time.perf_counter() - start > SCAN_TIMEOUT:
+                raise TimeoutError(f"The pattern took longer than {SCAN_TIMEOUT:g} seconds; try a simpler one.")
+            done, pending = wait(pending, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                shard, count, results = future.result()
+                by_shard[shard] = (count, results)
+                if progress_callback is not None:
+                    progress_callback(shard, shards, count, results)
+        finished = True
+    finally:
+        if finished:
+            _release(pool)
+        else:
+            pool.terminate()
+    total = sum(count for count, _ in by_shard.values())
+    results = [r for shard in range(shards) for r in by_shard[shard][1]][:MAX_MATCHES]
+    logging.debug(f"Regex {pattern} matched {total} verses of {translation} in "
+                  f"{(time.perf_counter() - start) * 1000:.0f} ms ({shards} shards)")
+    return total, results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) >= 3:
+        translation, pattern = sys.argv[1], ' '.join(sys.argv[2:])
+        started = time.perf_counter()
+        prepare(translation)
+        scan(translation, r'\A\Z')  # Wait for the workers to start and load the translation
+        loaded = time.perf_counter()
+        total, results = scan(translation, pattern)
+        searched = time.perf_counter()
+        for r in results[:10]:
+            print(f"{r['book']} {r['chapter']}:{r['verse']}  {r['text'][:80]}")
+        print(f"{total} matches in {(searched - loaded) * 1000:.0f} ms with {SCAN_WORKERS} workers "
+              f"(startup {(loaded - started) * 1000:.0f} ms)")
+    else:
+        print("Usage: python bible_regex.py <TRANSLATION> <pattern>")
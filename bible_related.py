@@ -0,0 +1,355 @@
+# bible_related.py
+# Offline "related verses": a TF-IDF matrix over an installed translation, queried by cosine similarity.
+
+import os
+import sys
+import time
+import threading
+import logging
+from collections import Counter
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QListWidget, \
+    QListWidgetItem, QMessageBox
+from PyQt6.QtCore import Qt, QThreadPool
+import bible_store
+from bible_index import tokenize, run_in_process
+from bible_utils import REVERSE_BOOK_MAP, parse_refs, expand_range, fetch_chapter
+from bible_workers import FetchWorker
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:  # Optional: pip install numpy scipy
+    np = None
+    sparse = None
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+RELATED_DIR = 'bible_related'
+MODEL_VERSION = 1
+DEFAULT_LIMIT = 10
+
+# Words too common to say anything about what a verse is about (rare ones are already damped by IDF)
+STOP_WORDS = frozenset('''
+    a an and are as at be but by for from had has have he her him his i in is it its me my not of on or our
+    shall she so that the their them then there they this thou thee thy to unto up upon us was we were what
+    when which who will with ye you your hath doth art
+'''.split())
+
+
+def model_path(translation):
+    return os.path.join(RELATED_DIR, f"{translation}.npz")
+
+
+def _terms(text):
+    return Counter(token for token in tokenize(text) if token not in STOP_WORDS)
+
+
+def _require_numpy():
+    if np is None:
+        raise RuntimeError("Related verses need NumPy and SciPy. Install them with: pip install numpy scipy")
+
+
+class RelatedModel:
+    """Row-normalised TF-IDF matrix (verses x terms); a dot product with it gives cosine similarities."""
+
+    def __init__(self, refs, vocab, idf, matrix, source):
+        self.refs = refs  # int32 array of (book_id, chapter, verse) per row
+        self.vocab = vocab  # term -> column
+        self.idf = idf
+        self.matrix = matrix
+        self.source = source
+        self.rows = {tuple(ref): row for row, ref in enumerate(refs.tolist())}
+
+    def text_vector(self, text):
+        """Return the normalised TF-IDF vector of free text, or None if no word is in the vocabulary."""
+        vector = np.zeros(len(self.vocab), dtype=np.float32)
+        for term, count in _terms(text).items():
+            column = self.vocab.get(term)
+            if column is not None:
+                vector[column] = (1 + np.log(count)) * self.idf[column]
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def verses_vector(self, rows):
+        """Return the normalised centroid of some verse rows."""
+        vector = np.asarray(self.matrix[rows].sum(axis=0)).ravel()
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def nearest(self, vector, limit=DEFAULT_LIMIT, exclude=()):
+        """Return [(score, (book_id, chapter, verse))] for the most similar verses, best first."""
+        scores = self.matrix @ vector
+        if exclude:
+            scores[list(exclude)] = -1
+        limit = min(limit, len(scores))
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(float(scores[row]), tuple(int(x) for x in self.refs[row])) for row in top if scores[row] > 0]
+
+
+def build_model(translation):
+    """Build and save the TF-IDF model for an installed translation."""
+    _require_numpy()
+    info = bible_store.translation_info(translation)
+    if info is None:
+        raise ValueError(f"{translation} is not installed")
+    start = time.time()
+    refs = []
+    vocab = {}
+    rows = []
+    columns = []
+    counts = []
+    for row, (book_id, chapter, verse, text) in enumerate(bible_store.all_verses(translation)):
+        refs.append((book_id, chapter, verse))
+        for term, count in _terms(text).items():
+            rows.append(row)
+            columns.append(vocab.setdefault(term, len(vocab)))
+            counts.append(count)
+    columns = np.array(columns, dtype=np.int32)
+    document_frequency = np.bincount(columns, minlength=len(vocab))
+    idf = (np.log((1 + len(refs)) / (1 + document_frequency)) + 1).astype(np.float32)
+    weights = (1 + np.log(np.array(counts, dtype=np.float32))) * idf[columns]
+    matrix = sparse.csr_matrix((weights, (np.array(rows, dtype=np.int32), columns)),
+                               shape=(len(refs), len(vocab)), dtype=np.float32)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    matrix = sparse.diags(1 / norms).dot(matrix).tocsr().astype(np.float32)
+    refs = np.array(refs, dtype=np.int32)
+    terms = np.array(sorted(vocab, key=vocab.get))
+    os.makedirs(RELATED_DIR, exist_ok=True)
+    tmp_path = model_path(translation) + '.tmp.npz'
+    np.savez(tmp_path, version=MODEL_VERSION, source=np.array([str(x) for x in info]), refs=refs, terms=terms,
+             idf=idf, data=matrix.data, indices=matrix.indices, indptr=matrix.indptr, shape=matrix.shape)
+    os.replace(tmp_path, model_path(translation))
+    logging.debug(f"Built related-verses model for {translation}: {len(refs)} verses, {len(vocab)} terms "
+                  f"in {time.time() - start:.2f}s")
+    return RelatedModel(refs, vocab, idf, matrix, tuple(str(x) for x in info))
+
+
+def load_model(translation):
+    """Load a saved model, or return None if it is missing or older than the installed translation."""
+    _require_numpy()
+    info = bible_store.translation_info(translation)
+    if info is None:
+        return None
+    try:
+        with np.load(model_path(translation)) as data:
+            if int(data['version']) != MODEL_VERSION or tuple(data['source']) != tuple(str(x) for x in info):
+                logging.debug(f"Related-verses model for {translation} is out of date")
+                return None
+            matrix = sparse.csr_matrix((data['data'], data['indices'], data['indptr']), shape=tuple(data['shape']))
+            vocab = {term: column for column, term in enumerate(data['terms'].tolist())}
+            return RelatedModel(data['refs'], vocab, data['idf'], matrix, tuple(data['source']))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.error(f"Failed to load related-verses model for {translation}: {str(e)}")
+        return None
+
+
+_models = {}
+_lock = threading.Lock()
+
+
+def get_model(translation):
+    """Return the model for an installed translation, loading or building it on first use. Blocks.
+
+    A missing or stale model is built in the shared background build process, not in this one.
+    """
+    _require_numpy()
+    if not bible_store.is_installed(translation):
+        raise ValueError(f"Related verses work offline from an installed translation. "
+                         f"Install {translation} with: python bible_store.py import {translation}")
+    with _lock:
+        model = _models.get(translation)
+        if model is None or model.source != tuple(str(x) for x in bible_store.translation_info(translation)):
+            model = load_model(translation)
+            if model is None:
+                logging.debug(f"Building related-verses model for {translation} in a background process")
+                run_in_process(build_model, translation)
+                model = load_model(translation)
+            if model is None:
+                raise RuntimeError(f"Failed to build the related-verses model for {translation}")
+            _models[translation] = model
+        return model
+
+
+def remove_model(translation):
+    """Forget and delete a translation's saved model."""
+    with _lock:
+        _models.pop(translation, None)
+    if os.path.exists(model_path(translation)):
+        os.remove(model_path(translation))
+
+
+def related_verses(translation, ref='', text='', limit=DEFAULT_LIMIT):
+    """Return [(score, 'Book c:v', verse text)] for the verses nearest a reference or, failing that, free text.
+
+    A reference (or list of them) is matched by the centroid of its verses, which are left out of
+    the results. Run it on a worker thread: the first call per translation loads (or waits for a build of)
+    the model.
+    """
+    model = get_model(translation)
+    start = time.perf_counter()
+    vector = None
+    exclude = set()
+    if ref:
+        rows = []
+        for r in parse_refs(ref, translation):
+            rows.extend(model.rows[(r.book_id, chapter, verse)] for chapter, verse in expand_range(r, translation)
+                        if (r.book_id, chapter, verse) in model.rows)
+        if rows:
+            vector = model.verses_vector(rows)
+            exclude = set(rows)
+    if vector is None and text:
+        vector = model.text_vector(text)
+    if vector is None:
+        return []
+    nearest = model.nearest(vector, limit, exclude)
+    logging.debug(f"Found {len(nearest)} related verses in {(time.perf_counter() - start) * 1000:.1f} ms")
+    results = []
+    for score, (book_id, chapter, verse) in nearest:
+        verses = {int(v['verse']): v['text'] for v in fetch_chapter(translation, book_id, chapter)}
+        results.append((score, f"{REVERSE_BOOK_MAP.get(book_id, 'Unknown')} {chapter}:{verse}", verses.get(verse, "")))
+    return results
+
+
+class RelatedVersesDialog(QDialog):
+    def __init__(self, parent=None, translation='WEB', ref=""):
+        super().__init__(parent)
+        self.parent = parent
+        self.translation = translation
+        self.setWindowTitle("Related Verses")
+        self.setMinimumSize(700, 500)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.request_id = 0
+        self.pending_worker = None
+        self.setup_ui()
+        if ref:
+            self.query_input.setText(ref)
+            self.find_related()
+
+    def setup_ui(self):
+        """Set up the dialog UI."""
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        query_layout = QHBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("Reference (e.g., John 3:16) or a few words of a theme")
+        self.query_input.returnPressed.connect(self.find_related)
+        query_layout.addWidget(self.query_input)
+        find_btn = QPushButton("Find Related")
+        find_btn.setStyleSheet(
+            "background-color: #007bff; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
+        find_btn.clicked.connect(self.find_related)
+        query_layout.addWidget(find_btn)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setStyleSheet("color: #ffc107;")
+        self.loading_label.hide()
+        query_layout.addWidget(self.loading_label)
+        layout.addLayout(query_layout)
+
+        self.results_list = QListWidget()
+        self.results_list.setWordWrap(True)
+        self.results_list.setStyleSheet("background-color: #2c2f33; color: #ffffff; border: 1px solid #444;")
+        layout.addWidget(self.results_list)
+
+        copy_btn = QPushButton("Copy Selected to Notes")
+        copy_btn.setStyleSheet(
+            "background-color: #28a745; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
+        copy_btn.clicked.connect(self.copy_to_notes)
+        layout.addWidget(copy_btn)
+
+    def find_related(self):
+        """Treat the input as a reference if it parses, otherwise as free text, and search on the worker pool."""
+        query = self.query_input.text().strip()
+        if not query:
+            QMessageBox.warning(self, "Empty Input", "Please enter a reference or some words.")
+            return
+        try:
+            parse_refs(query, self.translation)
+            ref, text = query, ''
+        except ValueError:
+            ref, text = '', query
+        if self.pending_worker is not None:
+            self.pending_worker.cancel(self.thread_pool)
+        self.request_id += 1
+        worker = FetchWorker(self.request_id, related_verses, self.translation, ref, text)
+        worker.signals.finished.connect(self.on_related_finished)
+        worker.signals.failed.connect(self.on_related_failed)
+        self.pending_worker = worker
+        self.loading_label.show()
+        self.thread_pool.start(worker)
+
+    def on_related_finished(self, request_id, results):
+        if request_id != self.request_id:
+            return
+        self.pending_worker = None
+        self.loading_label.hide()
+        self.results_list.clear()
+        if not results:
+            self.results_list.addItem("No related verses found.")
+            return
+        for score, ref, text in results:
+            item = QListWidgetItem(f"{ref} ({score:.2f}): {text}")
+            item.setData(Qt.ItemDataRole.UserRole, (ref, text))
+            self.results_list.addItem(item)
+
+    def on_related_failed(self, request_id, error):
+        if request_id != self.request_id:
+            return
+        self.pending_worker = None
+        self.loading_label.hide()
+        logging.error(f"Failed to find related verses: {str(error)}")
+        QMessageBox.warning(self, "Related Verses", str(error))
+
+    def copy_to_notes(self):
+        """Add the selected results to the sermon's verses and notes."""
+        try:
+            selected = [item.data(Qt.ItemDataRole.UserRole) for item in self.results_list.selectedItems()]
+            selected = [entry for entry in selected if entry]
+            if not selected:
+                QMessageBox.warning(self, "No Selection", "Please select one or more verses.")
+                return
+            sermon = self.parent.sermon
+            sermon.setdefault('verses_notes', [])
+            for ref, text in selected:
+                sermon['verses_notes'].append({'ref': ref, 'text': text, 'note': ''})
+            if hasattr(self.parent, 'update_verses_list'):
+                self.parent.update_verses_list()
+            QMessageBox.information(self, "Success", f"Copied {len(selected)} verse(s) to notes.")
+        except Exception as e:
+            logging.error(f"Error copying related verses: {str(e)}")
+            QMessageBox.critical(self, "Copy Error", f"Failed to copy verses: {str(e)}")
+
+    def done(self, result):
+        if self.pending_worker is not None:
+            self.pending_worker.cancel(self.thread_pool)
+        self.request_id += 1
+        super().done(result)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == 'build':
+        model = build_model(sys.argv[2])
+        print(f"Built related-verses model for {sys.argv[2]} ({len(model.refs)} verses, {len(model.vocab)} terms)")
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'related':
+        query = ' '.join(sys.argv[3:])
+        try:
+            parse_refs(query, sys.argv[2])
+            ref, text = query, ''
+        except ValueError:
+            ref, text = '', query
+        for score, ref, text in related_verses(sys.argv[2], ref, text):
+            print(f"{score:.3f}  {ref}  {text[:80]}")
+    else:
+        print("Usage: python bible_related.py build <TRANSLATION> | related <TRANSLATION> <reference or words>")
@@ -2,10 +2,20 @@ import requests
 import logging
 import sqlite3
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QListWidget, QTextEdit, \
-    QMessageBox, QInputDialog
-from PyQt6.QtCore import Qt
-from bible_utils import REVERSE_BOOK_MAP, parse_ref, fetch_verse_text
-import difflib
+    QMessageBox, QInputDialog, QCompleter, QCheckBox
+from PyQt6.QtCore import Qt, QStringListModel, QThreadPool, QTimer
+from bible_utils import REVERSE_BOOK_MAP, BOOK_INDEX, parse_refs, format_range, fetch_passages, suggest_books, \
+    is_chapter_local
+from bible_workers import FetchWorker
+from bible_compare import BibleCompareDialog
+from bible_ranges import overlapping_notes
+from bible_versification import ReferenceOutOfRange
+from collections import OrderedDict
+import bible_store
+import bible_http
+import bible_index
+import bible_regex
+import bible_spell
 import re
 
 # Set up logging
@@ -19,81 +29,117 @@ logging.basicConfig(
 )
 
 DB_FILE = 'sermon_secrets.db'
+LIVE_SEARCH_DELAY_MS = 250  # Debounce between the last keystroke and a live query
+LIVE_SEARCH_MIN_CHARS = 3
+LIVE_CACHE_SIZE = 32
 
-BOOK_VARIANTS = {
-    'Genesis': ['Gen', 'Ge', 'Gn'],
-    'Exodus': ['Exod', 'Ex'],
-    'Leviticus': ['Lev', 'Lv', 'Le'],
-    'Numbers': ['Num', 'Nm', 'Nu'],
-    'Deuteronomy': ['Deut', 'Dt', 'De', 'Du'],
-    'Joshua': ['Josh', 'Jos', 'Jo'],
-    'Judges': ['Judg', 'Jdg', 'Jgs'],
-    'Ruth': ['Ruth', 'Ru'],
-    '1 Samuel': ['1 Sam', '1 Sm', '1 Sa', '1Sam', '1Sa', '1S'],
-    '2 Samuel': ['2 Sam', '2 Sm', '2 Sa', '2Sam', '2Sa', '2S'],
-    '1 Kings': ['1 Kgs', '1 Kg', '1 Ki', '1Kgs', '1Kin', '1Ki', '1K'],
-    '2 Kings': ['2 Kgs', '2 Kg', '2 Ki', '2Kgs', '2Kin', '2Ki', '2K'],
-    '1 Chronicles': ['1 Chr', '1 Ch', '1Chron', '1Chr', '1Ch'],
-    '2 Chronicles': ['2 Chr', '2 Ch', '2Chron', '2Chr', '2Ch'],
-    'Ezra': ['Ezra', 'Ezr', 'Ez'],
-    'Nehemiah': ['Neh', 'Ne'],
-    'Esther': ['Esth', 'Est', 'Es'],
-    'Job': ['Job', 'Jb'],
-    'Psalms': ['Ps', 'Pss', 'Pslm', 'Psa', 'Psm'],
-    'Proverbs': ['Prov', 'Prv', 'Pr'],
-    'Ecclesiastes': ['Eccl', 'Eccles', 'Ec', 'Qoh'],
-    'Song of Solomon': ['Song', 'Ss', 'So', 'Sg', 'Cant', 'Can'],
-    'Isaiah': ['Isa', 'Is'],
-    'Jeremiah': ['Jer', 'Je', 'Jr'],
-    'Lamentations': ['Lam', 'La'],
-    'Ezekiel': ['Ezek', 'Ezk', 'Ez'],
-    'Daniel': ['Dan', 'Dn', 'Da'],
-    'Hosea': ['Hos', 'Ho'],
-    'Joel': ['Joel', 'Jl'],
-    'Amos': ['Amos', 'Am'],
-    'Obadiah': ['Obad', 'Ob'],
-    'Jonah': ['Jonah', 'Jnh', 'Jon'],
-    'Micah': ['Mic', 'Mc'],
-    'Nahum': ['Nah', 'Na'],
-    'Habakkuk': ['Hab', 'Hb'],
-    'Zephaniah': ['Zeph', 'Zep', 'Zp'],
-    'Haggai': ['Hag', 'Hg'],
-    'Zechariah': ['Zech', 'Zec', 'Zc'],
-    'Malachi': ['Mal', 'Ml'],
-    'Matthew': ['Matt', 'Mt'],
-    'Mark': ['Mark', 'Mrk', 'Mar', 'Mk', 'Mr'],
-    'Luke': ['Luke', 'Lk'],
-    'John': ['John', 'Jhn', 'Jn', 'Joh'],
-    'Acts': ['Acts', 'Act', 'Ac'],
-    'Romans': ['Rom', 'Ro', 'Rm'],
-    '1 Corinthians': ['1 Cor', '1 Co', '1Cor', '1Co'],
-    '2 Corinthians': ['2 Cor', '2 Co', '2Cor', '2Co'],
-    'Galatians': ['Gal', 'Ga'],
-    'Ephesians': ['Eph', 'Ephes'],
-    'Philippians': ['Phil', 'Php', 'Pp'],
-    'Colossians': ['Col', 'Co'],
-    '1 Thessalonians': ['1 Thess', '1 Thes', '1 Th', '1Thess', '1Thes', '1Th'],
-    '2 Thessalonians': ['2 Thess', '2 Thes', '2 Th', '2Thess', '2Thes', '2Th'],
-    '1 Timothy': ['1 Tim', '1 Tm', '1 Ti', '1T'],
-    '2 Timothy': ['2 Tim', '2 Tm', '2 Ti', '2T'],
-    'Titus': ['Titus', 'Tit', 'Ti'],
-    'Philemon': ['Phlm', 'Phm'],
-    'Hebrews': ['Heb', 'He'],
-    'James': ['Jas', 'Ja'],
-    '1 Peter': ['1 Pet', '1 Pt', '1P'],
-    '2 Peter': ['2 Pet', '2 Pt', '2P'],
-    '1 John': ['1 John', '1 Jn', '1 Jo', '1J', '1John', '1Jn', '1Jo'],
-    '2 John': ['2 John', '2 Jn', '2 Jo', '2J'],
-    '3 John': ['3 John', '3 Jn', '3 Jo', '3J'],
-    'Jude': ['Jude', 'Ju'],
-    'Revelation': ['Rev', 'Re', 'Rv']
-}
-
-VARIANT_TO_FULL = {}
-for full, abbrevs in BOOK_VARIANTS.items():
-    VARIANT_TO_FULL[full.lower()] = full
-    for ab in abbrevs:
-        VARIANT_TO_FULL[ab.lower()] = full
+
+def prefix_query(text):
+    """Turn the word still being typed into a prefix term ('love the' -> 'love the*')."""
+    words = text.split()
+    if words and not text.endswith(' ') and words[-1].isalnum() and words[-1] not in ('AND', 'OR', 'NOT'):
+        return text.strip() + '*'
+    return text.strip()
+
+
+def keyword_lookup(translation, text, prefix=False):
+    """Run a keyword search; returns ('hits', index, hit ids) from the local index or ('results', results)."""
+    index = bible_index.get_index(translation)
+    if index is not None:
+        logging.debug(f"Searching local index for: {text}")
+        return 'hits', index, index.search(prefix_query(text) if prefix else text)
+    if bible_store.is_installed(translation):
+        logging.debug(f"Searching local corpus for: {text}")
+        return 'results', bible_store.search_verses(translation, text, limit=50)
+    logging.debug(f"Sending keyword search request for: {text}")
+    response = bible_http.find(translation, text, limit=50)
+    response.raise_for_status()
+    return 'results', response.json()['results']
+
+
+def live_lookup(translation, text):
+    """Resolve text typed into the search box; runs on a worker thread.
+
+    Returns ('passages', ranges, texts) for a reference, a keyword_lookup result, or None while
+    a reference is still incomplete ("jn 3:").
+    """
+    try:
+        ranges = parse_refs(text, translation)
+        return 'passages', ranges, fetch_passages(ranges, translation)
+    except ReferenceOutOfRange:
+        return None
+    except ValueError:
+        pass
+    if BOOK_INDEX.match(text)[0] and re.search(r'\d', text):
+        return None
+    return keyword_lookup(translation, text, prefix=True)
+
+
+def fetch_failed(texts):
+    """True when fetch_passages returned a single error message instead of verse text."""
+    return len(texts) == 1 and (texts[0].startswith("Error") or texts[0] == "Verse not found in chapter.")
+
+
+def corrected_reference(translation, text):
+    """Try the input as a reference with a misspelt book name ("jon 3 16"); returns a passages result or None."""
+    text = re.sub(r'[^\w\s:\-,;]', '', text.lower()).strip()
+    parts = text.split()
+    if not parts:
+        return None
+    ref_start = None
+    first = 1 if parts[0] in ('1', '2', '3') else 0  # Leading ordinal belongs to the book ("1 jon 1")
+    for j in range(first, len(parts)):
+        if re.sub(r'[:\-,;]', '', parts[j]).isdigit():
+            ref_start = j
+            break
+    if ref_start is None:
+        return None
+    book_cand = ' '.join(parts[:ref_start])
+    ref_part = ' '.join(parts[ref_start:])
+    if not book_cand or not ref_part:
+        return None
+    # Try each ranked candidate book until one yields a valid passage
+    for corrected_book in suggest_books(book_cand, limit=3):
+        corrected_input = f"{corrected_book} {ref_part}"
+        logging.debug(f"Attempting corrected reference: {corrected_input}")
+        try:
+            ranges = parse_refs(corrected_input, translation)
+            texts = fetch_passages(ranges, translation)
+            if fetch_failed(texts):
+                raise ValueError("Fetch failed")
+            logging.debug(f"Successfully used corrected ref: {corrected_input}")
+            return 'passages', ranges, texts
+        except Exception as ex:
+            logging.debug(f"Corrected parse failed: {ex}")
+    return None
+
+
+def search_lookup(translation, text):
+    """Resolve a submitted search on a worker thread: a reference, then a misspelt book name, then keywords.
+
+    Returns a live_lookup-style result, or ('corrected', corrected query, keyword result) when only the
+    spelling-corrected keywords find verses. Raises ReferenceOutOfRange, ValueError or requests errors.
+    """
+    try:
+        ranges = parse_refs(text, translation)
+        logging.debug(f"Parsed references: {[format_range(r) for r in ranges]}")
+        return 'passages', ranges, fetch_passages(ranges, translation)  # Every needed chapter is fetched once
+    except ReferenceOutOfRange:
+        raise
+    except ValueError as e:
+        logging.debug(f"Input not a valid reference: {e}, attempting fuzzy match")
+    result = corrected_reference(translation, text)
+    if result is not None:
+        return result
+    # Keyword search: the ranked local index once it is ready, else the corpus store or bolls.life
+    result = keyword_lookup(translation, text)
+    if not (result[2] if result[0] == 'hits' else result[1]):
+        corrected = bible_spell.correct_query(translation, text)
+        if corrected is not None:
+            corrected_result = keyword_lookup(translation, corrected)
+            if corrected_result[2] if corrected_result[0] == 'hits' else corrected_result[1]:
+                return 'corrected', corrected, corrected_result
+    return result
 
 class HistoryDialog(QDialog):
     def __init__(self, parent=None, queries=[]):
@@ -138,8 +184,16 @@ class BibleSearchDialog(QDialog):
         # Search input
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Keyword or Ref (e.g., jhn 3 16, mathew 1 15)")
+        self.search_input.setPlaceholderText('Keyword or Ref (e.g., jhn 3 16, mathew 1 15, "living water" book:John)')
         self.search_input.setStyleSheet("padding: 5px; font-size: 14px;")
+        self.book_model = QStringListModel()
+        self.book_completer = QCompleter(self.book_model, self)
+        self.book_completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.book_completer.setWidget(self.search_input)
+        self.book_completer.activated[str].connect(self.complete_book)
+        self.search_input.textEdited.connect(self.suggest_book_names)
+        self.search_input.textEdited.connect(self.on_search_edited)
+        self.search_input.returnPressed.connect(self.perform_search)
         search_layout.addWidget(QLabel("Search:"))
         search_layout.addWidget(self.search_input)
         search_btn = QPushButton("Search")
@@ -147,6 +201,11 @@ class BibleSearchDialog(QDialog):
             "background-color: #007bff; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
         search_btn.clicked.connect(self.perform_search)
         search_layout.addWidget(search_btn)
+        self.regex_checkbox = QCheckBox("Regex")
+        self.regex_checkbox.setToolTip("Search an installed translation with a regular expression, "
+                                       "e.g. lov(e|eth|ed) or \\bshepherd\\w*\\b.*\\blamb")
+        self.regex_checkbox.toggled.connect(self.on_regex_toggled)
+        search_layout.addWidget(self.regex_checkbox)
         layout.addLayout(search_layout)
 
         # Search history button
@@ -160,6 +219,9 @@ class BibleSearchDialog(QDialog):
         self.results_list = QListWidget()
         self.results_list.setStyleSheet("background-color: #2c2f33; color: #ffffff; border: 1px solid #444;")
         layout.addWidget(self.results_list)
+        self.results_list.verticalScrollBar().valueChanged.connect(self.on_results_scrolled)
+        self.results_label = QLabel("")
+        layout.addWidget(self.results_label)
 
         # Verse text display
         self.verse_text = QTextEdit()
@@ -175,12 +237,36 @@ class BibleSearchDialog(QDialog):
         copy_btn.clicked.connect(self.copy_to_notes)
         layout.addWidget(copy_btn)
 
+        compare_btn = QPushButton("Compare Translations")
+        compare_btn.setStyleSheet(
+            "background-color: #17a2b8; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
+        compare_btn.clicked.connect(self.compare_translations)
+        layout.addWidget(compare_btn)
+
         self.setLayout(layout)
         self.results = []
+        self.hits = []
+        self.hit_index = None
         self.selected_ref = None
         self.selected_text = None
         self.results_list.itemClicked.connect(self.display_verse)
 
+        # Live search: debounced queries on a worker thread, superseded ones are cancelled
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.search_request_id = 0
+        self.pending_search = None
+        self.pending_key = None
+        self.live_cache = OrderedDict()
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(LIVE_SEARCH_DELAY_MS)
+        self.search_timer.timeout.connect(self.run_live_search)
+        self.regex_shards = {}  # shard -> results it added, while a regex search streams in
+        self.regex_total = 0
+        bible_index.prepare(self.parent.sermon['settings']['default_translation'])
+        bible_spell.prepare(self.parent.sermon['settings']['default_translation'])
+
     def init_db(self):
         """Initialize the SQLite database for search history."""
         try:
@@ -202,6 +288,7 @@ class BibleSearchDialog(QDialog):
 
     def perform_search(self):
         """Handle search input, prioritizing Bible reference parsing, then keyword search."""
+        self.cancel_live_search()
         input_text = self.search_input.text().strip()
         if not input_text:
             QMessageBox.warning(self, "Empty Input", "Please enter a reference or keyword.")
@@ -223,108 +310,319 @@ class BibleSearchDialog(QDialog):
             QMessageBox.critical(self, "Database Error", f"Failed to save search history: {str(e)}")
 
         translation = self.parent.sermon['settings']['default_translation']
+        if self.regex_checkbox.isChecked():
+            self.run_regex_search(translation, input_text)
+            return
         logging.debug(f"Performing search for: {input_text}, translation: {translation}")
+        self.search_request_id += 1
+        worker = FetchWorker(self.search_request_id, search_lookup, translation, input_text)
+        worker.signals.finished.connect(lambda request_id, result: self.on_search_finished(request_id, input_text,
+                                                                                          result))
+        worker.signals.failed.connect(self.on_search_failed)
+        self.pending_search = worker
+        self.results_label.setText("Searching...")
+        self.thread_pool.start(worker)
+
+    def on_search_finished(self, request_id, input_text, result):
+        """Show a submitted search's result unless a newer search or edit has superseded it."""
+        if request_id != self.search_request_id:
+            logging.debug(f"Discarding superseded search {request_id}")
+            return
+        self.pending_search = None
+        self.results_label.setText("")
+        if result[0] == 'passages':
+            ranges, texts = result[1], result[2]
+            if fetch_failed(texts):
+                logging.warning(f"Failed to fetch text for {format_range(ranges[0])}: {texts[0]}")
+                QMessageBox.warning(self, "Fetch Error", f"Could not fetch {format_range(ranges[0])}: {texts[0]}")
+                return
+            self.show_passages(ranges, texts)
+            logging.debug(f"Successfully fetched and displayed: {', '.join(format_range(r) for r in ranges)}")
+            return
+        if result[0] == 'corrected':
+            corrected, lookup = result[1], result[2]
+            self.show_lookup(lookup)
+            count = len(lookup[2]) if lookup[0] == 'hits' else len(self.results)
+            self.results_label.setText(f"Did you mean: {corrected} — {count} verses (no verses found for "
+                                       f"'{input_text}')")
+            logging.debug(f"Corrected search '{input_text}' to '{corrected}'")
+            return
+        self.show_lookup(result)
+        if not self.results:
+            QMessageBox.information(self, "No Results", f"No verses found for '{input_text}'.")
+        logging.debug(f"Keyword search returned {len(self.hits) or len(self.results)} results")
 
-        # Try parsing as a Bible reference first
+    def on_search_failed(self, request_id, error):
+        if request_id != self.search_request_id:
+            return
+        self.pending_search = None
+        self.results_label.setText("")
+        if isinstance(error, ReferenceOutOfRange):
+            QMessageBox.warning(self, "Invalid Reference", str(error))
+        elif isinstance(error, ValueError):
+            logging.debug(f"Invalid search query: {str(error)}")
+            QMessageBox.warning(self, "Search Error", str(error))
+        elif isinstance(error, requests.RequestException):
+            logging.error(f"Network error during keyword search: {str(error)}")
+            QMessageBox.warning(self, "Network Error", f"Failed to search: {str(error)}")
+        else:
+            logging.error(f"Unexpected error during keyword search: {str(error)}")
+            QMessageBox.warning(self, "Error", f"Search failed: {str(error)}")
+
+    def show_lookup(self, result):
+        """Display a live_lookup or keyword_lookup result."""
+        if result[0] == 'passages':
+            self.show_passages(result[1], result[2])
+            return
+        self.results = []
+        self.hits = []
+        self.results_list.clear()
+        self.results_label.setText("")
+        if result[0] == 'hits':
+            self.hit_index = result[1]
+            self.hits = result[2]
+            self.load_more_results()
+        else:
+            self.add_results(result[1])
+            if bible_index.is_building(self.get_translation()):
+                self.results_label.setText("Search index is still being built; showing the first 50 matches.")
+
+    def get_translation(self):
+        return self.parent.sermon['settings']['default_translation']
+
+    def on_search_edited(self, text):
+        """Show cached results for the new text at once and schedule a debounced live query."""
+        self.cancel_live_search()
+        text = text.strip()
+        if len(text) < LIVE_SEARCH_MIN_CHARS or self.regex_checkbox.isChecked():
+            return
+        translation = self.get_translation()
+        key = (translation, text, bible_index.get_index(translation) is not None)
+        cached = self.live_cache.get(key)
+        if cached is not None:
+            self.live_cache.move_to_end(key)
+            self.show_lookup(cached)
+            return
         try:
-            book_id, chapter, verse = parse_ref(input_text)
-            ref = f"{REVERSE_BOOK_MAP[book_id]} {chapter}"
-            if verse:
-                ref += f":{verse}"
-            logging.debug(f"Parsed reference: {ref} (book_id: {book_id}, chapter: {chapter}, verse: {verse})")
-
-            # Fetch verse or chapter text
-            text = fetch_verse_text(ref, translation)
-            if text.startswith("Error") or text == "Verse not found in chapter.":
-                logging.warning(f"Failed to fetch text for {ref}: {text}")
-                QMessageBox.warning(self, "Fetch Error", f"Could not fetch {ref}: {text}")
+            ranges = parse_refs(text, translation)
+            if all(is_chapter_local(translation, r.book_id, chapter) for r in ranges
+                   for chapter in range(r.start_chapter, r.end_chapter + 1)):
+                self.show_live_result(key, ('passages', ranges, fetch_passages(ranges, translation)))
                 return
+        except ValueError:
+            pass
+        narrowed = self.narrow_cached(key)
+        if narrowed is not None:
+            self.show_lookup(narrowed)
+        self.search_timer.start()
 
-            # Display single result
-            self.results_list.clear()
-            self.results_list.addItem(ref)
-            self.results = [{'book': book_id, 'chapter': chapter, 'verse': verse or 1, 'text': text}]
-            self.verse_text.setText(text)
-            self.selected_ref = ref
-            self.selected_text = text
-            logging.debug(f"Successfully fetched and displayed: {ref}")
+    def narrow_cached(self, key):
+        """Filter cached keyword results for a shorter query that this one only extends.
+
+        Adding letters to the last word can only remove matches, so the cached hits are
+        narrowed at once while the debounced query computes the new ranking.
+        """
+        translation, text, ready = key
+        words = text.split()
+        if len(words) > 1 and words[-2] in ('OR', 'NOT'):
+            return None
+        for cut in range(1, len(words[-1])):
+            cached = self.live_cache.get((translation, text[:-cut], ready))
+            if cached is None:
+                continue
+            if cached[0] == 'hits':
+                return 'hits', cached[1], cached[1].narrow(cached[2], words[-1])
+            if cached[0] == 'results':
+                return 'results', [r for r in cached[1] if text.lower() in r['text'].lower()]
+            return None
+        return None
+
+    def run_live_search(self):
+        """Start the live query for the current text on the worker pool."""
+        text = self.search_input.text().strip()
+        if len(text) < LIVE_SEARCH_MIN_CHARS:
             return
-        except ValueError as e:
-            logging.debug(f"Input not a valid reference: {e}, attempting fuzzy match")
-
-        # Attempt fuzzy matching for possible misspelled book name
-        text = re.sub(r'[^\w\s:]', '', input_text.lower()).strip()
-        parts = text.split()
-        if parts:
-            ref_start = None
-            for j in range(len(parts)):
-                if re.sub(r'[:\-]', '', parts[j]).isdigit():
-                    ref_start = j
-                    break
-            if ref_start is not None:
-                book_cand = ' '.join(parts[:ref_start])
-                ref_part = ' '.join(parts[ref_start:])
-                chapter = None
-                verse = None
-                if ':' in ref_part:
-                    ch_v = ref_part.split(':', 1)
-                    chapter = ch_v[0].strip()
-                    verse_str = ch_v[1].strip()
-                    if '-' in verse_str:
-                        verse = verse_str.split('-')[0]
-                    else:
-                        verse = verse_str
-                else:
-                    chapter = ref_part.strip()
-                if book_cand and chapter:
-                    closest = difflib.get_close_matches(book_cand, list(VARIANT_TO_FULL.keys()), n=1, cutoff=0.6)
-                    if closest:
-                        corrected_book = VARIANT_TO_FULL[closest[0]]
-                        corrected_input = f"{corrected_book} {chapter}"
-                        if verse:
-                            corrected_input += f":{verse}"
-                        logging.debug(f"Attempting corrected reference: {corrected_input}")
-                        try:
-                            book_id, chapter, verse = parse_ref(corrected_input)
-                            ref = f"{REVERSE_BOOK_MAP[book_id]} {chapter}"
-                            if verse:
-                                ref += f":{verse}"
-                            text = fetch_verse_text(ref, translation)
-                            if text.startswith("Error") or text == "Verse not found in chapter.":
-                                raise ValueError("Fetch failed")
-                            self.results_list.clear()
-                            self.results_list.addItem(ref)
-                            self.results = [{'book': book_id, 'chapter': chapter, 'verse': verse or 1, 'text': text}]
-                            self.verse_text.setText(text)
-                            self.selected_ref = ref
-                            self.selected_text = text
-                            logging.debug(f"Successfully used corrected ref: {corrected_input}")
-                            return
-                        except Exception as ex:
-                            logging.debug(f"Corrected parse failed: {ex}")
-
-        # Keyword search
-        url = f"https://bolls.life/v2/find/{translation}?search={input_text}&match_case=false&match_whole=false&limit=50"
+        translation = self.get_translation()
+        self.search_request_id += 1
+        worker = FetchWorker(self.search_request_id, live_lookup, translation, text)
+        worker.signals.finished.connect(self.on_live_finished)
+        worker.signals.failed.connect(self.on_live_failed)
+        self.pending_search = worker
+        self.pending_key = (translation, text, bible_index.get_index(translation) is not None)
+        self.thread_pool.start(worker)
+
+    def cancel_live_search(self):
+        """Stop the debounce timer and supersede any live query still running."""
+        self.search_timer.stop()
+        if self.pending_search is not None:
+            self.pending_search.cancel(self.thread_pool)
+            self.pending_search = None
+        self.search_request_id += 1
+
+    def on_live_finished(self, request_id, result):
+        """Show a live query result unless the text has changed since it started."""
+        if request_id != self.search_request_id:
+            logging.debug(f"Discarding superseded live search {request_id}")
+            return
+        self.pending_search = None
+        if result is not None:
+            self.show_live_result(self.pending_key, result)
+
+    def on_live_failed(self, request_id, error):
+        """Live queries fail quietly (e.g. a half-typed filter); pressing Search reports errors."""
+        if request_id != self.search_request_id:
+            return
+        self.pending_search = None
+        logging.debug(f"Live search failed: {str(error)}")
+
+    def show_live_result(self, key, result):
+        """Cache and display a live result; a passage that could not be fetched is left off screen."""
+        if result[0] == 'passages' and fetch_failed(result[2]):
+            return
+        self.live_cache[key] = result
+        self.live_cache.move_to_end(key)
+        while len(self.live_cache) > LIVE_CACHE_SIZE:
+            self.live_cache.popitem(last=False)
+        self.show_lookup(result)
+
+    def on_regex_toggled(self, checked):
+        """Switch the search box between references/keywords and regular expressions."""
+        self.cancel_live_search()
+        if checked:
+            self.search_input.setPlaceholderText(r'Regular expression (e.g., lov(e|eth|ed), \bshepherd\w*\b.*\blamb)')
+            translation = self.get_translation()
+            if bible_store.is_installed(translation):
+                bible_regex.prepare(translation)
+            else:
+                self.results_label.setText(f"Regex search needs {translation} installed; download it in Settings.")
+        else:
+            self.search_input.setPlaceholderText(
+                'Keyword or Ref (e.g., jhn 3 16, mathew 1 15, "living water" book:John)')
+            self.results_label.setText("")
+
+    def run_regex_search(self, translation, pattern):
+        """Scan the installed translation on the worker processes; matches stream in shard by shard."""
         try:
-            logging.debug(f"Sending keyword search request: {url}")
-            response = requests.get(url, timeout=5)
-            response.raise_for_status()
-            data = response.json()
-            self.results = data['results']
-            self.results_list.clear()
-            for r in self.results:
-                book_name = REVERSE_BOOK_MAP.get(r['book'], 'Unknown')
-                ref = f"{book_name} {r['chapter']}:{r['verse']}"
-                self.results_list.addItem(ref)
-            if not self.results:
-                QMessageBox.information(self, "No Results", f"No verses found for '{input_text}'.")
-            logging.debug(f"Keyword search returned {len(self.results)} results")
-        except requests.RequestException as e:
-            logging.error(f"Network error during keyword search: {str(e)}")
-            QMessageBox.warning(self, "Network Error", f"Failed to search: {str(e)}")
-        except Exception as e:
-            logging.error(f"Unexpected error during keyword search: {str(e)}")
-            QMessageBox.warning(self, "Error", f"Search failed: {str(e)}")
+            bible_regex.compile_pattern(pattern)
+            if not bible_store.is_installed(translation):
+                raise ValueError(f"Regex search needs {translation} installed; download it in Settings.")
+        except ValueError as e:
+            QMessageBox.warning(self, "Search Error", str(e))
+            return
+        self.results = []
+        self.hits = []
+        self.results_list.clear()
+        self.regex_shards = {}
+        self.regex_total = 0
+        self.results_label.setText("Searching...")
+        self.search_request_id += 1
+        worker = FetchWorker(self.search_request_id, bible_regex.scan, translation, pattern,
+                             progress_callback=lambda *shard: worker.signals.progress.emit(worker.request_id, shard),
+                             is_cancelled=lambda: worker.cancelled)
+        worker.signals.progress.connect(self.on_regex_progress)
+        worker.signals.finished.connect(lambda request_id, result: self.on_regex_finished(request_id, pattern, result))
+        worker.signals.failed.connect(self.on_regex_failed)
+        self.pending_search = worker
+        logging.debug(f"Performing regex search for: {pattern}, translation: {translation}")
+        self.thread_pool.start(worker)
+
+    def on_regex_progress(self, request_id, progress):
+        """Insert one shard's matches at their place in canonical order, keeping the first MAX_MATCHES."""
+        if request_id != self.search_request_id:
+            return
+        shard, shards, count, results = progress
+        self.regex_total += count
+        self.regex_shards[shard] = len(results)
+        row = min(len(self.results), sum(n for s, n in self.regex_shards.items() if s < shard))
+        results = results[:bible_regex.MAX_MATCHES - row]
+        self.results[row:row] = results
+        for offset, r in enumerate(results):
+            self.results_list.insertItem(row + offset, f"{REVERSE_BOOK_MAP.get(r['book'], 'Unknown')} "
+                                                       f"{r['chapter']}:{r['verse']}")
+        while len(self.results) > bible_regex.MAX_MATCHES:
+            self.results.pop()
+            self.results_list.takeItem(self.results_list.count() - 1)
+        self.results_label.setText(f"{self.regex_total} matches so far ({len(self.regex_shards)} of {shards} parts "
+                                   f"searched)")
+
+    def on_regex_finished(self, request_id, pattern, result):
+        if request_id != self.search_request_id or result is None:
+            return
+        self.pending_search = None
+        total, _ = result
+        if not total:
+            self.results_label.setText("")
+            QMessageBox.information(self, "No Results", f"No verses match '{pattern}'.")
+        elif total > len(self.results):
+            self.results_label.setText(f"Showing the first {len(self.results)} of {total} matches")
+        else:
+            self.results_label.setText(f"{total} matches")
+        logging.debug(f"Regex search returned {total} results")
+
+    def on_regex_failed(self, request_id, error):
+        if request_id != self.search_request_id:
+            return
+        self.pending_search = None
+        self.results_label.setText("")
+        logging.error(f"Regex search failed: {str(error)}")
+        QMessageBox.warning(self, "Search Error", f"Regex search failed: {str(error)}")
+
+    def done(self, result):
+        """Cancel any live query before closing."""
+        self.cancel_live_search()
+        super().done(result)
+
+    def add_results(self, results):
+        """Append keyword results to the list."""
+        for r in results:
+            book_name = REVERSE_BOOK_MAP.get(r['book'], 'Unknown')
+            ref = f"{book_name} {r['chapter']}:{r['verse']}"
+            self.results_list.addItem(ref)
+        self.results.extend(results)
+        self.results_label.setText(f"Showing {len(self.results)} of {len(self.hits)} matches" if self.hits else "")
+
+    def load_more_results(self):
+        """Add the next page of ranked hits from the local index."""
+        if len(self.results) < len(self.hits):
+            self.add_results(self.hit_index.page(self.hits, len(self.results)))
+
+    def on_results_scrolled(self, value):
+        """Page in more hits when the list is scrolled to the bottom."""
+        if value >= self.results_list.verticalScrollBar().maximum():
+            self.load_more_results()
+
+    def suggest_book_names(self, text):
+        """Offer book names for the book part of the input while it is being typed."""
+        match = re.match(r'\s*((?:[1-3]\s*)?[^\d]*)(.*)', text)
+        book_part, rest = match.group(1).strip(), match.group(2)
+        if len(book_part) < 2 or rest:
+            self.book_model.setStringList([])
+            self.book_completer.popup().hide()
+            return
+        suggestions = suggest_books(book_part)
+        self.book_model.setStringList(suggestions)
+        if suggestions and suggestions[0].lower() != book_part.lower():
+            self.book_completer.complete()
+        else:
+            self.book_completer.popup().hide()
+
+    def complete_book(self, book):
+        """Replace the typed book name with the chosen suggestion."""
+        self.search_input.setText(f"{book} ")
+        self.book_model.setStringList([])
+
+    def show_passages(self, ranges, texts):
+        """List one result per parsed passage and show the first."""
+        self.results_list.clear()
+        self.results = []
+        self.hits = []
+        self.results_label.setText("")
+        for r, text in zip(ranges, texts):
+            self.results_list.addItem(format_range(r))
+            self.results.append({'book': r.book_id, 'chapter': r.start_chapter, 'verse': r.start_verse or 1, 'text': text})
+        self.verse_text.setText(texts[0])
+        self.selected_ref = format_range(ranges[0])
+        self.selected_text = texts[0]
 
     def display_verse(self, item):
         """Display selected verse text."""
@@ -344,6 +642,13 @@ class BibleSearchDialog(QDialog):
         try:
             if 'verses_notes' not in self.parent.sermon:
                 self.parent.sermon['verses_notes'] = []
+            overlapping = overlapping_notes(self.parent.sermon['verses_notes'], self.selected_ref)
+            if overlapping:
+                answer = QMessageBox.question(self, "Already in Notes",
+                                              f"{self.selected_ref} overlaps {', '.join(overlapping)} already in your "
+                                              f"verses/notes. Copy it anyway?")
+                if answer != QMessageBox.StandardButton.Yes:
+                    return
             note_dict = {
                 'ref': self.selected_ref,
                 'text': self.selected_text,
@@ -358,6 +663,14 @@ class BibleSearchDialog(QDialog):
             logging.error(f"Error copying to verses/notes: {str(e)}")
             QMessageBox.critical(self, "Copy Error", f"Failed to copy: {str(e)}")
 
+    def compare_translations(self):
+        """Open the selected passage side by side in several translations."""
+        if not self.selected_ref:
+            QMessageBox.warning(self, "No Selection", "Please select a verse to compare.")
+            return
+        dialog = BibleCompareDialog(self.parent, self.selected_ref)
+        dialog.exec()
+
     def show_history(self):
         """Show recent search queries and allow reuse."""
         try:
@@ -0,0 +1,233 @@
+# bible_spell.py
+# Spelling correction for keyword searches: a symmetric-delete (SymSpell-style) index over the vocabulary
+# of an installed translation, so a misspelt query term is matched to known words without scanning them.
+
+import os
+import re
+import sys
+import time
+import pickle
+import logging
+from array import array
+from bisect import bisect_left
+import bible_store
+import bible_index
+from bible_books import osa_distance
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+SPELL_DIR = 'bible_spell'
+SPELL_VERSION = 1
+MAX_EDIT_DISTANCE = 2
+SHORT_WORD_LENGTH = 4  # Words this short are corrected by at most one edit
+MIN_WORD_LENGTH = 3  # Shorter query words are never corrected
+PREFIX_LENGTH = 7  # Only this many leading characters are expanded into deletes
+
+# A bare query word: not an operator, a 'field:', a field value, an excluded '-word' or a 'prefix*'
+_QUERY_WORD = re.compile(r'(?<![\w:*-])([A-Za-z]+)(?![\w:*])')
+_OPERATORS = frozenset({'AND', 'OR', 'NOT'})
+
+
+def spell_path(translation):
+    return os.path.join(SPELL_DIR, f"{translation}.spell")
+
+
+def deletes(word, distance):
+    """Return every string made by removing up to distance characters from the word's prefix, and the prefix."""
+    found = {word[:PREFIX_LENGTH]}
+    frontier = found
+    for _ in range(distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        found |= frontier
+    return found
+
+
+def build_spell_index(translation):
+    """Build and save the spelling index for an installed translation; returns the SpellIndex.
+
+    The vocabulary and verse counts come from the search index's postings, which is built first if needed.
+    """
+    index = bible_index.load_index(translation)
+    if index is None:
+        bible_index.build_index(translation)
+        index = bible_index.load_index(translation)
+    if index is None:
+        raise ValueError(f"{translation} is not installed")
+    start = time.time()
+    words = sorted(word for word in index.postings if not word.isdigit())
+    verse_counts = array('I', (len(index.postings[word][0]) for word in words))
+    postings = {}  # delete -> word ids
+    for word_id, word in enumerate(words):
+        for key in deletes(word, MAX_EDIT_DISTANCE):
+            postings.setdefault(key, []).append(word_id)
+    keys = sorted(postings)
+    offsets = array('I', [0])
+    word_ids = array('I')
+    for key in keys:
+        word_ids.extend(postings[key])
+        offsets.append(len(word_ids))
+    data = {
+        'version': SPELL_VERSION,
+        'translation': translation,
+        'source': index.source,
+        'words': words,
+        'verse_counts': verse_counts,
+        'keys': keys,
+        'offsets': offsets,
+        'word_ids': word_ids,
+    }
+    os.makedirs(SPELL_DIR, exist_ok=True)
+    path = spell_path(translation)
+    with open(path + '.tmp', 'wb') as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(path + '.tmp', path)
+    logging.info(f"Built spelling index for {translation}: {len(words)} words, {len(keys)} deletes "
+                 f"in {time.time() - start:.1f}s")
+    return SpellIndex(data)
+
+
+class SpellIndex:
+    """Vocabulary of a translation with the deletes of every word, stored as sorted keys and flat arrays."""
+
+    def __init__(self, data):
+        self.translation = data['translation']
+        self.source = data['source']
+        self.words = data['words']
+        self._verse_counts = data['verse_counts']
+        self._keys = data['keys']
+        self._offsets = data['offsets']
+        self._word_ids = data['word_ids']
+
+    def __len__(self):
+        return len(self.words)
+
+    def verse_count(self, word):
+        """Return how many verses contain the word (0 if it is not in the translation)."""
+        i = bisect_left(self.words, word)
+        return self._verse_counts[i] if i < len(self.words) and self.words[i] == word else 0
+
+    def _candidates(self, key):
+        i = bisect_left(self._keys, key)
+        if i < len(self._keys) and self._keys[i] == key:
+            return self._word_ids[self._offsets[i]:self._offsets[i + 1]]
+        return ()
+
+    def suggestions(self, term, limit=5):
+        """Return up to limit (word, edit distance, verse count) for term, closest and then commonest first.
+
+        A term in the vocabulary is returned as its own only suggestion.
+        """
+        term = term.lower()
+        count = self.verse_count(term)
+        if count:
+            return [(term, 0, count)]
+        if len(term) < MIN_WORD_LENGTH:
+            return []
+        limit_distance = 1 if len(term) <= SHORT_WORD_LENGTH else MAX_EDIT_DISTANCE
+        word_ids = set()
+        for key in deletes(term, limit_distance):
+            word_ids.update(self._candidates(key))
+        ranked = []
+        for word_id in word_ids:
+            distance = osa_distance(term, self.words[word_id], limit_distance)
+            if distance <= limit_distance:
+                ranked.append((distance, -self._verse_counts[word_id], self.words[word_id]))
+        ranked.sort()
+        return [(word, distance, -count) for distance, count, word in ranked[:limit]]
+
+    def correct(self, term):
+        """Return the best known word for term, or None if it is already known or nothing is close."""
+        suggestions = self.suggestions(term, limit=1)
+        if suggestions and suggestions[0][1]:
+            return suggestions[0][0]
+        return None
+
+    def correct_query(self, query):
+        """Return the query with unknown words replaced by their best correction, or None if nothing changed.
+
+        Operators, 'field:value' filters, '-excluded' words and 'prefix*' terms are left as typed.
+        """
+        changed = False
+
+        def replace(match):
+            nonlocal changed
+            word = match.group(1)
+            if word in _OPERATORS:
+                return word
+            corrected = self.correct(word)
+            if corrected is None:
+                return word
+            changed = True
+            return corrected
+
+        corrected_query = _QUERY_WORD.sub(replace, query)
+        return corrected_query if changed else None
+
+
+def load_spell_index(translation):
+    """Load a saved spelling index, or return None if it is missing or older than the installed translation."""
+    info = bible_store.translation_info(translation)
+    if info is None:
+        return None
+    try:
+        with open(spell_path(translation), 'rb') as f:
+            data = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.error(f"Failed to load spelling index for {translation}: {str(e)}")
+        return None
+    if data.get('version') != SPELL_VERSION or data.get('source') != tuple(info):
+        logging.debug(f"Spelling index for {translation} is out of date")
+        return None
+    return SpellIndex(data)
+
+
+_spell_indexes = bible_index.BackgroundLoader("spelling index", load_spell_index, build_spell_index)
+
+
+def prepare(translation):
+    """Load or build the spelling index for an installed translation in the background; returns immediately."""
+    _spell_indexes.prepare(translation)
+
+
+def get_spell_index(translation):
+    """Return the ready spelling index for a translation, or None (after starting it in the background)."""
+    return _spell_indexes.get(translation)
+
+
+def remove_spell_index(translation):
+    """Forget and delete a translation's saved spelling index."""
+    _spell_indexes.forget(translation)
+    if os.path.exists(spell_path(translation)):
+        os.remove(spell_path(translation))
+
+
+def correct_query(translation, query):
+    """Return query with misspelt words corrected for the translation, or None if there is nothing to correct."""
+    spell_index = get_spell_index(translation)
+    return spell_index.correct_query(query) if spell_index is not None else None
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == 'build':
+        print(f"Indexed {len(build_spell_index(sys.argv[2]))} words")
+    elif len(sys.argv) >= 4 and sys.argv[1] == 'suggest':
+        spell_index = load_spell_index(sys.argv[2]) or build_spell_index(sys.argv[2])
+        for term in sys.argv[3:]:
+            start = time.perf_counter()
+            suggestions = spell_index.suggestions(term)
+            elapsed = (time.perf_counter() - start) * 1e6
+            print(f"{term}: " + (", ".join(f"{word} ({distance} edits, {count} verses)"
+                                           for word, distance, count in suggestions) or "no suggestions") +
+                  f"  [{elapsed:.0f} us]")
+    else:
+        print("Usage: python bible_spell.py build <TRANSLATION> | suggest <TRANSLATION> <word>...")
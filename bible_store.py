@@ -0,0 +1,218 @@
+# bible_store.py
+# Local SQLite corpus of Bible translations, so verse and chapter lookups work offline.
+
+import sqlite3
+import threading
+import logging
+import sys
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+CORPUS_DB_FILE = 'bible_corpus.db'
+
+_conn = None
+_lock = threading.Lock()
+_installed = None
+_generation = 0  # Bumped whenever a translation is installed, replaced or removed
+
+
+def _connection():
+    """Open the shared corpus connection on first use and create the tables."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(CORPUS_DB_FILE, check_same_thread=False)
+        _conn.execute('''
+            CREATE TABLE IF NOT EXISTS verses (
+                translation TEXT NOT NULL,
+                book_id INTEGER NOT NULL,
+                chapter INTEGER NOT NULL,
+                verse INTEGER NOT NULL,
+                text TEXT NOT NULL,
+                PRIMARY KEY (translation, book_id, chapter, verse)
+            ) WITHOUT ROWID
+        ''')
+        _conn.execute('''
+            CREATE TABLE IF NOT EXISTS translations (
+                translation TEXT PRIMARY KEY,
+                verse_count INTEGER NOT NULL,
+                installed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        _conn.commit()
+        logging.debug(f"Opened Bible corpus store {CORPUS_DB_FILE}")
+    return _conn
+
+
+def installed_translations():
+    """Return the sorted list of translations that are fully imported."""
+    global _installed
+    with _lock:
+        if _installed is None:
+            try:
+                rows = _connection().execute('SELECT translation FROM translations').fetchall()
+                _installed = {row[0] for row in rows}
+            except Exception as e:
+                logging.error(f"Failed to read installed translations: {str(e)}")
+                return []
+        return sorted(_installed)
+
+
+def generation():
+    """Return a number that changes whenever this process installs, replaces or removes a translation."""
+    return _generation
+
+
+def is_installed(translation):
+    """Return True if the translation can be served from the local corpus."""
+    return translation in installed_translations()
+
+
+def get_chapter(translation, book_id, chapter):
+    """Return a chapter as [{'verse': n, 'text': ...}], or None if the translation is not installed."""
+    if not is_installed(translation):
+        return None
+    with _lock:
+        rows = _connection().execute(
+            'SELECT verse, text FROM verses WHERE translation = ? AND book_id = ? AND chapter = ? ORDER BY verse',
+            (translation, book_id, chapter)
+        ).fetchall()
+    return [{'verse': verse, 'text': text} for verse, text in rows]
+
+
+def search_verses(translation, keyword, limit=50):
+    """Case-insensitive substring search over an installed translation; % and _ in keyword match themselves."""
+    pattern = keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    with _lock:
+        rows = _connection().execute(
+            "SELECT book_id, chapter, verse, text FROM verses WHERE translation = ? AND text LIKE ? ESCAPE '\\' "
+            'ORDER BY book_id, chapter, verse LIMIT ?',
+            (translation, f"%{pattern}%", limit)
+        ).fetchall()
+    return [{'book': book, 'chapter': chapter, 'verse': verse, 'text': text} for book, chapter, verse, text in rows]
+
+
+def translation_info(translation):
+    """Return (verse_count, installed_at) for an installed translation, or None."""
+    with _lock:
+        return _connection().execute(
+            'SELECT verse_count, installed_at FROM translations WHERE translation = ?', (translation,)
+        ).fetchone()
+
+
+def all_verses(translation):
+    """Return every stored verse of a translation as (book_id, chapter, verse, text), in canonical order."""
+    with _lock:
+        return _connection().execute(
+            'SELECT book_id, chapter, verse, text FROM verses WHERE translation = ? ORDER BY book_id, chapter, verse',
+            (translation,)
+        ).fetchall()
+
+
+def stored_chapters(translation):
+    """Return the set of (book_id, chapter) pairs already stored for a translation."""
+    with _lock:
+        rows = _connection().execute(
+            'SELECT DISTINCT book_id, chapter FROM verses WHERE translation = ?', (translation,)
+        ).fetchall()
+    return set(rows)
+
+
+def store_chapter(translation, book_id, chapter, verses):
+    """Insert or replace the verses of one chapter."""
+    with _lock:
+        conn = _connection()
+        conn.executemany(
+            'INSERT OR REPLACE INTO verses (translation, book_id, chapter, verse, text) VALUES (?, ?, ?, ?, ?)',
+            [(translation, book_id, chapter, int(v['verse']), v['text']) for v in verses]
+        )
+        conn.commit()
+
+
+def mark_installed(translation):
+    """Record a translation as complete so lookups are served locally."""
+    global _installed, _generation
+    with _lock:
+        conn = _connection()
+        count = conn.execute('SELECT COUNT(*) FROM verses WHERE translation = ?', (translation,)).fetchone()[0]
+        conn.execute('INSERT OR REPLACE INTO translations (translation, verse_count) VALUES (?, ?)',
+                     (translation, count))
+        conn.commit()
+        _installed = None
+        _generation += 1
+    logging.debug(f"Marked {translation} installed with {count} verses")
+    return count
+
+
+def install_staged(staging, translation, merge=False):
+    """Replace a translation with the verses stored under a staging name and mark it installed, in one transaction.
+
+    With merge, only the chapters present in the staging copy are replaced and the rest are kept. Returns the
+    verse count. If anything fails the previous copy of the translation is left untouched.
+    """
+    global _installed, _generation
+    with _lock:
+        conn = _connection()
+        try:
+            if merge:
+                conn.execute('DELETE FROM verses WHERE translation = ? AND (book_id, chapter) IN '
+                             '(SELECT DISTINCT book_id, chapter FROM verses WHERE translation = ?)',
+                             (translation, staging))
+            else:
+                conn.execute('DELETE FROM verses WHERE translation = ?', (translation,))
+            conn.execute('UPDATE verses SET translation = ? WHERE translation = ?', (translation, staging))
+            count = conn.execute('SELECT COUNT(*) FROM verses WHERE translation = ?', (translation,)).fetchone()[0]
+            conn.execute('INSERT OR REPLACE INTO translations (translation, verse_count) VALUES (?, ?)',
+                         (translation, count))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        _installed = None
+        _generation += 1
+    logging.debug(f"Installed {translation} with {count} verses from {staging}")
+    return count
+
+
+def remove_translation(translation):
+    """Delete a translation from the local corpus."""
+    global _installed, _generation
+    with _lock:
+        conn = _connection()
+        conn.execute('DELETE FROM verses WHERE translation = ?', (translation,))
+        conn.execute('DELETE FROM translations WHERE translation = ?', (translation,))
+        conn.commit()
+        _installed = None
+        _generation += 1
+    logging.debug(f"Removed {translation} from the corpus store")
+
+
+def import_translation(translation, progress_callback=None):
+    """Download every chapter of a translation from bolls.life into the corpus store.
+
+    Chapters already stored are skipped, so an interrupted import can simply be run again.
+    See bible_download.DownloadManager for concurrency and rate limits.
+    """
+    from bible_download import DownloadManager, format_report
+    report = DownloadManager(translation, progress_callback=progress_callback).run()
+    if not report['installed']:
+        raise ValueError(format_report(report))
+    return report['verse_count']
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == 'import':
+        verse_count = import_translation(
+            sys.argv[2], lambda done, total: print(f"\r{done}/{total} chapters", end='', flush=True))
+        print(f"\nInstalled {sys.argv[2]} ({verse_count} verses)")
+    elif len(sys.argv) == 2 and sys.argv[1] == 'list':
+        print('\n'.join(installed_translations()) or "No translations installed.")
+    else:
+        print("Usage: python bible_store.py import <TRANSLATION> | list")
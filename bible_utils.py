@@ -5,6 +5,14 @@ import requests
 import re
 import logging
 import sys
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import bible_store
+import bible_packed
+import bible_providers
+import bible_versification
+from bible_books import BookIndex, BookSuggester
+from bible_cache import chapter_cache
 
 # Set up logging to console and file
 logging.basicConfig(
@@ -67,7 +75,7 @@ BOOK_MAP = {
     "Galatians": 48,
     "Ephesians": 49,
     "Philippians": 50,
-    "Colossions": 51,
+    "Colossians": 51,
     "1 Thessalonians": 52,
     "2 Thessalonians": 53,
     "1 Timothy": 54,
@@ -87,6 +95,11 @@ BOOK_MAP = {
 
 REVERSE_BOOK_MAP = {v: k for k, v in BOOK_MAP.items()}
 
+MAX_BATCH_WORKERS = 6
+
+# Translations offered in Settings and the comparison view
+TRANSLATIONS = ['KJV', 'WEB', 'YLT', 'NKJV', 'ASV']
+
 BOOK_CHAPTERS = {
     "Genesis": 50,
     "Exodus": 40,
@@ -138,7 +151,7 @@ BOOK_CHAPTERS = {
     "Galatians": 6,
     "Ephesians": 6,
     "Philippians": 4,
-    "Colossions": 4,
+    "Colossians": 4,
     "1 Thessalonians": 5,
     "2 Thessalonians": 3,
     "1 Timothy": 6,
@@ -156,45 +169,188 @@ BOOK_CHAPTERS = {
     "Revelation": 22
 }
 
-def parse_ref(ref):
-    ref = ref.strip()
-    match = re.match(r'(\d*\s*[a-zA-Z ]+) (\d+)(:(\d+))?', ref, re.I)
-    if not match:
+RefRange = namedtuple('RefRange', ['book_id', 'start_chapter', 'start_verse', 'end_chapter', 'end_verse'])
+RefRange.__doc__ = """A span of scripture. start_verse None means from the start of start_chapter;
+end_verse None means to the end of end_chapter."""
+
+# Every full name, abbreviation and ordinal form, indexed once at import time
+BOOK_INDEX = BookIndex(BOOK_MAP)
+BOOK_SUGGESTER = BookSuggester(BOOK_INDEX)
+_CHAPTER_VERSE = re.compile(
+    r'(\d+)(?:\s*[:.]\s*(\d+)|\s+(\d+))?(?:\s*-\s*(\d+)(?:\s*[:.]\s*(\d+))?)?\s*$')
+# parse_ref's fast path: "<full book name> <chapter>[:<verse>]", the form most references arrive in
+_SIMPLE_REF = re.compile(r'\s*([1-3] )?([A-Za-z]+(?: [A-Za-z]+)*) (\d+)(?::(\d+))?\s*$')
+_FULL_NAMES = {name.lower(): book_id for name, book_id in BOOK_MAP.items()}
+
+def available_translations():
+    """Return the standard translations followed by any other translation installed in the local corpus."""
+    return TRANSLATIONS + [t for t in bible_store.installed_translations() if t not in TRANSLATIONS]
+
+def resolve_book(book_str):
+    """Return the book id for a book name or abbreviation, or None if it is not recognised."""
+    return BOOK_INDEX.resolve(book_str)
+
+def suggest_books(text, limit=5):
+    """Return up to limit full book names for a partial or misspelled name, best match first."""
+    return [REVERSE_BOOK_MAP[book_id] for book_id in BOOK_SUGGESTER.suggest(text, limit=limit)]
+
+def parse_refs(text, translation=None):
+    """Parse one or more references into a list of RefRange.
+
+    Handles single verses (John 3:16), verse ranges (Rom 8:28-39), cross-chapter ranges
+    (John 3:16-4:2), whole chapters and chapter spans (Ps 23, Ps 23-24), and ',' or ';'
+    separated lists where the book and chapter carry over (Rom 3:23; 6:23, 5:8 and John 3:16, 18).
+    Chapters and verses are checked against the bundled versification table (for the given
+    translation's family, if any), so an impossible reference fails before any fetch.
+    """
+    text = text.replace('–', '-').replace('—', '-').strip()
+    if not text:
         raise ValueError("Invalid reference. Use e.g., John 3 or John 3:16")
-    book_str = match.group(1).strip().title()
-    chapter = int(match.group(2))
-    verse = int(match.group(4)) if match.group(4) else None
-    if book_str in BOOK_MAP:
-        book_id = BOOK_MAP[book_str]
-    else:
-        match_num = re.match(r'(\d)(\w+)', book_str)
-        if match_num:
-            book_str = match_num.group(1) + ' ' + match_num.group(2)
-            book_str = book_str.title()
-        book_id = BOOK_MAP.get(book_str)
-    if not book_id:
-        raise ValueError("Unknown book name.")
-    return book_id, chapter, verse
+    ranges = []
+    book_id = None
+    chapter = None
+    verse_context = False  # True when the previous item ended on a verse
+    for separator, item in _split_ref_list(text):
+        item = item.lstrip()
+        if item[0].isalpha() or re.match(r'[1-3]\s*[a-zA-Z]', item):
+            item_book, end = BOOK_INDEX.match(item)
+            if not item_book:
+                raise ValueError("Unknown book name.")
+            book_id = item_book
+            item = item[end:].lstrip(' .')
+            chapter = None
+            verse_context = False
+        elif book_id is None:
+            raise ValueError("Invalid reference. Use e.g., John 3 or John 3:16")
+        match = _CHAPTER_VERSE.match(item.strip())
+        if not match:
+            raise ValueError("Invalid reference. Use e.g., John 3 or John 3:16")
+        first, verse, spaced_verse, range_end, range_end_verse = match.groups()
+        verse = verse or spaced_verse
+        if verse is None and separator == ',' and verse_context and chapter is not None:
+            # "John 3:16, 18-20": bare numbers after a verse are verses in the same chapter
+            start = int(first)
+            end = int(range_end) if range_end else start
+            if range_end_verse:
+                ranges.append(RefRange(book_id, chapter, start, end, int(range_end_verse)))
+                chapter = end
+            else:
+                ranges.append(RefRange(book_id, chapter, start, chapter, end))
+            continue
+        start_chapter = int(first)
+        if verse is None and not range_end_verse and (range_end or first != '1') \
+                and bible_versification.chapter_count(book_id) == 1:
+            # Single-chapter books are cited by verse alone ("Jude 24", "Philemon 4-7"); "Jude 1" is the book
+            verse, start_chapter = first, 1
+        if verse is not None:
+            start_verse = int(verse)
+            if range_end_verse:
+                ranges.append(RefRange(book_id, start_chapter, start_verse, int(range_end), int(range_end_verse)))
+                chapter = int(range_end)
+            elif range_end:
+                ranges.append(RefRange(book_id, start_chapter, start_verse, start_chapter, int(range_end)))
+                chapter = start_chapter
+            else:
+                ranges.append(RefRange(book_id, start_chapter, start_verse, start_chapter, start_verse))
+                chapter = start_chapter
+            verse_context = True
+        else:
+            if range_end_verse:
+                ranges.append(RefRange(book_id, start_chapter, None, int(range_end), int(range_end_verse)))
+                chapter = int(range_end)
+                verse_context = True
+            else:
+                end_chapter = int(range_end) if range_end else start_chapter
+                ranges.append(RefRange(book_id, start_chapter, None, end_chapter, None))
+                chapter = end_chapter
+                verse_context = False
+    for r in ranges:
+        if r.start_chapter < 1 or (r.end_chapter, r.end_verse or 0) < (r.start_chapter, r.start_verse or 0):
+            raise ValueError("Invalid reference range.")
+        bible_versification.validate(r, REVERSE_BOOK_MAP[r.book_id], translation)
+    return ranges
+
+def expand_range(r, translation=None):
+    """Return the (chapter, verse) pairs a RefRange covers, without fetching anything."""
+    return bible_versification.expand(r, translation)
+
+def _split_ref_list(text):
+    """Yield (separator, item) pairs for a ',' or ';' separated reference list."""
+    separator = None
+    for part in re.split(r'([;,])', text):
+        if part in (';', ','):
+            separator = part
+        elif part.strip():
+            yield separator, part
+
+def format_range(r):
+    """Return a canonical reference string for a RefRange."""
+    book = REVERSE_BOOK_MAP[r.book_id]
+    if r.start_verse is None:
+        if r.end_verse is not None:
+            return f"{book} {r.start_chapter}:1-{r.end_chapter}:{r.end_verse}"
+        if r.end_chapter == r.start_chapter:
+            return f"{book} {r.start_chapter}"
+        return f"{book} {r.start_chapter}-{r.end_chapter}"
+    if r.end_chapter != r.start_chapter:
+        end = f"{r.end_chapter}:{r.end_verse}" if r.end_verse is not None else f"{r.end_chapter}"
+        return f"{book} {r.start_chapter}:{r.start_verse}-{end}"
+    if r.end_verse == r.start_verse:
+        return f"{book} {r.start_chapter}:{r.start_verse}"
+    return f"{book} {r.start_chapter}:{r.start_verse}-{r.end_verse}"
+
+def parse_ref(ref, translation=None):
+    """Parse a single reference into (book_id, chapter, verse); verse is None for a whole chapter.
+
+    For a range or list only the first verse (or chapter) is returned; use parse_refs for the rest.
+    """
+    match = _SIMPLE_REF.match(ref)
+    if match:
+        ordinal, name, chapter, verse = match.groups()
+        book_id = _FULL_NAMES.get(f"{ordinal or ''}{name}".lower())
+        chapter = int(chapter)
+        verse = int(verse) if verse else None
+        # Anything unusual (a single-chapter book cited by verse, an impossible verse) takes the full parser
+        if book_id is not None and 1 <= chapter <= bible_versification.chapter_count(book_id) and (
+                verse is None and bible_versification.chapter_count(book_id) > 1
+                or verse is not None and 1 <= verse <= bible_versification.verse_count(book_id, chapter, translation)):
+            return book_id, chapter, verse
+    r = parse_refs(ref, translation)[0]
+    return r.book_id, r.start_chapter, r.start_verse
+
+def is_chapter_local(translation, book_id, chapter):
+    """Return True if a chapter can be served without a network request."""
+    return (bible_packed.get(translation) is not None or bible_store.is_installed(translation)
+            or chapter_cache.contains((translation, book_id, chapter)))
+
+def fetch_chapter(translation, book_id, chapter):
+    """Return the verses of a chapter: packed file, local corpus or cache if present, else bolls.life or a mirror.
+
+    See bible_providers for the fallback order, circuit breakers and hedging; raises a requests exception
+    (bible_providers.ProvidersUnavailable) if no provider can serve it.
+    """
+    return bible_providers.get_chapter(translation, book_id, chapter)
+
+def chapter_text(data, verse):
+    """Format a whole chapter, or pick one verse out of it."""
+    if verse is None:
+        return '\n'.join(f"{v['verse']}. {v['text']}" for v in data)
+    for v in data:
+        if v['verse'] == verse:
+            return v['text']
+    return "Verse not found in chapter."
 
 def fetch_verse_text(ref, translation):
     try:
         logging.debug(f"Fetching verse text for {ref} with translation {translation}")
-        book_id, chapter, verse = parse_ref(ref)
-        url = f"https://bolls.life/get-text/{translation}/{book_id}/{chapter}/"
-        logging.debug(f"Requesting URL: {url}")
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-        if verse is None:
-            text = '\n'.join(f"{v['verse']}. {v['text']}" for v in data)
+        book_id, chapter, verse = parse_ref(ref, translation)
+        packed = bible_packed.get(translation)
+        if packed is not None and verse is not None:
+            # Straight to the verse's slot, without building the chapter
+            text = packed.verse(book_id, chapter, verse) or "Verse not found in chapter."
         else:
-            text = None
-            for v in data:
-                if v['verse'] == verse:
-                    text = v['text']
-                    break
-            if text is None:
-                text = "Verse not found in chapter."
+            data = fetch_chapter(translation, book_id, chapter)
+            text = chapter_text(data, verse)
         logging.debug(f"Successfully fetched text: {text[:50]}...")
         return text
     except requests.RequestException as e:
@@ -202,4 +358,82 @@ def fetch_verse_text(ref, translation):
         return f"Network error: {str(e)}"
     except Exception as e:
         logging.error(f"Error fetching verse text: {str(e)}")
-        return f"Error fetching: {str(e)}"
\ No newline at end of file
+        return f"Error fetching: {str(e)}"
+
+def load_chapters(keys):
+    """Fetch each (translation, book_id, chapter) once, concurrently when there are several.
+
+    Returns {key: verses}, with the exception in place of the verses for chapters that failed.
+    """
+    def load(key):
+        try:
+            return fetch_chapter(*key)
+        except Exception as e:
+            logging.error(f"Error fetching chapter {key}: {str(e)}")
+            return e
+
+    if len(keys) > 1:
+        with ThreadPoolExecutor(max_workers=min(MAX_BATCH_WORKERS, len(keys))) as executor:
+            return dict(zip(keys, executor.map(load, keys)))
+    return {key: load(key) for key in keys}
+
+def range_chapters(ranges):
+    """Return the distinct (book_id, chapter) pairs covered by a list of RefRange, in order."""
+    return list(dict.fromkeys((r.book_id, chapter) for r in ranges
+                              for chapter in range(r.start_chapter, r.end_chapter + 1)))
+
+def _fetch_chapters(keys, translation):
+    """Fetch each (book_id, chapter) of one translation once; see load_chapters."""
+    loaded = load_chapters([(translation, book_id, chapter) for book_id, chapter in keys])
+    return {key[1:]: data for key, data in loaded.items()}
+
+def passage_text(r, loaded):
+    """Format the text of a RefRange from already loaded chapters."""
+    single_verse = r.start_chapter == r.end_chapter and r.start_verse is not None and r.start_verse == r.end_verse
+    lines = []
+    for chapter in range(r.start_chapter, r.end_chapter + 1):
+        chapter_data = loaded[(r.book_id, chapter)]
+        if isinstance(chapter_data, requests.RequestException):
+            return f"Network error: {str(chapter_data)}"
+        if isinstance(chapter_data, Exception):
+            return f"Error fetching: {str(chapter_data)}"
+        if single_verse:
+            return chapter_text(chapter_data, r.start_verse)
+        for v in chapter_data:
+            if chapter == r.start_chapter and r.start_verse is not None and v['verse'] < r.start_verse:
+                continue
+            if chapter == r.end_chapter and r.end_verse is not None and v['verse'] > r.end_verse:
+                continue
+            prefix = f"{chapter}:{v['verse']}" if r.start_chapter != r.end_chapter else f"{v['verse']}"
+            lines.append(f"{prefix}. {v['text']}")
+    return '\n'.join(lines) if lines else "Verse not found in chapter."
+
+def fetch_passages(ranges, translation):
+    """Return the text of each RefRange, fetching every chapter they need exactly once."""
+    keys = range_chapters(ranges)
+    logging.debug(f"Resolving {len(ranges)} passages from {len(keys)} chapters in {translation}")
+    loaded = _fetch_chapters(keys, translation)
+    return [passage_text(r, loaded) for r in ranges]
+
+def fetch_many(refs, translation):
+    """Resolve many references at once, fetching each distinct chapter only once.
+
+    Returns one text per ref, in input order, formatted like fetch_verse_text (including its
+    error strings). Each ref may itself be a range or list; its passages are joined by newlines.
+    """
+    parsed = []
+    for ref in refs:
+        try:
+            parsed.append(parse_refs(ref, translation))
+        except Exception as e:
+            logging.error(f"Error parsing {ref}: {str(e)}")
+            parsed.append(e)
+    ranges = [r for p in parsed if not isinstance(p, Exception) for r in p]
+    texts = iter(fetch_passages(ranges, translation))
+    results = []
+    for p in parsed:
+        if isinstance(p, Exception):
+            results.append(f"Error fetching: {str(p)}")
+        else:
+            results.append('\n'.join(next(texts) for _ in p))
+    return results
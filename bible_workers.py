@@ -0,0 +1,68 @@
+# bible_workers.py
+# Background workers for running blocking Bible lookups off the Qt main thread.
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+import logging
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+
+class WorkerSignals(QObject):
+    """Signals emitted by FetchWorker; delivered to the receiver's thread."""
+    finished = pyqtSignal(int, object)  # request_id, result
+    failed = pyqtSignal(int, object)  # request_id, exception
+    progress = pyqtSignal(int, object)  # request_id, progress payload emitted by the callable
+
+
+class FetchWorker(QRunnable):
+    """Run a blocking callable on a QThreadPool and report the result by signal.
+
+    Setting cancelled to True before or during the run suppresses the result signals,
+    so a superseded request never reaches the UI.
+    """
+
+    # Workers stay referenced here until they finish, so a superseded worker the owner
+    # has dropped is not garbage collected while the pool is still running it.
+    _live = set()
+
+    def __init__(self, request_id, fn, *args, **kwargs):
+        super().__init__()
+        self.request_id = request_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = False
+        self.signals = WorkerSignals()
+        self.setAutoDelete(False)
+        FetchWorker._live.add(self)
+
+    def cancel(self, pool=None):
+        """Suppress this worker's result and remove it from the pool queue if it has not started."""
+        self.cancelled = True
+        if pool is not None and pool.tryTake(self):
+            logging.debug(f"Dropped queued request {self.request_id}")
+            FetchWorker._live.discard(self)
+
+    def run(self):
+        try:
+            if self.cancelled:
+                logging.debug(f"Skipping cancelled request {self.request_id}")
+                return
+            try:
+                result = self.fn(*self.args, **self.kwargs)
+            except Exception as e:
+                if not self.cancelled:
+                    self.signals.failed.emit(self.request_id, e)
+                return
+            if not self.cancelled:
+                self.signals.finished.emit(self.request_id, result)
+        finally:
+            FetchWorker._live.discard(self)
@@ -0,0 +1,188 @@
+# concordance_dialog.py
+# Concordance dialog: per-book frequency of a word in an installed translation, and the verses it occurs in.
+
+import logging
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPushButton, QListWidget, \
+    QListWidgetItem, QTableWidget, QTableWidgetItem, QHeaderView, QCompleter, QMessageBox, QSplitter
+from PyQt6.QtCore import Qt, QThreadPool
+from bible_index import tokenize
+from bible_utils import REVERSE_BOOK_MAP
+from bible_concordance import get_concordance
+from bible_workers import FetchWorker
+from bible_read import BibleReadDialog
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+BAR_WIDTH = 40
+
+
+def format_ref(ref):
+    book_id, chapter, verse = ref
+    return f"{REVERSE_BOOK_MAP.get(book_id, 'Unknown')} {chapter}:{verse}"
+
+
+class ConcordanceDialog(QDialog):
+    def __init__(self, parent=None, word=""):
+        super().__init__(parent)
+        self.parent = parent
+        self.setWindowTitle("Concordance")
+        self.setMinimumSize(800, 600)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.request_id = 0
+        self.pending_worker = None
+        self.concordance = None
+        self.current_word = None
+        self.setup_ui()
+        self.load_concordance(word)
+
+    def setup_ui(self):
+        """Set up the dialog UI."""
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        word_layout = QHBoxLayout()
+        self.word_input = QLineEdit()
+        self.word_input.setPlaceholderText("Word (e.g., grace)")
+        self.word_input.returnPressed.connect(self.look_up)
+        word_layout.addWidget(QLabel("Word:"))
+        word_layout.addWidget(self.word_input)
+        look_up_btn = QPushButton("Look Up")
+        look_up_btn.setStyleSheet(
+            "background-color: #007bff; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
+        look_up_btn.clicked.connect(self.look_up)
+        word_layout.addWidget(look_up_btn)
+        self.loading_label = QLabel("Loading...")
+        self.loading_label.setStyleSheet("color: #ffc107;")
+        self.loading_label.hide()
+        word_layout.addWidget(self.loading_label)
+        layout.addLayout(word_layout)
+
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("color: #b9bbbe;")
+        layout.addWidget(self.summary_label)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.books_table = QTableWidget(0, 3)
+        self.books_table.setHorizontalHeaderLabels(["Book", "Occurrences", "Distribution"])
+        self.books_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.books_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.books_table.setSelectionMode(QTableWidget.SelectionMode.SingleSelection)
+        self.books_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
+        self.books_table.setStyleSheet("background-color: #2c2f33; color: #ffffff; border: 1px solid #444;")
+        self.books_table.itemSelectionChanged.connect(self.show_occurrences)
+        splitter.addWidget(self.books_table)
+
+        self.occurrences_list = QListWidget()
+        self.occurrences_list.setStyleSheet("background-color: #2c2f33; color: #ffffff; border: 1px solid #444;")
+        self.occurrences_list.itemDoubleClicked.connect(self.open_occurrence)
+        splitter.addWidget(self.occurrences_list)
+        splitter.setSizes([500, 300])
+        layout.addWidget(splitter)
+
+        hint = QLabel("Select a book to list its verses; double-click a verse to open it in Read Bible.")
+        hint.setStyleSheet("color: #b9bbbe;")
+        layout.addWidget(hint)
+
+    def get_translation(self):
+        return self.parent.sermon.get('settings', {}).get('default_translation', 'WEB') if self.parent else 'WEB'
+
+    def load_concordance(self, word=""):
+        """Load or build the concordance on the worker pool, then look up word if given."""
+        self.request_id += 1
+        worker = FetchWorker(self.request_id, get_concordance, self.get_translation())
+        worker.signals.finished.connect(lambda request_id, result: self.on_loaded(request_id, result, word))
+        worker.signals.failed.connect(self.on_load_failed)
+        self.pending_worker = worker
+        self.loading_label.setText("Loading concordance...")
+        self.loading_label.show()
+        self.thread_pool.start(worker)
+
+    def on_loaded(self, request_id, concordance, word):
+        if request_id != self.request_id:
+            return
+        self.pending_worker = None
+        self.loading_label.hide()
+        self.concordance = concordance
+        completer = QCompleter(concordance.words, self)
+        completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.word_input.setCompleter(completer)
+        if word:
+            self.word_input.setText(word)
+            self.look_up()
+
+    def on_load_failed(self, request_id, error):
+        if request_id != self.request_id:
+            return
+        self.pending_worker = None
+        self.loading_label.hide()
+        logging.error(f"Failed to load concordance: {str(error)}")
+        QMessageBox.warning(self, "Concordance", str(error))
+
+    def look_up(self):
+        """Show the per-book frequency of the entered word."""
+        if self.concordance is None:
+            return
+        words = tokenize(self.word_input.text())
+        if not words:
+            QMessageBox.warning(self, "Empty Input", "Please enter a word.")
+            return
+        word = words[0]
+        counts = self.concordance.book_counts(word)
+        self.current_word = word
+        self.books_table.blockSignals(True)
+        self.books_table.clearSelection()
+        self.books_table.setRowCount(len(counts))
+        most = max(counts.values(), default=1)
+        for row, (book_id, count) in enumerate(counts.items()):
+            book_item = QTableWidgetItem(REVERSE_BOOK_MAP.get(book_id, 'Unknown'))
+            book_item.setData(Qt.ItemDataRole.UserRole, book_id)
+            self.books_table.setItem(row, 0, book_item)
+            count_item = QTableWidgetItem(str(count))
+            count_item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            self.books_table.setItem(row, 1, count_item)
+            self.books_table.setItem(row, 2, QTableWidgetItem('█' * max(1, round(BAR_WIDTH * count / most))))
+        self.books_table.blockSignals(False)
+        verses = len(self.concordance.ordinals(word))
+        if counts:
+            self.summary_label.setText(f"'{word}' occurs {sum(counts.values())} times in {verses} verses "
+                                       f"across {len(counts)} books.")
+        else:
+            self.summary_label.setText(f"'{word}' does not occur in {self.concordance.translation}.")
+        self.show_occurrences()
+
+    def show_occurrences(self):
+        """List the verses of the selected book, or of the whole Bible when no book is selected."""
+        self.occurrences_list.clear()
+        if self.current_word is None:
+            return
+        book_id = None
+        selected = self.books_table.selectedItems()
+        if selected:
+            book_id = self.books_table.item(selected[0].row(), 0).data(Qt.ItemDataRole.UserRole)
+        for ref in self.concordance.refs(self.current_word, book_id):
+            item = QListWidgetItem(format_ref(ref))
+            self.occurrences_list.addItem(item)
+
+    def open_occurrence(self, item):
+        """Open the double-clicked verse in Read Bible."""
+        try:
+            dialog = BibleReadDialog(self.parent, item.text())
+            dialog.exec()
+        except Exception as e:
+            logging.error(f"Failed to open occurrence: {str(e)}")
+            QMessageBox.critical(self, "Dialog Error", f"Failed to open Read Bible: {str(e)}")
+
+    def done(self, result):
+        if self.pending_worker is not None:
+            self.pending_worker.cancel(self.thread_pool)
+        self.request_id += 1
+        super().done(result)
@@ -4,6 +4,10 @@ from PyQt6.QtGui import QFont
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.shared import Pt
 from datetime import datetime
+from PyQt6.QtCore import QThreadPool
+from bible_utils import fetch_many
+from bible_workers import FetchWorker
+from bible_ranges import ref_set, sort_key
 import os
 
 
@@ -138,6 +142,45 @@ def save_as_word(parent, sermon, status_bar, filename=None):
         # Create folder if it doesn't exist
         os.makedirs(os.path.dirname(filename), exist_ok=True)
 
+        # Look up the text of any bare references in one batch, off the UI thread; references covering the
+        # same verses are fetched once, and the document is written when the text arrives
+        missing = {}
+        for vn in sermon.get('verses_notes', []):
+            verse_set = ref_set(vn.get('ref') or '')
+            if not vn.get('text') and verse_set:
+                missing.setdefault(verse_set, vn['ref'])
+        if not missing:
+            write_word(parent, sermon, status_bar, filename, {})
+            return
+        if not hasattr(parent, 'export_pool'):
+            parent.export_pool = QThreadPool(parent)
+            parent.export_request_id = 0
+        parent.export_request_id += 1
+        translation = sermon.get('settings', {}).get('default_translation', 'WEB')
+        worker = FetchWorker(parent.export_request_id, fetch_many, list(missing.values()), translation)
+
+        def on_fetched(request_id, texts):
+            if request_id != parent.export_request_id:
+                return
+            fetched = {verse_set: text for verse_set, text in zip(missing, texts)
+                       if not text.startswith(("Error", "Network error", "Verse not found"))}
+            write_word(parent, sermon, status_bar, filename, fetched)
+
+        def on_failed(request_id, error):
+            if request_id == parent.export_request_id:
+                QMessageBox.warning(parent, "Export Error", f"Failed to export: {str(error)}")
+
+        worker.signals.finished.connect(on_fetched)
+        worker.signals.failed.connect(on_failed)
+        status_bar.showMessage("Looking up verse text for the export...")
+        parent.export_pool.start(worker)
+    except Exception as e:
+        QMessageBox.warning(parent, "Export Error", f"Failed to export: {str(e)}")
+
+
+def write_word(parent, sermon, status_bar, filename, fetched):
+    """Write the sermon to a .docx file; fetched maps the VerseSet of a reference without text to its text."""
+    try:
         doc = Document()
         section = doc.sections[0]
 
@@ -197,13 +240,14 @@ def save_as_word(parent, sermon, status_bar, filename=None):
 
         # Verses and Notes
         doc.add_heading("Verses and Notes", level=2)
-        verses_notes = sermon.get('verses_notes', [])
+        # Same canonical order as the Verses/Notes list: references by book, then notes
+        verses_notes = sorted(sermon.get('verses_notes', []), key=lambda vn: sort_key(vn.get('ref', '')))
         if not verses_notes:
             doc.add_paragraph("No verses or notes provided.", style='Normal')
         else:
             for vn in verses_notes:
                 ref = vn.get('ref', 'Unknown')
-                text = vn.get('text', '')
+                text = vn.get('text', '') or fetched.get(ref_set(vn.get('ref') or ''), '')
                 note = vn.get('note', '')
                 doc.add_paragraph(f"{ref}: {text}", style='Normal')
                 if note:
@@ -6,11 +6,16 @@ from data_handlers import load_sermon, save_sermon, clear_sermon_data, init_encr
 from ui_tabs import create_title_tab, create_intro_tab, create_content_tab, create_verses_tab, create_preview_tab
 from verse_handlers import update_verses_list, add_verse, edit_verse, delete_verse, SermonNotesDialog
 from bible_utils import fetch_verse_text
+import bible_cache
+import bible_providers
 from bible_read import BibleReadDialog
 from export_utils import set_header, set_footer, save_as_word
 from preview_utils import preview_all
 from settings import SettingsDialog
 from bible_search import BibleSearchDialog
+from bible_compare import BibleCompareDialog
+from concordance_dialog import ConcordanceDialog
+from sermon_references_dialog import SermonReferencesDialog
 from gemini_chat import GeminiChatDialog
 from help_utils import HelpDialog
 import sqlite3
@@ -55,6 +60,8 @@ class SermonApp(QMainWindow):
         except Exception as e:
             logging.error(f"Error setting window icon: {str(e)}")
         self.sermon = load_sermon(self)
+        bible_cache.configure(self.sermon.get('settings', {}))
+        bible_providers.configure(self.sermon.get('settings', {}))
         self.statusBar = QStatusBar()
         self.setStatusBar(self.statusBar)
         self.sort_mode = 'ref'  # Default sorting mode: 'ref' or 'time'
@@ -78,6 +85,10 @@ class SermonApp(QMainWindow):
         tools_menu = menu_bar.addMenu("Tools")
         tools_menu.addAction("Read Bible", self.read_bible)
         tools_menu.addAction("Bible Search", self.bible_search)
+        tools_menu.addAction("Compare Translations", self.compare_translations)
+        tools_menu.addAction("Related Verses", self.related_verses)
+        tools_menu.addAction("Concordance", self.open_concordance)
+        tools_menu.addAction("Scripture References", self.open_sermon_references)
         tools_menu.addAction("Gemini Chat", self.open_gemini_chat)
         tools_menu.addAction("Clear All", self.clear_all)
         settings_menu = menu_bar.addMenu("Settings")
@@ -219,6 +230,35 @@ class SermonApp(QMainWindow):
         except Exception as e:
             QMessageBox.critical(self, "Bible Search Error", f"Failed to open Bible Search: {str(e)}")
 
+    def compare_translations(self):
+        try:
+            dialog = BibleCompareDialog(self)
+            dialog.exec()
+        except Exception as e:
+            QMessageBox.critical(self, "Compare Translations Error", f"Failed to open Compare Translations: {str(e)}")
+
+    def related_verses(self):
+        try:
+            from bible_related import RelatedVersesDialog  # Loaded on first use: it brings in NumPy and SciPy
+            dialog = RelatedVersesDialog(self, self.sermon['settings'].get('default_translation', 'WEB'))
+            dialog.exec()
+        except Exception as e:
+            QMessageBox.critical(self, "Related Verses Error", f"Failed to open Related Verses: {str(e)}")
+
+    def open_concordance(self):
+        try:
+            dialog = ConcordanceDialog(self)
+            dialog.exec()
+        except Exception as e:
+            QMessageBox.critical(self, "Concordance Error", f"Failed to open Concordance: {str(e)}")
+
+    def open_sermon_references(self):
+        try:
+            dialog = SermonReferencesDialog(self)
+            dialog.exec()
+        except Exception as e:
+            QMessageBox.critical(self, "References Error", f"Failed to open Scripture References: {str(e)}")
+
     def open_gemini_chat(self):
         try:
             # Load API keys from SQLite database
@@ -293,6 +333,7 @@ class SermonApp(QMainWindow):
             self.sermon['intro'] = self.intro_edit.toPlainText().replace('\r\n', '\n').replace('\r', '\n')
             self.sermon['content'] = self.content_edit.toPlainText().replace('\r\n', '\n').replace('\r', '\n')
             self.quick_save()
+        bible_cache.chapter_cache.log_stats()
         event.accept()
 
 if __name__ == "__main__":
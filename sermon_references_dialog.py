@@ -0,0 +1,85 @@
+# sermon_references_dialog.py
+# Lists every passage the current sermon cites (found by bible_extract), in Bible order, with note coverage.
+
+import logging
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QMessageBox
+from bible_extract import sermon_refs, canonical_ref
+from bible_ranges import VerseSet, sort_key, notes_coverage
+from bible_read import BibleReadDialog
+
+# Set up logging
+logging.basicConfig(
+    level=logging.DEBUG,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    handlers=[
+        logging.FileHandler('sermon.log'),
+        logging.StreamHandler()
+    ]
+)
+
+FIELD_NAMES = {'title': "Title", 'intro': "Introduction", 'content': "Content", 'verses_notes': "Verses/Notes"}
+
+
+class SermonReferencesDialog(QDialog):
+    """Every passage the current sermon cites, in Bible order, with where it is cited and whether a note covers it."""
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.parent = parent
+        self.setWindowTitle("Scripture References")
+        self.setMinimumSize(700, 500)
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+        self.summary_label = QLabel("")
+        self.summary_label.setStyleSheet("color: #b9bbbe;")
+        layout.addWidget(self.summary_label)
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Reference", "Cited", "Where", "In Notes"])
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.table.setStyleSheet("background-color: #2c2f33; color: #ffffff; border: 1px solid #444;")
+        self.table.cellDoubleClicked.connect(self.open_reference)
+        layout.addWidget(self.table)
+        hint = QLabel("Double-click a reference to open it in Read Bible.")
+        hint.setStyleSheet("color: #b9bbbe;")
+        layout.addWidget(hint)
+        self.show_references()
+
+    def show_references(self):
+        try:
+            sermon = self.parent.sermon
+            cited = {}  # canonical reference -> (count, fields)
+            for field, reference in sermon_refs(sermon):
+                ref = canonical_ref(reference)
+                count, fields = cited.get(ref, (0, []))
+                if FIELD_NAMES[field] not in fields:
+                    fields.append(FIELD_NAMES[field])
+                cited[ref] = (count + 1, fields)
+            covered = notes_coverage(sermon.get('verses_notes', []))
+            self.table.setRowCount(0)
+            for ref in sorted(cited, key=sort_key):
+                count, fields = cited[ref]
+                verse_set = VerseSet.parse(ref)
+                in_notes = "Yes" if verse_set in covered else "Partly" if verse_set.overlaps(covered) else "No"
+                row = self.table.rowCount()
+                self.table.insertRow(row)
+                for column, value in enumerate([ref, str(count), ", ".join(fields), in_notes]):
+                    self.table.setItem(row, column, QTableWidgetItem(value))
+            self.table.resizeColumnsToContents()
+            total = sum(count for count, _ in cited.values())
+            self.summary_label.setText(f"{len(cited)} passages cited {total} times." if cited else
+                                       "No scripture references found in this sermon.")
+            logging.debug(f"Found {total} references to {len(cited)} passages in the sermon")
+        except Exception as e:
+            logging.error(f"Failed to list sermon references: {str(e)}")
+            QMessageBox.critical(self, "References Error", f"Failed to list references: {str(e)}")
+
+    def open_reference(self, row, column):
+        """Open the double-clicked passage in Read Bible."""
+        try:
+            dialog = BibleReadDialog(self.parent, self.table.item(row, 0).text())
+            dialog.exec()
+        except Exception as e:
+            logging.error(f"Failed to open reference: {str(e)}")
+            QMessageBox.critical(self, "Dialog Error", f"Failed to open Read Bible: {str(e)}")
@@ -1,5 +1,10 @@
-from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QComboBox, QDialogButtonBox, QListWidget, QPushButton, QInputDialog, QHBoxLayout
+from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QComboBox, QDialogButtonBox, QListWidget, QPushButton, QInputDialog, QHBoxLayout, QProgressDialog, QMessageBox, QFileDialog
+from PyQt6.QtCore import Qt, QThreadPool
 import sqlite3
+from bible_utils import available_translations
+from bible_import import import_files
+from bible_download import DownloadManager, format_report
+from bible_workers import FetchWorker
 import logging
 
 # Set up logging
@@ -23,11 +28,27 @@ class SettingsDialog(QDialog):
 
         # Bible Translation
         self.translation_combo = QComboBox()
-        translations = ['KJV', 'WEB', 'YLT', 'NKJV', 'ASV']
-        self.translation_combo.addItems(translations)
+        self.translation_combo.addItems(available_translations())
         self.translation_combo.setCurrentText(parent.sermon['settings'].get('default_translation', 'WEB'))
         layout.addWidget(QLabel("Default Bible Translation:"))
-        layout.addWidget(self.translation_combo)
+        translation_layout = QHBoxLayout()
+        translation_layout.addWidget(self.translation_combo)
+        download_btn = QPushButton("Download for Offline Use")
+        download_btn.setStyleSheet("background-color: #17a2b8; color: white; padding: 5px 10px; border-radius: 5px;")
+        download_btn.clicked.connect(self.download_translation)
+        translation_layout.addWidget(download_btn)
+        import_btn = QPushButton("Import Translation File...")
+        import_btn.setStyleSheet("background-color: #17a2b8; color: white; padding: 5px 10px; border-radius: 5px;")
+        import_btn.clicked.connect(self.import_translation_file)
+        translation_layout.addWidget(import_btn)
+        layout.addLayout(translation_layout)
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(1)
+        self.download = None
+        self.importing = False
+        self.import_worker = None
+        self.download_id = 0
+        self.progress_dialog = None
 
         # Multiple Gemini API Keys
         layout.addWidget(QLabel("Gemini API Keys (Add multiple for different accounts/models):"))
@@ -124,6 +145,146 @@ class SettingsDialog(QDialog):
                 key = self.keys[i]
                 self.keys_list.item(i).setText(f"Key {i + 1}: {key[:4]}...{key[-4:]}")
 
+    def download_translation(self):
+        """Download the selected translation into the local corpus, resuming any earlier partial download."""
+        if self.download is not None or self.importing:
+            return
+        translation = self.translation_combo.currentText()
+        self.download = DownloadManager(translation)
+        self.download_id += 1
+        worker = FetchWorker(self.download_id, self.download.run)
+        self.download.progress_callback = lambda done, total: worker.signals.progress.emit(worker.request_id,
+                                                                                          (done, total))
+        worker.signals.progress.connect(self.on_download_progress)
+        worker.signals.finished.connect(self.on_download_finished)
+        worker.signals.failed.connect(self.on_download_failed)
+        self.progress_dialog = QProgressDialog(f"Downloading {translation}...", "Cancel", 0, 0, self)
+        self.progress_dialog.setWindowTitle("Download Translation")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.canceled.connect(self.download.cancel)
+        logging.debug(f"Starting download of {translation}")
+        self.thread_pool.start(worker)
+
+    def on_download_progress(self, request_id, progress):
+        if request_id != self.download_id:
+            return
+        done, total = progress
+        if self.progress_dialog is not None and not self.progress_dialog.wasCanceled():
+            self.progress_dialog.setMaximum(total)
+            self.progress_dialog.setValue(done)
+            self.progress_dialog.setLabelText(f"Downloading {self.download.translation}: {done}/{total} chapters "
+                                              f"({self.download.throughput():.1f}/s)")
+
+    def finish_download(self):
+        self.download = None
+        if self.progress_dialog is not None:
+            self.progress_dialog.canceled.disconnect()
+            self.progress_dialog.close()
+            self.progress_dialog = None
+
+    def on_download_finished(self, request_id, report):
+        if request_id != self.download_id:
+            return
+        self.finish_download()
+        summary = format_report(report)
+        logging.debug(f"Download finished: {summary}")
+        if report['installed']:
+            QMessageBox.information(self, "Download Complete", summary)
+        else:
+            QMessageBox.warning(self, "Download Incomplete", summary)
+
+    def on_download_failed(self, request_id, error):
+        if request_id != self.download_id:
+            return
+        self.finish_download()
+        logging.error(f"Failed to download translation: {str(error)}")
+        QMessageBox.warning(self, "Download Error", f"Failed to download translation: {str(error)}")
+
+    def import_translation_file(self):
+        """Install a translation from OSIS, USFM or Zefania files on disk."""
+        if self.download is not None or self.importing:
+            return
+        paths, _ = QFileDialog.getOpenFileNames(self, "Import Bible Files", "",
+                                                "Bible Files (*.xml *.osis *.usfm *.sfm);;All Files (*)")
+        if not paths:
+            return
+        name, ok = QInputDialog.getText(self, "Import Translation", "Short name for the translation (e.g. LSV):")
+        name = name.strip().upper()
+        if not ok or not name:
+            return
+        if name in available_translations():
+            answer = QMessageBox.question(self, "Replace Translation",
+                                          f"{name} is already available. Replace its local copy with these files?")
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        self.importing = True
+        self.download_id += 1
+        worker = FetchWorker(self.download_id, import_files, name, paths,
+                             progress_callback=lambda chapters: worker.signals.progress.emit(worker.request_id, chapters),
+                             is_cancelled=lambda: worker.cancelled)
+        worker.signals.progress.connect(self.on_import_progress)
+        worker.signals.finished.connect(lambda request_id, result: self.on_import_finished(request_id, name, result))
+        worker.signals.failed.connect(self.on_import_failed)
+        self.import_worker = worker
+        self.progress_dialog = QProgressDialog(f"Importing {name}...", "Cancel", 0, 0, self)
+        self.progress_dialog.setWindowTitle("Import Translation")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(0)
+        self.progress_dialog.canceled.connect(self.cancel_import)
+        logging.debug(f"Importing {len(paths)} files as {name}")
+        self.thread_pool.start(worker)
+
+    def on_import_progress(self, request_id, chapters):
+        if request_id == self.download_id and self.progress_dialog is not None:
+            self.progress_dialog.setLabelText(f"Importing: {chapters} chapters")
+
+    def cancel_import(self):
+        """Stop the import at the next chapter; the previously installed copy, if any, is kept."""
+        if self.import_worker is not None:
+            self.import_worker.cancel(self.thread_pool)
+            logging.debug("Import cancelled")
+            self.parent.statusBar.showMessage("Import cancelled.", 3000)
+        self.finish_import()
+
+    def finish_import(self):
+        self.importing = False
+        self.import_worker = None
+        if self.progress_dialog is not None:
+            self.progress_dialog.canceled.disconnect()
+            self.progress_dialog.close()
+            self.progress_dialog = None
+
+    def on_import_finished(self, request_id, name, result):
+        if request_id != self.download_id:
+            return
+        self.finish_import()
+        verse_count, missing = result
+        if self.translation_combo.findText(name) < 0:
+            self.translation_combo.addItem(name)
+        self.translation_combo.setCurrentText(name)
+        message = f"{name} is installed ({verse_count} verses)."
+        if missing:
+            message += f"\n{missing} chapters were not in the files (e.g. a New Testament only)."
+        logging.debug(f"Import finished: {message}")
+        QMessageBox.information(self, "Import Complete", message)
+
+    def on_import_failed(self, request_id, error):
+        if request_id != self.download_id:
+            return
+        self.finish_import()
+        logging.error(f"Failed to import translation: {str(error)}")
+        QMessageBox.warning(self, "Import Error", f"Failed to import translation: {str(error)}")
+
+    def done(self, result):
+        """Stop a running download or import when the dialog closes; a download resumes where it stopped."""
+        if self.download is not None:
+            self.download.cancel()
+        if self.import_worker is not None:
+            self.import_worker.cancel(self.thread_pool)
+        self.download_id += 1
+        super().done(result)
+
     def accept_settings(self):
         try:
             self.parent.sermon['settings']['default_translation'] = self.translation_combo.currentText()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+import bible_import
+import bible_store
+
+OSIS = """<?xml version="1.0" encoding="UTF-8"?>
+<osis xmlns="http://www.bibletechnologies.net/2003/OSIS/namespace"><osisText><div type="book" osisID="John">
+<chapter osisID="John.3">
+<verse osisID="John.3.16">For God so loved the world, that he gave his only begotten Son, that whosoever<lb/>believeth<p>on him should not perish,</p><l>but have everlasting life.</l></verse>
+<verse sID="John.3.17"/><lg><l>For God sent not his Son</l><l>into the world</l></lg><verse eID="John.3.17"/>
+</chapter></div></osisText></osis>
+"""
+
+
+class BibleImportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        self.addCleanup(os.chdir, self.previous_cwd)
+        bible_store.CORPUS_DB_FILE = os.path.join(self.directory.name, 'bible_corpus.db')
+        bible_store._conn = None
+        bible_store._installed = None
+        self.addCleanup(self.close_store)
+
+    @staticmethod
+    def close_store():
+        if bible_store._conn is not None:
+            bible_store._conn.close()
+        bible_store._conn = None
+        bible_store._installed = None
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def test_osis_element_boundaries_separate_words(self):
+        bible_import.import_files('TST', [self.write('tst.osis.xml', OSIS)])
+        verses = {v['verse']: v['text'] for v in bible_store.get_chapter('TST', 43, 3)}
+        self.assertEqual(verses[16], "For God so loved the world, that he gave his only begotten Son, that whosoever "
+                                     "believeth on him should not perish, but have everlasting life.")
+        self.assertEqual(verses[17], "For God sent not his Son into the world")
+
+    def test_failed_import_keeps_previous_copy(self):
+        bible_import.import_files('TST', [self.write('tst.osis.xml', OSIS)])
+        broken = self.write('broken.osis.xml', OSIS.replace('</osisText>', ''))
+        with self.assertRaises(Exception):
+            bible_import.import_files('TST', [broken])
+        self.assertTrue(bible_store.is_installed('TST'))
+        self.assertEqual(len(bible_store.get_chapter('TST', 43, 3)), 2)
+        self.assertEqual(bible_store.installed_translations(), ['TST'])
+
+    def test_cancelled_import_keeps_previous_copy(self):
+        bible_import.import_files('TST', [self.write('tst.osis.xml', OSIS)])
+        other = self.write('other.osis.xml', OSIS.replace('John.3', 'John.4'))
+        with self.assertRaises(bible_import.ImportCancelled):
+            bible_import.import_files('TST', [other], is_cancelled=lambda: True)
+        self.assertEqual(len(bible_store.get_chapter('TST', 43, 3)), 2)
+        self.assertEqual(bible_store.get_chapter('TST', 43, 4), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+import bible_providers
+from bible_cache import chapter_cache
+from bible_providers import CacheProvider, CircuitBreaker, HttpProvider, ProviderChain, ProvidersUnavailable
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+from standin_server import StandinServer, StandinConfig  # noqa: E402
+
+COOLDOWN = 0.2
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_consecutive_failures_and_probes_once(self):
+        breaker = CircuitBreaker(failures=2, cooldown=COOLDOWN)
+        self.assertFalse(breaker.record_failure())
+        self.assertEqual(breaker.state, 'closed')
+        self.assertTrue(breaker.record_failure())
+        self.assertEqual(breaker.state, 'open')
+        self.assertFalse(breaker.allow())
+        time.sleep(COOLDOWN + 0.05)
+        self.assertEqual(breaker.state, 'half-open')
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())  # Only one trial request at a time
+        self.assertTrue(breaker.record_failure())  # A failed trial re-opens at once
+        self.assertEqual(breaker.state, 'open')
+        time.sleep(COOLDOWN + 0.05)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, 'closed')
+        self.assertTrue(breaker.allow())
+
+
+class ProviderChainTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        self.addCleanup(os.chdir, self.previous_cwd)
+        chapter_cache.clear()
+        self.addCleanup(chapter_cache.clear)
+
+    def server(self, name, **config):
+        server = StandinServer(StandinConfig(**config))
+        self.addCleanup(server.stop)
+        return HttpProvider(name, server.start()), server
+
+    def test_breaker_skips_failing_provider_until_trial_succeeds(self):
+        primary, primary_server = self.server('primary', error_rate=1.0)
+        mirror, _ = self.server('mirror')
+        primary.breaker = CircuitBreaker(failures=3, cooldown=COOLDOWN)
+        chain = ProviderChain([CacheProvider(), primary, mirror], hedge=False, deadline=5.0)
+        for chapter in range(1, 5):
+            self.assertTrue(chain.get_chapter('KJV', 1, chapter))
+        self.assertEqual(primary_server.snapshot().get('get-text'), 3)
+        self.assertEqual(chain.counters['short_circuited'], 1)
+        self.assertEqual(chain.status()[0][1], 'open')
+
+        primary_server.config.error_rate = 0.0
+        time.sleep(COOLDOWN + 0.05)
+        self.assertEqual(chain.status()[0][1], 'half-open')
+        self.assertTrue(chain.get_chapter('KJV', 1, 5))
+        self.assertEqual(primary_server.snapshot().get('get-text'), 4)
+        self.assertEqual(chain.status()[0][1], 'closed')
+
+    def test_hedge_answers_for_slow_provider(self):
+        primary, _ = self.server('primary', latency_ms=800)
+        mirror, _ = self.server('mirror')
+        chain = ProviderChain([primary, mirror], hedge=True, deadline=5.0)
+        with mock.patch.object(bible_providers, 'HEDGE_MAX_DELAY', 0.05):
+            start = time.monotonic()
+            self.assertTrue(chain.get_chapter('KJV', 43, 3))
+            elapsed = time.monotonic() - start
+        self.assertLess(elapsed, 0.6)
+        self.assertEqual(chain.counters['hedged'], 1)
+        self.assertEqual(chain.counters['hedge_wins'], 1)
+
+    def test_deadline_bounds_wait_on_hanging_provider(self):
+        primary, _ = self.server('primary', hang_rate=1.0, hang_seconds=1.0)
+        chain = ProviderChain([primary], hedge=True, deadline=0.3)
+        start = time.monotonic()
+        with self.assertRaises(ProvidersUnavailable) as raised:
+            chain.get_chapter('KJV', 43, 3)
+        self.assertLess(time.monotonic() - start, 0.6)
+        self.assertIn("no answer within 0.3s", str(raised.exception))
+        self.assertEqual(chain.counters['failed'], 1)
+
+    def test_deadline_serves_stale_cache(self):
+        primary, _ = self.server('primary', hang_rate=1.0, hang_seconds=1.0)
+        chapter_cache.put(('KJV', 43, 3), [{'verse': 16, 'text': "For God so loved the world"}])
+        chain = ProviderChain([primary], hedge=False, deadline=0.3)  # No CacheProvider: the entry counts as stale
+        self.assertEqual(chain.get_chapter('KJV', 43, 3)[0]['verse'], 16)
+        self.assertEqual(chain.counters['stale'], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from bible_ranges import VerseSet, sort_key, overlapping_notes
+
+
+def vs(text):
+    return VerseSet.parse(text)
+
+
+class VerseSetTest(unittest.TestCase):
+    def test_adjacent_and_overlapping_spans_merge(self):
+        self.assertEqual(vs("Rom 8:28-30; 8:31-39"), vs("Rom 8:28-39"))
+        self.assertEqual(vs("John 3:16-18, 17"), vs("John 3:16-18"))
+        self.assertEqual(len(vs("Rom 8:28-39")), 12)
+
+    def test_union(self):
+        self.assertEqual(vs("Rom 8:28-32") | vs("Rom 8:30-39"), vs("Rom 8:28-39"))
+        self.assertEqual(vs("Rom 8:28-30") | vs("Rom 8:31-39"), vs("Rom 8:28-39"))
+        self.assertEqual(len(vs("John 3:16") | vs("Gen 1:1")), 2)
+        self.assertEqual(vs("John 3:16") | VerseSet(), vs("John 3:16"))
+
+    def test_intersection(self):
+        self.assertEqual(vs("Rom 8:28-35") & vs("Rom 8:31-39"), vs("Rom 8:31-35"))
+        self.assertEqual(vs("Ps 23-24") & vs("Ps 24:1-3; 25:1"), vs("Ps 24:1-3"))
+        self.assertFalse(vs("Rom 8:28-30") & vs("Rom 8:31-39"))
+        self.assertEqual(vs("John 3:16-4:2") & vs("John 3:36-4:1"), vs("John 3:36-4:1"))
+
+    def test_difference(self):
+        self.assertEqual(vs("Rom 8:28-39") - vs("Rom 8:31-33"), vs("Rom 8:28-30; 8:34-39"))
+        self.assertEqual(vs("Rom 8:28-39") - vs("Rom 8:1-30; 8:38-9:5"), vs("Rom 8:31-37"))
+        self.assertEqual(vs("Ps 23") - vs("Ps 23"), VerseSet())
+        self.assertEqual(vs("Ps 23") - vs("Ps 24"), vs("Ps 23"))
+
+    def test_overlaps_and_containment(self):
+        self.assertTrue(vs("John 3:16-4:2").overlaps(vs("John 4:1")))
+        self.assertFalse(vs("John 3:16-36").overlaps(vs("John 4:1")))
+        self.assertIn(vs("John 3:16"), vs("John 3"))
+        self.assertNotIn(vs("John 3:36-4:1"), vs("John 3"))
+        self.assertIn(vs("John 3:16").first, vs("John 3:1-21"))
+
+    def test_whole_chapters_round_trip(self):
+        self.assertEqual(str(vs("Ps 23-24")), "Psalms 23-24")
+        self.assertEqual(str(vs("Ps 23:1-6")), "Psalms 23")
+        self.assertEqual(vs(str(vs("Rom 3:23; 6:23, 5:8"))), vs("Rom 3:23; 5:8; 6:23"))
+
+    def test_sort_key_is_canonical(self):
+        refs = ["1 John 1:9", "Note", "John 3:16", "Gen 1:1", "John 3:1-21", "Intro", "Rev 22:21"]
+        self.assertEqual(sorted(refs, key=sort_key),
+                         ["Gen 1:1", "John 3:1-21", "John 3:16", "1 John 1:9", "Rev 22:21", "Intro", "Note"])
+        self.assertEqual(sort_key(None), sort_key(""))
+
+    def test_overlapping_notes(self):
+        notes = [{'ref': "Rom 8:28"}, {'ref': "Note"}, {'ref': "Rom 8:31-39"}, {'ref': "John 3:16"}]
+        self.assertEqual(overlapping_notes(notes, "Rom 8:28-32"), ["Rom 8:28", "Rom 8:31-39"])
+        self.assertEqual(overlapping_notes(notes, "Rom 8:28-32", exclude=0), ["Rom 8:31-39"])
+        self.assertEqual(overlapping_notes(notes, "Note"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
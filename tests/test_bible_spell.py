@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+import bible_import
+import bible_spell
+import bible_store
+
+OSIS = """<?xml version="1.0" encoding="UTF-8"?>
+<osis xmlns="http://www.bibletechnologies.net/2003/OSIS/namespace"><osisText><div type="book" osisID="John">
+<chapter osisID="John.3">
+<verse osisID="John.3.16">For God so loved the world, that he gave his only begotten Son, that whosoever believeth in him should not perish, but have everlasting life.</verse>
+<verse osisID="John.3.17">For God sent not his Son into the world to condemn the world; but that the world through him might be saved.</verse>
+<verse osisID="John.3.18">He that believeth on him is not condemned: but he that believeth not is condemned already.</verse>
+</chapter></div></osisText></osis>
+"""
+
+
+class SpellIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.previous_cwd = os.getcwd()
+        os.chdir(self.directory.name)
+        self.addCleanup(os.chdir, self.previous_cwd)
+        bible_store.CORPUS_DB_FILE = os.path.join(self.directory.name, 'bible_corpus.db')
+        bible_store._conn = None
+        bible_store._installed = None
+        self.addCleanup(self.close_store)
+        path = os.path.join(self.directory.name, 'tst.osis.xml')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(OSIS)
+        bible_import.import_files('TST', [path])
+        self.index = bible_spell.build_spell_index('TST')
+
+    @staticmethod
+    def close_store():
+        if bible_store._conn is not None:
+            bible_store._conn.close()
+        bible_store._conn = None
+        bible_store._installed = None
+
+    def test_known_word_is_its_own_suggestion(self):
+        self.assertEqual(self.index.suggestions('Believeth'), [('believeth', 0, 2)])
+        self.assertIsNone(self.index.correct('condemned'))
+
+    def test_typos_either_side_of_prefix(self):
+        self.assertGreater(len('everlasting'), bible_spell.PREFIX_LENGTH)
+        for typo, distance in [('evrlasting', 1),  # Deletion inside the expanded prefix
+                               ('everlastign', 1),  # Transposition past it
+                               ('everlastin', 1),  # Truncated after the prefix
+                               ('evexxasting', 2),  # Two substitutions in the prefix
+                               ('everlaxxing', 2),  # Two substitutions straddling it
+                               ('everlastingg', 1)]:
+            with self.subTest(typo=typo):
+                self.assertEqual(self.index.suggestions(typo)[0][:2], ('everlasting', distance))
+
+    def test_differences_past_prefix_still_limited(self):
+        self.assertEqual(self.index.suggestions('everlastxxxx'), [])
+        self.assertEqual(self.index.suggestions('exxxlasting'), [])
+
+    def test_ranked_by_distance_then_verse_count(self):
+        self.assertEqual(self.index.suggestions('hix'), [('him', 1, 3), ('his', 1, 2)])
+        self.assertEqual(self.index.suggestions('condemnd'), [('condemn', 1, 1), ('condemned', 1, 1)])
+        self.assertEqual(self.index.correct_query('whosever belieth -begoten'), 'whosoever believeth -begoten')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from bible_utils import RefRange, parse_refs, parse_ref
+from bible_versification import ReferenceOutOfRange
+
+
+class ParseRefsTest(unittest.TestCase):
+    def test_single_verse_and_whole_chapter(self):
+        self.assertEqual(parse_refs("John 3:16"), [RefRange(43, 3, 16, 3, 16)])
+        self.assertEqual(parse_refs("Ps 23"), [RefRange(19, 23, None, 23, None)])
+
+    def test_ranges(self):
+        self.assertEqual(parse_refs("Rom 8:28-39"), [RefRange(45, 8, 28, 8, 39)])
+        self.assertEqual(parse_refs("John 3:16-4:2"), [RefRange(43, 3, 16, 4, 2)])
+        self.assertEqual(parse_refs("Ps 23-24"), [RefRange(19, 23, None, 24, None)])
+        self.assertEqual(parse_refs("Gen 1:1–2:3"), [RefRange(1, 1, 1, 2, 3)])
+
+    def test_lists_carry_book_and_chapter(self):
+        self.assertEqual(parse_refs("Rom 3:23; 6:23, 5:8"),
+                         [RefRange(45, 3, 23, 3, 23), RefRange(45, 6, 23, 6, 23), RefRange(45, 5, 8, 5, 8)])
+        self.assertEqual(parse_refs("John 3:16, 18"), [RefRange(43, 3, 16, 3, 16), RefRange(43, 3, 18, 3, 18)])
+        self.assertEqual(parse_refs("John 3:16; Rom 8:28"), [RefRange(43, 3, 16, 3, 16), RefRange(45, 8, 28, 8, 28)])
+
+    def test_single_chapter_books(self):
+        self.assertEqual(parse_refs("Jude 24"), [RefRange(65, 1, 24, 1, 24)])
+        self.assertEqual(parse_refs("Philemon 4-7"), [RefRange(57, 1, 4, 1, 7)])
+        self.assertEqual(parse_refs("Jude 1"), [RefRange(65, 1, None, 1, None)])
+
+    def test_out_of_range(self):
+        with self.assertRaises(ReferenceOutOfRange):
+            parse_refs("John 3:37")
+        with self.assertRaises(ReferenceOutOfRange):
+            parse_refs("Psalms 151")
+        with self.assertRaises(ReferenceOutOfRange):
+            parse_refs("Rev 12:18", 'KJV')
+        self.assertEqual(parse_refs("Rev 12:18", 'WEB'), [RefRange(66, 12, 18, 12, 18)])
+
+    def test_invalid_input(self):
+        for text in ["", "xyz 3:1", "Gen 2:1-1:5", "John three"]:
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_refs(text)
+
+    def test_parse_ref_matches_parse_refs(self):
+        for text in ["John 3:16", "1 Corinthians 13:4", "Song of Solomon 2:1", "john 3", "Jude 24", "Jude 1",
+                     "I John 1:9", "Gen 1:1-3", "Obadiah 3"]:
+            with self.subTest(text=text):
+                r = parse_refs(text)[0]
+                self.assertEqual(parse_ref(text), (r.book_id, r.start_chapter, r.start_verse))
+        with self.assertRaises(ReferenceOutOfRange):
+            parse_ref("Malachi 3:24")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,10 +5,13 @@ import google.api_core.exceptions as g_exceptions
 from PyQt6.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QLineEdit, QPushButton, QHBoxLayout, QSplitter, QWidget, \
     QLabel, QComboBox, QMessageBox
 from PyQt6.QtGui import QFont, QTextCursor, QTextOption
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QThreadPool
 import sqlite3
 import logging
 from data_handlers import load_sermon
+from bible_utils import parse_refs, format_range, fetch_passages
+from bible_ranges import sort_key, overlapping_notes
+from bible_workers import FetchWorker
 import datetime
 
 # Set up logging
@@ -39,8 +42,8 @@ def update_verses_list(verses_list, verses, sort_mode='ref'):
                 reverse=True
             )
         else:
-            # Sort by ref field (case-insensitive)
-            sorted_verses = sorted(verses, key=lambda x: x.get('ref', '').lower())
+            # Sort references in canonical book order, then notes and other labels alphabetically
+            sorted_verses = sorted(verses, key=lambda x: sort_key(x.get('ref', '')))
         for verse in sorted_verses:
             item_text = f"{verse.get('ref', '')}: {verse.get('text', '')}"
             verses_list.addItem(item_text)
@@ -127,6 +130,10 @@ class SermonNotesDialog(QDialog):
         self.verses = self.parent.sermon.get('verses_notes', []) if self.parent and hasattr(self.parent, 'sermon') else []
         self.suggestions = ""
         self.color_index = 0  # Track color index for unique Gemini responses
+        self.thread_pool = QThreadPool(self)
+        self.thread_pool.setMaxThreadCount(2)  # A related-verses model build does not hold up a verse lookup
+        self.related_request_id = 0
+        self.passages_request_id = 0
 
         self.setMinimumSize(600, 600)
         self.resize(800, 800)
@@ -219,12 +226,24 @@ class SermonNotesDialog(QDialog):
         search_notes_btn.clicked.connect(self.search_notes)
         buttons_layout.addWidget(search_notes_btn)
 
+        related_btn = QPushButton("Related Verses")
+        related_btn.setStyleSheet(
+            "background-color: #28a745; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
+        related_btn.clicked.connect(self.find_related_verses)
+        buttons_layout.addWidget(related_btn)
+
         add_suggestions_btn = QPushButton("Add Suggestions")
         add_suggestions_btn.setStyleSheet(
             "background-color: #28a745; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
         add_suggestions_btn.clicked.connect(self.add_suggestions)
         buttons_layout.addWidget(add_suggestions_btn)
 
+        insert_verses_btn = QPushButton("Insert Verse Text")
+        insert_verses_btn.setStyleSheet(
+            "background-color: #17a2b8; color: white; border: none; padding: 5px 10px; border-radius: 5px;")
+        insert_verses_btn.clicked.connect(self.insert_verse_text)
+        buttons_layout.addWidget(insert_verses_btn)
+
         layout.addLayout(buttons_layout)
 
         try:
@@ -283,6 +302,14 @@ class SermonNotesDialog(QDialog):
                 return
             if 'verses_notes' not in self.parent.sermon:
                 self.parent.sermon['verses_notes'] = []
+            overlapping = overlapping_notes(self.parent.sermon['verses_notes'], note_dict['ref'],
+                                            exclude=self.edit_index if self.edit_mode else None)
+            if overlapping:
+                answer = QMessageBox.question(self, "Already in Notes",
+                                              f"{note_dict['ref']} overlaps {', '.join(overlapping)} already in your "
+                                              f"verses/notes. Save it anyway?")
+                if answer != QMessageBox.StandardButton.Yes:
+                    return
             if self.edit_mode and self.edit_index is not None:
                 note_dict['timestamp'] = self.parent.sermon['verses_notes'][self.edit_index].get('timestamp', note_dict['timestamp'])
                 self.parent.sermon['verses_notes'][self.edit_index] = note_dict
@@ -322,6 +349,54 @@ class SermonNotesDialog(QDialog):
             logging.error(f"Error searching notes: {str(e)}")
             QMessageBox.critical(self, "Error", f"Failed to search notes: {str(e)}")
 
+    def find_related_verses(self):
+        """Suggest verses offline: similar to the Reference box if it holds a reference, else to the notes."""
+        try:
+            from bible_related import related_verses  # Loaded on first use: it brings in NumPy and SciPy
+            ref = self.ref_input.text().strip()
+            input_text = self.notes_text.toPlainText()
+            translation = self.parent.sermon.get('settings', {}).get('default_translation', 'WEB')
+            try:
+                parse_refs(ref, translation)
+            except ValueError:
+                ref = ''
+            if not ref and not input_text.strip():
+                QMessageBox.warning(self, "No Input", "Please enter a reference or some notes.")
+                return
+            self.related_request_id += 1
+            worker = FetchWorker(self.related_request_id, related_verses, translation, ref, input_text)
+            worker.signals.finished.connect(self.on_related_finished)
+            worker.signals.failed.connect(self.on_related_failed)
+            self.append_research("System", "Finding related verses...", "#b9bbbe")
+            self.thread_pool.start(worker)
+        except Exception as e:
+            logging.error(f"Error finding related verses: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to find related verses: {str(e)}")
+
+    def on_related_finished(self, request_id, results):
+        """Show related verses like Gemini suggestions, so Add Suggestions can save them."""
+        if request_id != self.related_request_id:
+            return
+        if not results:
+            self.append_research("Related", "No related verses found.", "#b9bbbe")
+            return
+        text = '\n\n'.join(f"{ref}: {verse_text}" for _, ref, verse_text in results)
+        self.color_index = (self.color_index + 1) % len(GEMINI_COLORS)
+        self.append_research("Related", text, GEMINI_COLORS[self.color_index])
+        self.suggestions = text
+
+    def on_related_failed(self, request_id, error):
+        if request_id != self.related_request_id:
+            return
+        logging.error(f"Failed to find related verses: {str(error)}")
+        self.append_research("Error", f"Failed to find related verses: {str(error)}", "#ff4040")
+
+    def done(self, result):
+        """Ignore related-verse and verse-text results that arrive after the dialog closes."""
+        self.related_request_id += 1
+        self.passages_request_id += 1
+        super().done(result)
+
     def add_suggestions(self):
         """Add the entire suggestions from Gemini to the notes/verses section as a single entry."""
         try:
@@ -352,6 +427,45 @@ class SermonNotesDialog(QDialog):
             logging.error(f"Error adding suggestions: {str(e)}")
             QMessageBox.critical(self, "Error", f"Failed to add suggestions: {str(e)}")
 
+    def insert_verse_text(self):
+        """Look up the references in the Reference box (e.g. Rom 3:23; 6:23) and append their text to the notes."""
+        try:
+            refs_text = self.ref_input.text().strip()
+            if not refs_text:
+                QMessageBox.warning(self, "No Reference", "Please enter one or more references, e.g. John 3:16; Rom 8:28.")
+                return
+            translation = self.parent.sermon.get('settings', {}).get('default_translation', 'WEB')
+            try:
+                ranges = parse_refs(refs_text, translation)
+            except ValueError as e:
+                QMessageBox.warning(self, "Invalid Reference", f"Invalid reference: {str(e)}")
+                return
+            self.passages_request_id += 1
+            worker = FetchWorker(self.passages_request_id, fetch_passages, ranges, translation)
+            worker.signals.finished.connect(
+                lambda request_id, texts: self.on_passages_finished(request_id, ranges, texts))
+            worker.signals.failed.connect(self.on_passages_failed)
+            self.append_research("System", "Looking up verse text...", "#b9bbbe")
+            self.thread_pool.start(worker)
+        except Exception as e:
+            logging.error(f"Error inserting verse text: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to insert verse text: {str(e)}")
+
+    def on_passages_finished(self, request_id, ranges, texts):
+        """Append the looked-up passages to the notes."""
+        if request_id != self.passages_request_id:
+            return
+        verses_text = '\n'.join(f"{format_range(r)}: {text}" for r, text in zip(ranges, texts))
+        current = self.notes_text.toPlainText()
+        self.notes_text.setPlainText(f"{current}\n{verses_text}" if current else verses_text)
+        logging.debug(f"Inserted text for {len(ranges)} passages")
+
+    def on_passages_failed(self, request_id, error):
+        if request_id != self.passages_request_id:
+            return
+        logging.error(f"Error inserting verse text: {str(error)}")
+        QMessageBox.critical(self, "Error", f"Failed to insert verse text: {str(error)}")
+
     def send_gemini_research(self):
         """Send quick Gemini research query from bottom section."""
         try: